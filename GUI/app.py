@@ -11,13 +11,23 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledFrame
 import sys
 import os
+from datetime import datetime
 
 # Add the parent directory to the path to import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.operations import StudentResultsDB
+from database.operations import (
+    StudentResultsDB, STUDENT_SORT_KEYS, STAFF_SORT_KEYS, COURSE_SORT_KEYS,
+    LEGACY_SORT_KEYS, RECORD_SORT_KEYS
+)
+from database.cache import invalidate_reference_data, REFERENCE_TABLES
 from utils.auth_manager import AuthManager
 from utils.grade_calculator import calculate_grade, calculate_gpa_points, calculate_cumulative_gpa
+from GUI.components.virtual_table import VirtualTable
+from GUI.components.loading_indicator import LoadingIndicator
+from GUI.services.task_runner import get_task_runner
+from GUI.services.screen_cache import ScreenCache
+from GUI.services.change_feed import get_change_feed
 
 class StudentManagementGUI:
     def __init__(self):
@@ -41,6 +51,15 @@ class StudentManagementGUI:
         
         self.auth_manager = AuthManager(self.db)
         
+        # Database work started from the UI runs on background workers
+        self.tasks = get_task_runner(self.root)
+        self.loading_indicator = LoadingIndicator(self.root, self.tasks)
+        # Changes made by other sessions refresh the screens showing them
+        self.changes = get_change_feed(self.root)
+        # Courses and id lookups are cached; drop entries other sessions change
+        self.changes.listener.subscribe(invalidate_reference_data, tables=REFERENCE_TABLES)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Current user state
         self.current_user = None
         self.user_type = None
@@ -49,6 +68,9 @@ class StudentManagementGUI:
         self.main_container = ttk.Frame(self.root, bootstyle="light")
         self.main_container.pack(fill='both', expand=True, padx=20, pady=20)
         
+        # Screens are built once and shown again on revisit
+        self.screens = ScreenCache(self.main_container)
+        
         # Start with login screen
         self.show_login_screen()
     
@@ -57,14 +79,46 @@ class StudentManagementGUI:
         if hasattr(self, 'db'):
             self.db.close()
     
+    def on_close(self):
+        """Stop background work before closing the window"""
+        self.changes.stop()
+        self.tasks.shutdown()
+        self.root.destroy()
+    
+    @property
+    def content_frame(self):
+        """Content area of the screen on show; each cached screen keeps its own"""
+        screen = self.screens.current
+        return getattr(screen, 'content_frame', None)
+    
+    @content_frame.setter
+    def content_frame(self, frame):
+        self.screens.current.content_frame = frame
+    
+    def show_screen(self, name, build, keep=True):
+        """Show a cached screen, building it with build(parent) on the first visit"""
+        self.screens.show(name, build, keep)
+    
+    def clear_content(self, refresh=None):
+        """
+        Empty the content area of the screen on show
+        
+        Args:
+            refresh (callable, optional): Rebuilds the content on later visits;
+                pass it for content that is a snapshot of the database
+        """
+        for widget in self.content_frame.winfo_children():
+            widget.destroy()
+        self.screens.current.refresh = refresh
+    
     def show_login_screen(self):
         """Show the modern login screen"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('login', self.build_login_screen)
+    
+    def build_login_screen(self, parent):
+        """Build the modern login screen"""
         # Create main login container with enhanced styling
-        main_login_frame = ttk.Frame(self.main_container, bootstyle="light")
+        main_login_frame = ttk.Frame(parent, bootstyle="light")
         main_login_frame.pack(expand=True, fill='both', padx=30, pady=30)
         
         # Create a centered container for the login content
@@ -176,12 +230,17 @@ class StudentManagementGUI:
     
     def show_login_form(self, user_type, callback):
         """Show enhanced modern login form for specified user type"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        # Not cached: the form holds the typed password
+        self.show_screen(
+            ('login', user_type),
+            lambda parent: self.build_login_form(parent, user_type, callback),
+            keep=False
+        )
+    
+    def build_login_form(self, parent, user_type, callback):
+        """Build enhanced modern login form for specified user type"""
         # Create main container with enhanced modern styling
-        main_frame = ttk.Frame(self.main_container, bootstyle="light")
+        main_frame = ttk.Frame(parent, bootstyle="light")
         main_frame.pack(expand=True, fill='both', padx=30, pady=30)
         
         # Centered container
@@ -343,12 +402,12 @@ class StudentManagementGUI:
     
     def show_admin_dashboard(self):
         """Show enhanced admin dashboard"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('admin-dashboard', self.build_admin_dashboard)
+    
+    def build_admin_dashboard(self, parent):
+        """Build enhanced admin dashboard"""
         # Create dashboard frame with enhanced styling
-        dashboard_frame = ttk.Frame(self.main_container)
+        dashboard_frame = ttk.Frame(parent)
         dashboard_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Enhanced header with better spacing
@@ -402,12 +461,12 @@ class StudentManagementGUI:
     
     def show_student_management(self):
         """Show enhanced student management interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('student-management', self.build_student_management)
+    
+    def build_student_management(self, parent):
+        """Build enhanced student management interface"""
         # Create student management frame with enhanced styling
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Enhanced header with better spacing
@@ -467,8 +526,7 @@ class StudentManagementGUI:
     def show_add_student_form(self):
         """Show form to add new student"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -529,58 +587,46 @@ class StudentManagementGUI:
     def show_all_students(self):
         """Show all students in a table"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
-        # Get students from database
-        query = "SELECT * FROM students ORDER BY full_name"
-        students = self.db.db.execute_query(query)
-        
-        if not students:
-            ttk.Label(
-                self.content_frame,
-                text="No students found",
-                font=("Segoe UI", 12)
-            ).pack(expand=True)
-            return
-        
-        # Create table
-        table_frame = ttk.Frame(self.content_frame)
-        table_frame.pack(fill='both', expand=True)
-        
-        # Table headers
-        headers = ['ID', 'Student ID', 'Name', 'Email', 'Phone']
-        for i, header in enumerate(headers):
-            ttk.Label(
-                table_frame,
-                text=header,
-                font=("Segoe UI", 10, "bold")
-            ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-        
-        # Table data
-        for i, student in enumerate(students, 1):
-            ttk.Label(table_frame, text=student['id']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=student['student_id']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=student['full_name']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=student['email'] or 'N/A').grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=student['phone'] or 'N/A').grid(row=i, column=4, padx=5, pady=2, sticky='w')
-        
-        # Summary
-        ttk.Label(
+        # Rows are fetched a page at a time as the table scrolls
+        VirtualTable(
             self.content_frame,
-            text=f"Total students: {len(students)}",
-            font=("Segoe UI", 10, "italic")
-        ).pack(pady=10)
+            columns=[
+                ('id', 'ID', 60),
+                ('student_id', 'Student ID', 100),
+                ('full_name', 'Name', 220),
+                ('email', 'Email', 220),
+                ('phone', 'Phone', 120)
+            ],
+            fetch_page=StudentResultsDB.get_students_page,
+            sort_keys=STUDENT_SORT_KEYS,
+            sort='full_name',
+            empty_text="No students found",
+            watch=('students',)
+        ).pack(fill='both', expand=True)
     
     def show_student_credentials(self):
         """Show student credentials interface"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content(refresh=self.show_student_credentials)
+        
+        loading = ttk.Label(self.content_frame, text="Loading students...", font=("Segoe UI", 12))
+        loading.pack(expand=True)
         
-        # Get students
         query = "SELECT student_id, full_name FROM students ORDER BY full_name"
-        students = self.db.db.execute_query(query)
+        self.tasks.submit(
+            lambda db: db.db.execute_query(query),
+            on_success=self.build_student_credentials,
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load students"),
+            key='student-credentials',
+            replace=True,
+            owner=loading
+        )
+    
+    def build_student_credentials(self, students):
+        """Build the student credentials list once the students have loaded"""
+        self.clear_content(refresh=self.show_student_credentials)
         
         if not students:
             ttk.Label(
@@ -624,8 +670,15 @@ class StudentManagementGUI:
             
             # Get full student data
             query = "SELECT * FROM students WHERE student_id = %s"
-            result = self.db.db.execute_query(query, (selected_student['student_id'],))
-            
+            self.tasks.submit(
+                lambda db: db.db.execute_query(query, (selected_student['student_id'],)),
+                on_success=show_credentials,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to load credentials"),
+                key='student-credentials-view',
+                owner=listbox
+            )
+        
+        def show_credentials(result):
             if result:
                 student = result[0]
                 credentials_text = f"""
@@ -653,12 +706,12 @@ Login Instructions:
     
     def show_staff_management(self):
         """Show staff management interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('staff-management', self.build_staff_management)
+    
+    def build_staff_management(self, parent):
+        """Build staff management interface"""
         # Create staff management frame
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True)
         
         # Header
@@ -718,8 +771,7 @@ Login Instructions:
     def show_add_staff_form(self):
         """Show form to add new staff"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -780,58 +832,46 @@ Login Instructions:
     def show_all_staff(self):
         """Show all staff in a table"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        # Get staff from database
-        query = "SELECT * FROM staff ORDER BY full_name"
-        staff_list = self.db.db.execute_query(query)
+        self.clear_content()
         
-        if not staff_list:
-            ttk.Label(
-                self.content_frame,
-                text="No staff found",
-                font=("Segoe UI", 12)
-            ).pack(expand=True)
-            return
-        
-        # Create table
-        table_frame = ttk.Frame(self.content_frame)
-        table_frame.pack(fill='both', expand=True)
-        
-        # Table headers
-        headers = ['ID', 'Staff ID', 'Name', 'Email', 'Department']
-        for i, header in enumerate(headers):
-            ttk.Label(
-                table_frame,
-                text=header,
-                font=("Segoe UI", 10, "bold")
-            ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-        
-        # Table data
-        for i, staff in enumerate(staff_list, 1):
-            ttk.Label(table_frame, text=staff['id']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=staff['staff_id']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=staff['full_name']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=staff['email'] or 'N/A').grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=staff['department'] or 'N/A').grid(row=i, column=4, padx=5, pady=2, sticky='w')
-        
-        # Summary
-        ttk.Label(
+        # Rows are fetched a page at a time as the table scrolls
+        VirtualTable(
             self.content_frame,
-            text=f"Total staff: {len(staff_list)}",
-            font=("Segoe UI", 10, "italic")
-        ).pack(pady=10)
+            columns=[
+                ('id', 'ID', 60),
+                ('staff_id', 'Staff ID', 100),
+                ('full_name', 'Name', 220),
+                ('email', 'Email', 220),
+                ('department', 'Department', 160)
+            ],
+            fetch_page=StudentResultsDB.get_staff_page,
+            sort_keys=STAFF_SORT_KEYS,
+            sort='full_name',
+            empty_text="No staff found",
+            watch=('staff',)
+        ).pack(fill='both', expand=True)
     
     def show_staff_credentials(self):
         """Show staff credentials interface"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content(refresh=self.show_staff_credentials)
+        
+        loading = ttk.Label(self.content_frame, text="Loading staff...", font=("Segoe UI", 12))
+        loading.pack(expand=True)
         
-        # Get staff
         query = "SELECT staff_id, full_name FROM staff ORDER BY full_name"
-        staff_list = self.db.db.execute_query(query)
+        self.tasks.submit(
+            lambda db: db.db.execute_query(query),
+            on_success=self.build_staff_credentials,
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load staff"),
+            key='staff-credentials',
+            replace=True,
+            owner=loading
+        )
+    
+    def build_staff_credentials(self, staff_list):
+        """Build the staff credentials list once the staff have loaded"""
+        self.clear_content(refresh=self.show_staff_credentials)
         
         if not staff_list:
             ttk.Label(
@@ -875,8 +915,15 @@ Login Instructions:
             
             # Get full staff data
             query = "SELECT * FROM staff WHERE staff_id = %s"
-            result = self.db.db.execute_query(query, (selected_staff['staff_id'],))
-            
+            self.tasks.submit(
+                lambda db: db.db.execute_query(query, (selected_staff['staff_id'],)),
+                on_success=show_credentials,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to load credentials"),
+                key='staff-credentials-view',
+                owner=listbox
+            )
+        
+        def show_credentials(result):
             if result:
                 staff = result[0]
                 credentials_text = f"""
@@ -904,12 +951,12 @@ Login Instructions:
     
     def show_course_management(self):
         """Show course management interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('course-management', self.build_course_management)
+    
+    def build_course_management(self, parent):
+        """Build course management interface"""
         # Create course management frame
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True)
         
         # Header
@@ -962,8 +1009,7 @@ Login Instructions:
     def show_add_course_form(self):
         """Show form to add new course"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -993,12 +1039,17 @@ Login Instructions:
         desc_entry = ttk.Entry(form_frame, width=40)
         desc_entry.pack(pady=5)
         
+        ttk.Label(form_frame, text="Capacity (optional, blank for unlimited):").pack(pady=5)
+        capacity_entry = ttk.Entry(form_frame, width=40)
+        capacity_entry.pack(pady=5)
+        
         # Submit button
         def submit_course():
             code = code_entry.get().strip()
             name = name_entry.get().strip()
             credits = credits_entry.get().strip()
             description = desc_entry.get().strip()
+            capacity = capacity_entry.get().strip()
             
             if not code or not name:
                 messagebox.showerror("Error", "Course code and name are required")
@@ -1012,7 +1063,15 @@ Login Instructions:
             except ValueError:
                 credits = 3
             
-            if self.db.add_course(code, name, credits, description):
+            try:
+                capacity = int(capacity) if capacity else None
+                if capacity is not None and capacity < 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Error", "Capacity must be a whole number of seats")
+                return
+            
+            if self.db.add_course(code, name, credits, description, capacity):
                 messagebox.showinfo("Success", "Course created successfully!")
                 # Clear form
                 code_entry.delete(0, tk.END)
@@ -1020,6 +1079,7 @@ Login Instructions:
                 credits_entry.delete(0, tk.END)
                 credits_entry.insert(0, "3")
                 desc_entry.delete(0, tk.END)
+                capacity_entry.delete(0, tk.END)
             else:
                 messagebox.showerror("Error", "Failed to create course")
         
@@ -1033,59 +1093,38 @@ Login Instructions:
     def show_all_courses(self):
         """Show all courses in a table"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        # Get courses from database
-        courses = self.db.get_all_courses()
-        
-        if not courses:
-            ttk.Label(
-                self.content_frame,
-                text="No courses found",
-                font=("Segoe UI", 12)
-            ).pack(expand=True)
-            return
+        self.clear_content()
         
-        # Create table
-        table_frame = ttk.Frame(self.content_frame)
-        table_frame.pack(fill='both', expand=True)
+        def short_description(desc):
+            desc = desc or 'N/A'
+            return desc[:27] + "..." if len(desc) > 30 else desc
         
-        # Table headers
-        headers = ['ID', 'Code', 'Name', 'Credits', 'Description']
-        for i, header in enumerate(headers):
-            ttk.Label(
-                table_frame,
-                text=header,
-                font=("Segoe UI", 10, "bold")
-            ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-        
-        # Table data
-        for i, course in enumerate(courses, 1):
-            ttk.Label(table_frame, text=course['id']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=course['course_code']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=course['course_name']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=course['credits']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            desc = course['description'] or 'N/A'
-            if len(desc) > 30:
-                desc = desc[:27] + "..."
-            ttk.Label(table_frame, text=desc).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-        
-        # Summary
-        ttk.Label(
+        # Rows are fetched a page at a time as the table scrolls
+        VirtualTable(
             self.content_frame,
-            text=f"Total courses: {len(courses)}",
-            font=("Segoe UI", 10, "italic")
-        ).pack(pady=10)
+            columns=[
+                ('id', 'ID', 60),
+                ('course_code', 'Code', 100),
+                ('course_name', 'Name', 240),
+                ('credits', 'Credits', 80),
+                ('description', 'Description', 260)
+            ],
+            fetch_page=StudentResultsDB.get_courses_page,
+            sort_keys=COURSE_SORT_KEYS,
+            sort='course_code',
+            empty_text="No courses found",
+            formatters={'description': short_description},
+            watch=('courses',)
+        ).pack(fill='both', expand=True)
     
     def show_course_assignments(self):
         """Show course assignments interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('course-assignments', self.build_course_assignments)
+    
+    def build_course_assignments(self, parent):
+        """Build course assignments interface"""
         # Create course assignments frame
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1116,14 +1155,25 @@ Login Instructions:
     def show_assignment_form(self):
         """Show form to assign courses to staff"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content(refresh=self.show_assignment_form)
+        
+        loading = ttk.Label(self.content_frame, text="Loading staff and courses...", font=("Segoe UI", 12))
+        loading.pack(expand=True)
         
         # Get staff and courses
         staff_query = "SELECT * FROM staff ORDER BY full_name"
-        staff_list = self.db.db.execute_query(staff_query)
-        
-        courses = self.db.get_all_courses()
+        self.tasks.submit(
+            lambda db: (db.db.execute_query(staff_query), db.get_all_courses()),
+            on_success=lambda result: self.build_assignment_form(*result),
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load staff and courses"),
+            key='assignment-form',
+            replace=True,
+            owner=loading
+        )
+    
+    def build_assignment_form(self, staff_list, courses):
+        """Build the course assignment form once staff and courses have loaded"""
+        self.clear_content(refresh=self.show_assignment_form)
         
         if not staff_list:
             ttk.Label(
@@ -1193,49 +1243,46 @@ Login Instructions:
                 messagebox.showerror("Error", "All fields are required")
                 return
             
-            # Extract staff ID and course ID
-            staff_id = staff_selection.split('(')[1].split(')')[0]
-            course_code = course_selection.split(' - ')[0]
-            
-            # Get staff and course IDs
-            staff_query = "SELECT id FROM staff WHERE staff_id = %s"
-            staff_result = self.db.db.execute_query(staff_query, (staff_id,))
-            
-            course_query = "SELECT id FROM courses WHERE course_code = %s"
-            course_result = self.db.db.execute_query(course_query, (course_code,))
-            
-            if not staff_result or not course_result:
-                messagebox.showerror("Error", "Invalid staff or course selection")
-                return
-            
-            staff_id = staff_result[0]['id']
-            course_id = course_result[0]['id']
-            
-            if self.db.assign_course_to_staff(staff_id, course_id, academic_year, semester):
-                messagebox.showinfo("Success", "Course assigned successfully!")
-                # Clear form
-                staff_var.set('')
-                course_var.set('')
-                year_entry.delete(0, tk.END)
-                semester_var.set('')
-            else:
-                messagebox.showerror("Error", "Failed to assign course")
+            # The combo boxes list staff and courses in loaded order
+            staff_id = staff_list[staff_combo.current()]['id']
+            course_id = courses[course_combo.current()]['id']
+            
+            def assigned(success):
+                if success:
+                    messagebox.showinfo("Success", "Course assigned successfully!")
+                    # Clear form
+                    staff_var.set('')
+                    course_var.set('')
+                    year_entry.delete(0, tk.END)
+                    semester_var.set('')
+                else:
+                    messagebox.showerror("Error", "Failed to assign course")
+            
+            self.tasks.submit(
+                lambda db: db.assign_course_to_staff(staff_id, course_id, academic_year, semester),
+                on_success=assigned,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to assign course"),
+                key='assign-course',
+                busy=[assign_button],
+                owner=form_frame
+            )
         
-        ttk.Button(
+        assign_button = ttk.Button(
             form_frame,
             text="Assign Course",
             bootstyle="success",
             command=submit_assignment
-        ).pack(pady=20)
+        )
+        assign_button.pack(pady=20)
     
     def show_system_reports(self):
         """Show system reports interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('system-reports', self.build_system_reports)
+    
+    def build_system_reports(self, parent):
+        """Build system reports interface"""
         # Create system reports frame
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1266,8 +1313,7 @@ Login Instructions:
     def show_reports_summary(self):
         """Show system reports summary"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content(refresh=self.show_reports_summary)
         
         # Create reports frame
         reports_frame = ttk.Frame(self.content_frame)
@@ -1279,66 +1325,74 @@ Login Instructions:
             font=("Segoe UI", 16, "bold")
         ).pack(pady=20)
         
-        # Get counts
-        students_query = "SELECT COUNT(*) as count FROM students"
-        staff_query = "SELECT COUNT(*) as count FROM staff"
-        courses_query = "SELECT COUNT(*) as count FROM courses"
-        enrollments_query = "SELECT COUNT(*) as count FROM enrollments"
-        
-        students_count = self.db.db.execute_query(students_query)[0]['count']
-        staff_count = self.db.db.execute_query(staff_query)[0]['count']
-        courses_count = self.db.db.execute_query(courses_query)[0]['count']
-        enrollments_count = self.db.db.execute_query(enrollments_query)[0]['count']
-        
-        # Display counts
-        counts_frame = ttk.Frame(reports_frame)
-        counts_frame.pack(pady=20)
-        
-        ttk.Label(counts_frame, text=f"Total Students: {students_count}", font=("Segoe UI", 12)).pack(pady=5)
-        ttk.Label(counts_frame, text=f"Total Staff: {staff_count}", font=("Segoe UI", 12)).pack(pady=5)
-        ttk.Label(counts_frame, text=f"Total Courses: {courses_count}", font=("Segoe UI", 12)).pack(pady=5)
-        ttk.Label(counts_frame, text=f"Total Enrollments: {enrollments_count}", font=("Segoe UI", 12)).pack(pady=5)
-        
-        # Grade distribution
-        grade_query = """
-        SELECT grade, COUNT(*) as count 
-        FROM academic_records 
-        GROUP BY grade 
-        ORDER BY grade
-        """
-        grade_distribution = self.db.db.execute_query(grade_query)
-        
-        if grade_distribution:
-            ttk.Label(
-                reports_frame,
-                text="Grade Distribution:",
-                font=("Segoe UI", 14, "bold")
-            ).pack(pady=(20, 10))
+        def show_reports(report):
+            if report is None:
+                messagebox.showerror("Error", "Failed to load reports")
+                return
+            
+            # Display counts
+            counts_frame = ttk.Frame(reports_frame)
+            counts_frame.pack(pady=20)
             
-            grade_frame = ttk.Frame(reports_frame)
-            grade_frame.pack(pady=10)
+            ttk.Label(counts_frame, text=f"Total Students: {report['students']}", font=("Segoe UI", 12)).pack(pady=5)
+            ttk.Label(counts_frame, text=f"Total Staff: {report['staff']}", font=("Segoe UI", 12)).pack(pady=5)
+            ttk.Label(counts_frame, text=f"Total Courses: {report['courses']}", font=("Segoe UI", 12)).pack(pady=5)
+            ttk.Label(counts_frame, text=f"Total Enrollments: {report['enrollments']}", font=("Segoe UI", 12)).pack(pady=5)
+            ttk.Label(counts_frame, text=f"Waitlisted: {report['waitlisted']}", font=("Segoe UI", 12)).pack(pady=5)
             
-            for grade in grade_distribution:
+            # Grade distribution
+            grade_distribution = report['grades']
+            if grade_distribution:
                 ttk.Label(
-                    grade_frame,
-                    text=f"{grade['grade']}: {grade['count']} students",
-                    font=("Segoe UI", 10)
-                ).pack(pady=2)
-        else:
-            ttk.Label(
-                reports_frame,
-                text="No academic records found",
-                font=("Segoe UI", 10, "italic")
-            ).pack(pady=20)
+                    reports_frame,
+                    text="Grade Distribution:",
+                    font=("Segoe UI", 14, "bold")
+                ).pack(pady=(20, 10))
+                
+                grade_frame = ttk.Frame(reports_frame)
+                grade_frame.pack(pady=10)
+                
+                for grade in grade_distribution:
+                    ttk.Label(
+                        grade_frame,
+                        text=f"{grade['grade']}: {grade['count']} students",
+                        font=("Segoe UI", 10)
+                    ).pack(pady=2)
+            else:
+                ttk.Label(
+                    reports_frame,
+                    text="No academic records found",
+                    font=("Segoe UI", 10, "italic")
+                ).pack(pady=20)
+        
+        # Every figure comes from the counters table in one query
+        self.tasks.submit(
+            lambda db: db.get_dashboard_stats(),
+            on_success=show_reports,
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load reports"),
+            key='reports-summary',
+            owner=reports_frame
+        )
+        
+        def on_changes(changes):
+            # Reload while on screen; a revisit reloads it otherwise
+            if reports_frame.winfo_ismapped():
+                self.show_reports_summary()
+        
+        self.changes.subscribe(
+            on_changes,
+            tables=('students', 'staff', 'courses', 'enrollments', 'academic_records'),
+            owner=reports_frame
+        )
     
     def show_legacy_system(self):
         """Show legacy system interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('legacy-system', self.build_legacy_system)
+    
+    def build_legacy_system(self, parent):
+        """Build legacy system interface"""
         # Create legacy system frame
-        mgmt_frame = ttk.Frame(self.main_container)
+        mgmt_frame = ttk.Frame(parent)
         mgmt_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1369,8 +1423,7 @@ Login Instructions:
     def show_legacy_options(self):
         """Show legacy system options"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create options frame
         options_frame = ttk.Frame(self.content_frame)
@@ -1407,55 +1460,30 @@ Login Instructions:
     def show_legacy_records(self):
         """Show all legacy student records"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        # Get legacy records
-        query = "SELECT * FROM student_results ORDER BY full_name"
-        records = self.db.db.execute_query(query)
+        self.clear_content()
         
-        if not records:
-            ttk.Label(
-                self.content_frame,
-                text="No legacy records found",
-                font=("Segoe UI", 12)
-            ).pack(expand=True)
-            return
-        
-        # Create table
-        table_frame = ttk.Frame(self.content_frame)
-        table_frame.pack(fill='both', expand=True)
-        
-        # Table headers
-        headers = ['ID', 'Index Number', 'Name', 'Course', 'Score', 'Grade']
-        for i, header in enumerate(headers):
-            ttk.Label(
-                table_frame,
-                text=header,
-                font=("Segoe UI", 10, "bold")
-            ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-        
-        # Table data
-        for i, record in enumerate(records, 1):
-            ttk.Label(table_frame, text=record['id']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['index_number']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['full_name']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['course']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['score']).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['grade'] or 'N/A').grid(row=i, column=5, padx=5, pady=2, sticky='w')
-        
-        # Summary
-        ttk.Label(
+        # Rows are fetched a page at a time as the table scrolls
+        VirtualTable(
             self.content_frame,
-            text=f"Total legacy records: {len(records)}",
-            font=("Segoe UI", 10, "italic")
-        ).pack(pady=10)
+            columns=[
+                ('id', 'ID', 60),
+                ('index_number', 'Index Number', 120),
+                ('full_name', 'Name', 220),
+                ('course', 'Course', 200),
+                ('score', 'Score', 80),
+                ('grade', 'Grade', 80)
+            ],
+            fetch_page=StudentResultsDB.get_legacy_students_page,
+            sort_keys=LEGACY_SORT_KEYS,
+            sort='full_name',
+            empty_text="No legacy records found",
+            watch=('student_results',)
+        ).pack(fill='both', expand=True)
     
     def show_add_legacy_record(self):
         """Show form to add legacy record"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -1524,8 +1552,7 @@ Login Instructions:
     def show_update_legacy_record(self):
         """Show form to update legacy record"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -1581,12 +1608,12 @@ Login Instructions:
     
     def show_staff_dashboard(self):
         """Show enhanced staff dashboard"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('staff-dashboard', self.build_staff_dashboard)
+    
+    def build_staff_dashboard(self, parent):
+        """Build enhanced staff dashboard"""
         # Create staff dashboard frame with enhanced styling
-        dashboard_frame = ttk.Frame(self.main_container)
+        dashboard_frame = ttk.Frame(parent)
         dashboard_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Enhanced header with better spacing
@@ -1645,12 +1672,12 @@ Login Instructions:
     
     def show_staff_courses(self):
         """Show courses assigned to current staff"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('staff-courses', self.build_staff_courses)
+    
+    def build_staff_courses(self, parent):
+        """Build courses assigned to current staff"""
         # Create courses frame
-        courses_frame = ttk.Frame(self.main_container)
+        courses_frame = ttk.Frame(parent)
         courses_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1678,51 +1705,29 @@ Login Instructions:
         # Get staff courses
         if self.current_user:
             staff_id = self.current_user['id']
-            courses = self.db.get_staff_courses(staff_id)
-            
-            if not courses:
-                ttk.Label(
-                    self.content_frame,
-                    text="No courses assigned to you yet.",
-                    font=("Segoe UI", 12)
-                ).pack(expand=True)
-                return
-            
-            # Create table
-            table_frame = ttk.Frame(self.content_frame)
-            table_frame.pack(fill='both', expand=True)
-            
-            # Table headers
-            headers = ['Course Code', 'Course Name', 'Academic Year', 'Semester']
-            for i, header in enumerate(headers):
-                ttk.Label(
-                    table_frame,
-                    text=header,
-                    font=("Segoe UI", 10, "bold")
-                ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-            
-            # Table data
-            for i, course in enumerate(courses, 1):
-                ttk.Label(table_frame, text=course['course_code']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=course['course_name']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=course['academic_year']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=course['semester']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            
-            # Summary
-            ttk.Label(
+            courses_table = VirtualTable(
                 self.content_frame,
-                text=f"Total assigned courses: {len(courses)}",
-                font=("Segoe UI", 10, "italic")
-            ).pack(pady=10)
+                columns=[
+                    ('course_code', 'Course Code', 120),
+                    ('course_name', 'Course Name', 260),
+                    ('academic_year', 'Academic Year', 120),
+                    ('semester', 'Semester', 140)
+                ],
+                empty_text="No courses assigned to you yet.",
+                watch=('course_assignments', 'courses'),
+                watch_match={'staff_id': staff_id}
+            )
+            courses_table.pack(fill='both', expand=True)
+            courses_table.load_rows(lambda db: db.get_staff_courses(staff_id))
     
     def show_score_recording(self):
         """Show score recording interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('score-recording', self.build_score_recording)
+    
+    def build_score_recording(self, parent):
+        """Build score recording interface"""
         # Create score recording frame
-        recording_frame = ttk.Frame(self.main_container)
+        recording_frame = ttk.Frame(parent)
         recording_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1743,6 +1748,24 @@ Login Instructions:
             command=self.show_staff_dashboard
         ).pack(side='right')
         
+        # Entry mode
+        mode_frame = ttk.Frame(recording_frame)
+        mode_frame.pack(fill='x')
+        
+        ttk.Button(
+            mode_frame,
+            text="Single Score",
+            bootstyle="info-outline",
+            command=self.show_recording_form
+        ).pack(side='left', padx=(0, 10))
+        
+        ttk.Button(
+            mode_frame,
+            text="Course Roster",
+            bootstyle="info-outline",
+            command=self.show_roster_form
+        ).pack(side='left')
+        
         # Content area
         self.content_frame = ttk.Frame(recording_frame)
         self.content_frame.pack(fill='both', expand=True, pady=20)
@@ -1753,8 +1776,7 @@ Login Instructions:
     def show_recording_form(self):
         """Show form to record student scores"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content()
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -1815,47 +1837,216 @@ Login Instructions:
                 messagebox.showerror("Error", "Score must be a number")
                 return
             
-            # Get student and course IDs
-            student_query = "SELECT id FROM students WHERE student_id = %s"
-            student_result = self.db.db.execute_query(student_query, (student_id,))
+            staff_id = self.current_user['id']
+            
+            def record(db):
+                # Resolve student and course IDs from the reference cache
+                student_db_id = db.get_student_db_id(student_id)
+                course_id = db.get_course_id(course_code)
+                if student_db_id is None or course_id is None:
+                    return None
+                return db.record_student_score(student_db_id, course_id, staff_id, academic_year, semester, score)
+            
+            def recorded(result):
+                if result is None:
+                    messagebox.showerror("Error", "Invalid student ID or course code")
+                elif result:
+                    messagebox.showinfo("Success", "Score recorded successfully!")
+                    # Clear form
+                    student_entry.delete(0, tk.END)
+                    course_entry.delete(0, tk.END)
+                    year_entry.delete(0, tk.END)
+                    semester_var.set('')
+                    score_entry.delete(0, tk.END)
+                else:
+                    messagebox.showerror("Error", "Failed to record score")
+            
+            # Repeat clicks while the first is saving are ignored
+            self.tasks.submit(
+                record,
+                on_success=recorded,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to record score"),
+                key='record-score',
+                busy=[record_button],
+                owner=form_frame
+            )
+        
+        record_button = ttk.Button(
+            form_frame,
+            text="Record Score",
+            bootstyle="success",
+            command=submit_score
+        )
+        record_button.pack(pady=20)
+    
+    def show_roster_form(self):
+        """Show every student enrolled in a course with a score entry each"""
+        # Clear content frame
+        self.clear_content()
+        
+        form_frame = ttk.Frame(self.content_frame)
+        form_frame.pack(fill='both', expand=True)
+        
+        ttk.Label(
+            form_frame,
+            text="Record Scores for a Course Roster",
+            font=("Segoe UI", 16, "bold")
+        ).pack(pady=20)
+        
+        loading = ttk.Label(form_frame, text="Loading your courses...")
+        loading.pack()
+        staff_id = self.current_user['id']
+        self.tasks.submit(
+            lambda db: db.get_staff_courses(staff_id) or [],
+            on_success=lambda courses: self.build_roster_form(form_frame, courses),
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load your courses"),
+            key='roster-courses',
+            replace=True,
+            owner=loading
+        )
+    
+    def build_roster_form(self, form_frame, courses):
+        """Build the roster course picker once the staff member's courses have loaded"""
+        # Keep the title, drop the loading label
+        for widget in form_frame.winfo_children()[1:]:
+            widget.destroy()
+        
+        if not courses:
+            ttk.Label(
+                form_frame,
+                text="No courses assigned to you yet.",
+                font=("Segoe UI", 12)
+            ).pack(expand=True)
+            return
+        
+        labels = [f"{c['course_code']} - {c['course_name']} ({c['academic_year']} {c['semester']})" for c in courses]
+        course_var = tk.StringVar()
+        course_combo = ttk.Combobox(
+            form_frame,
+            textvariable=course_var,
+            values=labels,
+            width=60,
+            state="readonly"
+        )
+        course_combo.pack(pady=5)
+        
+        roster_frame = ttk.Frame(form_frame)
+        roster_frame.pack(fill='both', expand=True, pady=10)
+        entries = {}
+        
+        def format_roster_score(row):
+            return f"{row['score']} ({row['grade']})" if row['score'] is not None else "-"
+        
+        def format_roster_time(value):
+            return value.strftime("%Y-%m-%d %H:%M") if value else "-"
+        
+        def load_roster(event=None):
+            for widget in roster_frame.winfo_children():
+                widget.destroy()
+            entries.clear()
+            
+            course = courses[course_combo.current()]
+            ttk.Label(roster_frame, text="Loading roster...").pack()
+            # Picking another course supersedes a roster still loading
+            self.tasks.submit(
+                lambda db: db.get_course_roster(course['id'], (course['academic_year'], course['semester'])),
+                on_success=show_roster,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to load roster"),
+                key='roster-load',
+                replace=True,
+                owner=roster_frame
+            )
+        
+        def show_roster(enrollments):
+            for widget in roster_frame.winfo_children():
+                widget.destroy()
+            if not enrollments:
+                ttk.Label(roster_frame, text="No students enrolled in this course.").pack()
+                return
             
-            course_query = "SELECT id FROM courses WHERE course_code = %s"
-            course_result = self.db.db.execute_query(course_query, (course_code,))
+            table_frame = ttk.Frame(roster_frame)
+            table_frame.pack()
+            for i, header in enumerate(['Student ID', 'Name', 'Current', 'Last Modified', 'Score (0-100)']):
+                ttk.Label(
+                    table_frame,
+                    text=header,
+                    font=("Segoe UI", 10, "bold")
+                ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
             
-            if not student_result or not course_result:
-                messagebox.showerror("Error", "Invalid student ID or course code")
+            for i, enrollment in enumerate(enrollments, 1):
+                ttk.Label(table_frame, text=enrollment['student_id']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
+                ttk.Label(table_frame, text=enrollment['full_name']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
+                current = ttk.Label(table_frame, text=format_roster_score(enrollment))
+                current.grid(row=i, column=2, padx=5, pady=2, sticky='w')
+                modified = ttk.Label(table_frame, text=format_roster_time(enrollment['updated_at']))
+                modified.grid(row=i, column=3, padx=5, pady=2, sticky='w')
+                entry = ttk.Entry(table_frame, width=8)
+                entry.grid(row=i, column=4, padx=5, pady=2, sticky='w')
+                entries[enrollment['student_db_id']] = (entry, enrollment, current, modified)
+        
+        def submit_roster():
+            if course_combo.current() < 0:
+                messagebox.showerror("Error", "Please select a course")
+                return
+            course = courses[course_combo.current()]
+            scores = [(student_id, widgets[0].get().strip()) for student_id, widgets in entries.items() if widgets[0].get().strip()]
+            if not scores:
+                messagebox.showerror("Error", "Enter at least one score")
                 return
             
-            student_id = student_result[0]['id']
-            course_id = course_result[0]['id']
             staff_id = self.current_user['id']
+            # The roster may be reloaded while this saves
+            saved_entries = dict(entries)
+            self.tasks.submit(
+                lambda db: db.record_scores_bulk(
+                    course['id'],
+                    (course['academic_year'], course['semester']),
+                    scores,
+                    staff_id
+                ),
+                on_success=lambda result: roster_saved(result, saved_entries),
+                on_error=lambda error: roster_saved(None, saved_entries),
+                key='roster-save',
+                busy=[save_button],
+                owner=roster_frame
+            )
+        
+        def roster_saved(result, saved_entries):
+            if result is None:
+                messagebox.showerror("Error", "Failed to record scores")
+                return
             
-            if self.db.record_student_score(student_id, course_id, staff_id, academic_year, semester, score):
-                messagebox.showinfo("Success", "Score recorded successfully!")
-                # Clear form
-                student_entry.delete(0, tk.END)
-                course_entry.delete(0, tk.END)
-                year_entry.delete(0, tk.END)
-                semester_var.set('')
-                score_entry.delete(0, tk.END)
+            for record in result['recorded']:
+                entry, _, current, modified = saved_entries[record['student_id']]
+                if entry.winfo_exists():
+                    entry.delete(0, tk.END)
+                    current.config(text=format_roster_score(record))
+                    modified.config(text=format_roster_time(datetime.now()))
+            message = f"Recorded {len(result['recorded'])} score(s)."
+            if result['invalid']:
+                problems = [f"{saved_entries[e['student_id']][1]['student_id']}: {e['error']}" for e in result['invalid']]
+                messagebox.showwarning("Some scores were rejected", message + "\n\n" + "\n".join(problems))
             else:
-                messagebox.showerror("Error", "Failed to record score")
+                messagebox.showinfo("Success", message)
         
-        ttk.Button(
+        course_combo.bind("<<ComboboxSelected>>", load_roster)
+        
+        save_button = ttk.Button(
             form_frame,
-            text="Record Score",
+            text="Save All Scores",
             bootstyle="success",
-            command=submit_score
-        ).pack(pady=20)
+            command=submit_roster
+        )
+        save_button.pack(pady=20)
     
     def show_academic_records(self):
         """Show academic records interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('academic-records', self.build_academic_records)
+    
+    def build_academic_records(self, parent):
+        """Build academic records interface"""
         # Create academic records frame
-        records_frame = ttk.Frame(self.main_container)
+        records_frame = ttk.Frame(parent)
         records_frame.pack(fill='both', expand=True)
         
         # Header
@@ -1886,66 +2077,36 @@ Login Instructions:
     def show_records_summary(self):
         """Show academic records summary"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        # Get all academic records
-        query = """
-        SELECT ar.*, s.full_name as student_name, c.course_name, st.full_name as staff_name
-        FROM academic_records ar
-        JOIN students s ON ar.student_id = s.id
-        JOIN courses c ON ar.course_id = c.id
-        JOIN staff st ON ar.staff_id = st.id
-        ORDER BY ar.recorded_at DESC
-        """
-        records = self.db.db.execute_query(query)
-        
-        if not records:
-            ttk.Label(
-                self.content_frame,
-                text="No academic records found",
-                font=("Segoe UI", 12)
-            ).pack(expand=True)
-            return
-        
-        # Create table
-        table_frame = ttk.Frame(self.content_frame)
-        table_frame.pack(fill='both', expand=True)
+        self.clear_content()
         
-        # Table headers
-        headers = ['Student', 'Course', 'Score', 'Grade', 'GPA Points', 'Academic Year', 'Semester']
-        for i, header in enumerate(headers):
-            ttk.Label(
-                table_frame,
-                text=header,
-                font=("Segoe UI", 10, "bold")
-            ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-        
-        # Table data
-        for i, record in enumerate(records, 1):
-            ttk.Label(table_frame, text=record['student_name']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['course_name']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['score']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['grade']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['gpa_points']).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['academic_year']).grid(row=i, column=5, padx=5, pady=2, sticky='w')
-            ttk.Label(table_frame, text=record['semester']).grid(row=i, column=6, padx=5, pady=2, sticky='w')
-        
-        # Summary
-        ttk.Label(
+        # Most recent first; rows are fetched a page at a time as the table scrolls
+        VirtualTable(
             self.content_frame,
-            text=f"Total academic records: {len(records)}",
-            font=("Segoe UI", 10, "italic")
-        ).pack(pady=10)
+            columns=[
+                ('student_name', 'Student', 200),
+                ('course_name', 'Course', 200),
+                ('score', 'Score', 70),
+                ('grade', 'Grade', 70),
+                ('gpa_points', 'GPA Points', 90),
+                ('academic_year', 'Academic Year', 110),
+                ('semester', 'Semester', 130)
+            ],
+            fetch_page=StudentResultsDB.get_academic_records_page,
+            sort_keys=RECORD_SORT_KEYS,
+            sort='recorded_at',
+            descending=True,
+            empty_text="No academic records found",
+            watch=('academic_records',)
+        ).pack(fill='both', expand=True)
     
     def show_student_dashboard(self):
         """Show enhanced student dashboard"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('student-dashboard', self.build_student_dashboard)
+    
+    def build_student_dashboard(self, parent):
+        """Build enhanced student dashboard"""
         # Create student dashboard frame with enhanced styling
-        dashboard_frame = ttk.Frame(self.main_container)
+        dashboard_frame = ttk.Frame(parent)
         dashboard_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Enhanced header with better spacing
@@ -2005,12 +2166,12 @@ Login Instructions:
     
     def show_student_grades(self):
         """Show student grades"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('student-grades', self.build_student_grades)
+    
+    def build_student_grades(self, parent):
+        """Build student grades"""
         # Create grades frame
-        grades_frame = ttk.Frame(self.main_container)
+        grades_frame = ttk.Frame(parent)
         grades_frame.pack(fill='both', expand=True)
         
         # Header
@@ -2038,54 +2199,32 @@ Login Instructions:
         # Get student grades
         if self.current_user:
             student_id = self.current_user['id']
-            records = self.db.get_student_academic_record(student_id)
-            
-            if not records:
-                ttk.Label(
-                    self.content_frame,
-                    text="No grades found for you yet.",
-                    font=("Segoe UI", 12)
-                ).pack(expand=True)
-                return
-            
-            # Create table
-            table_frame = ttk.Frame(self.content_frame)
-            table_frame.pack(fill='both', expand=True)
-            
-            # Table headers
-            headers = ['Course', 'Score', 'Grade', 'GPA Points', 'Credits', 'Academic Year', 'Semester']
-            for i, header in enumerate(headers):
-                ttk.Label(
-                    table_frame,
-                    text=header,
-                    font=("Segoe UI", 10, "bold")
-                ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-            
-            # Table data
-            for i, record in enumerate(records, 1):
-                ttk.Label(table_frame, text=record['course_name']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['score']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['grade']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['gpa_points']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['credits']).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['academic_year']).grid(row=i, column=5, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=record['semester']).grid(row=i, column=6, padx=5, pady=2, sticky='w')
-            
-            # Summary
-            ttk.Label(
+            grades_table = VirtualTable(
                 self.content_frame,
-                text=f"Total grades: {len(records)}",
-                font=("Segoe UI", 10, "italic")
-            ).pack(pady=10)
+                columns=[
+                    ('course_name', 'Course', 240),
+                    ('score', 'Score', 70),
+                    ('grade', 'Grade', 70),
+                    ('gpa_points', 'GPA Points', 90),
+                    ('credits', 'Credits', 70),
+                    ('academic_year', 'Academic Year', 110),
+                    ('semester', 'Semester', 130)
+                ],
+                empty_text="No grades found for you yet.",
+                watch=('academic_records', 'courses'),
+                watch_match={'student_id': student_id}
+            )
+            grades_table.pack(fill='both', expand=True)
+            grades_table.load_rows(lambda db: db.get_student_academic_record(student_id))
     
     def show_student_gpa(self):
         """Show student GPA"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('student-gpa', self.build_student_gpa)
+    
+    def build_student_gpa(self, parent):
+        """Build student GPA"""
         # Create GPA frame
-        gpa_frame = ttk.Frame(self.main_container)
+        gpa_frame = ttk.Frame(parent)
         gpa_frame.pack(fill='both', expand=True)
         
         # Header
@@ -2110,42 +2249,83 @@ Login Instructions:
         self.content_frame = ttk.Frame(gpa_frame)
         self.content_frame.pack(fill='both', expand=True, pady=20)
         
+        # Show GPA
+        self.show_gpa_summary()
+    
+    def show_gpa_summary(self):
+        """Show the current student's cumulative and per-term GPA"""
+        # Clear content frame; the GPA is reloaded on every visit
+        self.clear_content(refresh=self.show_gpa_summary)
+        
         # Get student GPA
         if self.current_user:
             student_id = self.current_user['id']
-            gpa = self.db.calculate_student_gpa(student_id)
-            
-            # Create GPA display
             gpa_display = ttk.Frame(self.content_frame)
             gpa_display.pack(expand=True)
             
-            ttk.Label(
-                gpa_display,
-                text="Your Cumulative GPA",
-                font=("Segoe UI", 16, "bold")
-            ).pack(pady=20)
-            
-            ttk.Label(
-                gpa_display,
-                text=f"{gpa:.2f}",
-                font=("Segoe UI", 48, "bold"),
-                bootstyle="success"
-            ).pack(pady=20)
+            def show_gpa(summary):
+                if summary is None:
+                    messagebox.showerror("Error", "Failed to load GPA")
+                    return
+                gpa = summary['cumulative']
+                
+                ttk.Label(
+                    gpa_display,
+                    text="Your Cumulative GPA",
+                    font=("Segoe UI", 16, "bold")
+                ).pack(pady=20)
+                
+                ttk.Label(
+                    gpa_display,
+                    text=f"{gpa:.2f}",
+                    font=("Segoe UI", 48, "bold"),
+                    bootstyle="success"
+                ).pack(pady=20)
+                
+                ttk.Label(
+                    gpa_display,
+                    text="(4.0 Scale)",
+                    font=("Segoe UI", 12, "italic")
+                ).pack(pady=10)
+                
+                # Per-term breakdown from the same lookup
+                for term in summary['terms']:
+                    ttk.Label(
+                        gpa_display,
+                        text=f"{term['academic_year']} {term['semester']}: {term['gpa']:.2f} ({term['total_credits']} credits)",
+                        font=("Segoe UI", 11)
+                    ).pack(pady=2)
+            
+            self.tasks.submit(
+                lambda db: db.get_student_gpa_summary(student_id),
+                on_success=show_gpa,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to load GPA"),
+                key='student-gpa',
+                replace=True,
+                owner=gpa_display
+            )
             
-            ttk.Label(
-                gpa_display,
-                text="(4.0 Scale)",
-                font=("Segoe UI", 12, "italic")
-            ).pack(pady=10)
+            def on_changes(changes):
+                # Reload while on screen; a revisit reloads it otherwise
+                if gpa_display.winfo_ismapped():
+                    self.show_gpa_summary()
+            
+            # Only this student's records change their GPA
+            self.changes.subscribe(
+                on_changes,
+                tables=('academic_records',),
+                match={'student_id': student_id},
+                owner=gpa_display
+            )
     
     def show_student_courses(self):
         """Show student enrolled courses"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('student-courses', self.build_student_courses)
+    
+    def build_student_courses(self, parent):
+        """Build student enrolled courses"""
         # Create courses frame
-        courses_frame = ttk.Frame(self.main_container)
+        courses_frame = ttk.Frame(parent)
         courses_frame.pack(fill='both', expand=True)
         
         # Header
@@ -2173,53 +2353,32 @@ Login Instructions:
         # Get student enrollments
         if self.current_user:
             student_id = self.current_user['id']
-            enrollments = self.db.get_student_enrollments(student_id)
-            
-            if not enrollments:
-                ttk.Label(
-                    self.content_frame,
-                    text="You are not enrolled in any courses yet.",
-                    font=("Segoe UI", 12)
-                ).pack(expand=True)
-                return
-            
-            # Create table
-            table_frame = ttk.Frame(self.content_frame)
-            table_frame.pack(fill='both', expand=True)
-            
-            # Table headers
-            headers = ['Course Code', 'Course Name', 'Credits', 'Academic Year', 'Semester', 'Enrollment Date']
-            for i, header in enumerate(headers):
-                ttk.Label(
-                    table_frame,
-                    text=header,
-                    font=("Segoe UI", 10, "bold")
-                ).grid(row=0, column=i, padx=5, pady=5, sticky='w')
-            
-            # Table data
-            for i, enrollment in enumerate(enrollments, 1):
-                ttk.Label(table_frame, text=enrollment['course_code']).grid(row=i, column=0, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=enrollment['course_name']).grid(row=i, column=1, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=enrollment['credits']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=enrollment['academic_year']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=enrollment['semester']).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-                ttk.Label(table_frame, text=str(enrollment['enrollment_date'])[:10]).grid(row=i, column=5, padx=5, pady=2, sticky='w')
-            
-            # Summary
-            ttk.Label(
+            courses_table = VirtualTable(
                 self.content_frame,
-                text=f"Total enrolled courses: {len(enrollments)}",
-                font=("Segoe UI", 10, "italic")
-            ).pack(pady=10)
+                columns=[
+                    ('course_code', 'Course Code', 110),
+                    ('course_name', 'Course Name', 240),
+                    ('credits', 'Credits', 70),
+                    ('academic_year', 'Academic Year', 110),
+                    ('semester', 'Semester', 130),
+                    ('enrollment_date', 'Enrollment Date', 120)
+                ],
+                empty_text="You are not enrolled in any courses yet.",
+                formatters={'enrollment_date': lambda value: str(value)[:10]},
+                watch=('enrollments', 'courses'),
+                watch_match={'student_id': student_id}
+            )
+            courses_table.pack(fill='both', expand=True)
+            courses_table.load_rows(lambda db: db.get_student_enrollments(student_id))
     
     def show_course_enrollment(self):
         """Show course enrollment interface"""
-        # Clear main container
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
+        self.show_screen('course-enrollment', self.build_course_enrollment)
+    
+    def build_course_enrollment(self, parent):
+        """Build course enrollment interface"""
         # Create enrollment frame
-        enrollment_frame = ttk.Frame(self.main_container)
+        enrollment_frame = ttk.Frame(parent)
         enrollment_frame.pack(fill='both', expand=True)
         
         # Header
@@ -2257,8 +2416,7 @@ Login Instructions:
     def show_enrollment_form(self):
         """Show form to enroll in courses"""
         # Clear content frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.clear_content(refresh=self.show_enrollment_form)
         
         # Create form
         form_frame = ttk.Frame(self.content_frame)
@@ -2270,8 +2428,24 @@ Login Instructions:
             font=("Segoe UI", 16, "bold")
         ).pack(pady=20)
         
-        # Get available courses
-        courses = self.db.get_all_courses()
+        loading = ttk.Label(form_frame, text="Loading courses...")
+        loading.pack()
+        student_id = self.current_user['id']
+        self.tasks.submit(
+            lambda db: (db.get_all_courses(), db.get_student_enrollments(student_id)),
+            on_success=lambda result: self.build_enrollment_form(form_frame, *result),
+            on_error=lambda error: messagebox.showerror("Error", "Failed to load courses"),
+            key='enrollment-form',
+            replace=True,
+            owner=loading
+        )
+    
+    def build_enrollment_form(self, form_frame, courses, enrollments):
+        """Build the enrollment form once the courses and the student's enrollments have loaded"""
+        # Keep the title, drop the loading label
+        for widget in form_frame.winfo_children()[1:]:
+            widget.destroy()
+        
         if not courses:
             ttk.Label(
                 form_frame,
@@ -2320,48 +2494,47 @@ Login Instructions:
                 messagebox.showerror("Error", "All fields are required")
                 return
             
-            # Extract course code from selection
-            course_code = selected_course.split(" - ")[0]
-            
-            # Get course ID
-            course_query = "SELECT id FROM courses WHERE course_code = %s"
-            course_result = self.db.db.execute_query(course_query, (course_code,))
-            
-            if not course_result:
-                messagebox.showerror("Error", "Invalid course selection")
-                return
-            
-            course_id = course_result[0]['id']
+            # The combo box lists courses in loaded order
+            course_id = courses[course_combo.current()]['id']
             student_id = self.current_user['id']
             
-            # Check if already enrolled
-            enrollment_query = """
-            SELECT * FROM enrollments 
-            WHERE student_id = %s AND course_id = %s AND academic_year = %s AND semester = %s
-            """
-            existing = self.db.db.execute_query(enrollment_query, (student_id, course_id, academic_year, semester))
-            
-            if existing:
-                messagebox.showerror("Error", "You are already enrolled in this course for the specified period")
-                return
-            
-            # Enroll student
-            if self.db.enroll_student(student_id, course_id, academic_year, semester):
-                messagebox.showinfo("Success", "Successfully enrolled in the course!")
-                # Clear form
-                course_var.set("")
-                year_entry.delete(0, tk.END)
-                year_entry.insert(0, "2024")
-                semester_var.set("")
-            else:
-                messagebox.showerror("Error", "Failed to enroll in course")
+            def enrolled(status):
+                if status in ('enrolled', 'waitlisted', 'queued'):
+                    if status == 'enrolled':
+                        messagebox.showinfo("Success", "Successfully enrolled in the course!")
+                    elif status == 'queued':
+                        messagebox.showinfo("Success", "Enrollment request received. It will be confirmed shortly.")
+                    else:
+                        messagebox.showinfo(
+                            "Waitlisted",
+                            "The course is full. You have been added to the waitlist and will be "
+                            "enrolled automatically when a seat becomes available."
+                        )
+                    # Refresh the enrollment list
+                    self.show_enrollment_form()
+                elif status == 'duplicate':
+                    messagebox.showerror("Error", "You are already enrolled or waitlisted in this course for the specified period")
+                else:
+                    messagebox.showerror("Error", "Failed to enroll in course")
+            
+            # Enroll student; the seat claim and insert are one statement,
+            # so a repeat click can't enroll twice
+            self.tasks.submit(
+                lambda db: db.enroll_student(student_id, course_id, academic_year, semester),
+                on_success=enrolled,
+                on_error=lambda error: messagebox.showerror("Error", "Failed to enroll in course"),
+                key='enroll',
+                busy=[enroll_button],
+                owner=form_frame
+            )
         
-        ttk.Button(
+        enroll_button = ttk.Button(
             form_frame,
             text="Enroll in Course",
             bootstyle="success",
             command=submit_enrollment
-        ).pack(pady=20)
+        )
+        enroll_button.pack(pady=20)
         
         # Show current enrollments
         ttk.Separator(form_frame, orient='horizontal').pack(fill='x', pady=20)
@@ -2372,10 +2545,8 @@ Login Instructions:
             font=("Segoe UI", 14, "bold")
         ).pack(pady=10)
         
-        # Get current enrollments
         if self.current_user:
             student_id = self.current_user['id']
-            enrollments = self.db.get_student_enrollments(student_id)
             
             if not enrollments:
                 ttk.Label(
@@ -2390,24 +2561,38 @@ Login Instructions:
                     enrollment_frame.pack(fill='x', pady=2)
                     
                     enrollment_text = f"{enrollment['course_code']} - {enrollment['course_name']} ({enrollment['academic_year']}, {enrollment['semester']})"
+                    if enrollment['status'] != 'enrolled':
+                        enrollment_text += f" - {enrollment['status'].capitalize()}"
                     ttk.Label(
                         enrollment_frame,
                         text=enrollment_text,
                         font=("Segoe UI", 10)
                     ).pack(side='left', padx=(0, 10))
                     
-                    def unenroll_course(course_id=enrollment['course_id'], 
-                                      academic_year=enrollment['academic_year'], 
-                                      semester=enrollment['semester']):
+                    def unenroll_course(enrollment=enrollment, enrollment_frame=enrollment_frame):
                         """Unenroll from a specific course"""
-                        if messagebox.askyesno("Confirm Unenrollment", 
-                                             f"Are you sure you want to unenroll from {enrollment['course_code']} - {enrollment['course_name']}?"):
-                            if self.db.unenroll_student(student_id, course_id, academic_year, semester):
+                        if not messagebox.askyesno("Confirm Unenrollment", 
+                                                   f"Are you sure you want to unenroll from {enrollment['course_code']} - {enrollment['course_name']}?"):
+                            return
+                        
+                        def unenrolled(success):
+                            if success:
                                 messagebox.showinfo("Success", "Successfully unenrolled from the course!")
                                 # Refresh the enrollment list
                                 self.show_enrollment_form()
                             else:
                                 messagebox.showerror("Error", "Failed to unenroll from course")
+                        
+                        self.tasks.submit(
+                            lambda db: db.unenroll_student(
+                                student_id, enrollment['course_id'], enrollment['academic_year'], enrollment['semester']
+                            ),
+                            on_success=unenrolled,
+                            on_error=lambda error: messagebox.showerror("Error", "Failed to unenroll from course"),
+                            key='unenroll',
+                            busy=enrollment_frame.winfo_children(),
+                            owner=form_frame
+                        )
                     
                     ttk.Button(
                         enrollment_frame,
@@ -2425,11 +2610,14 @@ Login Instructions:
                 self.current_user = None
                 self.user_type = None
                 messagebox.showinfo("Logged Out", "You have been successfully logged out.")
+                # Cached screens hold the last user's data
+                self.screens.clear()
                 self.show_login_screen()
         else:
             self.auth_manager.logout()
             self.current_user = None
             self.user_type = None
+            self.screens.clear()
             self.show_login_screen()
     
     def run(self):
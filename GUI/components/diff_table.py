@@ -0,0 +1,96 @@
+import bisect
+
+
+class DiffTable:
+    """
+    Keep a Treeview in step with keyed rows by touching only what changed
+
+    Each row becomes the item whose iid is row[key], placed in order(row)
+    order. Applying a batch of changed rows inserts, updates or moves just
+    those items, so editing one record rewrites one line of the table:
+
+        rows = DiffTable(tree, 'index_number', values=lambda r: (...),
+                         order=lambda r: r['full_name'])
+        rows.apply(changes['rows'], changes['deleted'])
+
+    The table must only hold items added through the DiffTable.
+    """
+
+    def __init__(self, tree, key, values, order):
+        self.tree = tree
+        self.key = key
+        self.values = values
+        self.order = order
+        self._order = []
+        self._entries = {}
+        self._values = {}
+
+    def apply(self, rows, deleted=(), full=False):
+        """
+        Apply changed rows and removed keys to the table
+
+        Args:
+            rows (list): Inserted or updated rows
+            deleted (iterable): Keys of rows that no longer exist
+            full (bool): rows is the complete set; anything else is removed
+
+        Returns:
+            int: Number of items inserted, updated, moved or removed
+        """
+        if full:
+            keep = {str(row[self.key]) for row in rows}
+            deleted = [iid for iid in self._entries if iid not in keep]
+
+        touched = 0
+        for key in deleted:
+            iid = str(key)
+            if iid in self._entries:
+                self._unlink(iid)
+                del self._values[iid]
+                self.tree.delete(iid)
+                touched += 1
+
+        for row in rows:
+            iid = str(row[self.key])
+            entry = (self.order(row), iid)
+            values = tuple(self.values(row))
+            if iid not in self._entries:
+                position = self._link(iid, entry)
+                self.tree.insert('', position, iid=iid, values=values)
+                self._values[iid] = values
+                touched += 1
+                continue
+            changed = False
+            if entry != self._entries[iid]:
+                self._unlink(iid)
+                self.tree.move(iid, '', self._link(iid, entry))
+                changed = True
+            if values != self._values[iid]:
+                self.tree.item(iid, values=values)
+                self._values[iid] = values
+                changed = True
+            touched += changed
+        return touched
+
+    def clear(self):
+        """Remove every item"""
+        self.tree.delete(*self._entries)
+        self._order = []
+        self._entries = {}
+        self._values = {}
+
+    def __contains__(self, key):
+        return str(key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _link(self, iid, entry):
+        position = bisect.bisect_left(self._order, entry)
+        self._order.insert(position, entry)
+        self._entries[iid] = entry
+        return position
+
+    def _unlink(self, iid):
+        entry = self._entries.pop(iid)
+        del self._order[bisect.bisect_left(self._order, entry)]
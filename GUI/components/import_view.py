@@ -1,19 +1,26 @@
+import threading
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
-from utils.file_handler import read_student_data
-from database.operations import StudentResultsDB
+from utils.file_handler import ImportErrorCollector
+from GUI.services.task_runner import get_task_runner
 
 class ImportView(tb.Frame):
     def __init__(self, parent):
         super().__init__(parent)
-        self.db = StudentResultsDB()
-        self.db.connect()
+        self.tasks = get_task_runner(self)
+        self.import_task = None
+        self.stop_import = None
         self.create_widgets()
 
     def create_widgets(self):
         tb.Label(self, text='Import Students from File', font=('Segoe UI', 18, 'bold')).pack(pady=20)
-        tb.Button(self, text='Select File', bootstyle=PRIMARY, command=self.import_file).pack(pady=10)
+        self.select_button = tb.Button(self, text='Select File', bootstyle=PRIMARY, command=self.import_file)
+        self.select_button.pack(pady=10)
+        self.update_existing = tb.BooleanVar(value=False)
+        tb.Checkbutton(self, text='Update existing records', variable=self.update_existing,
+                       bootstyle='round-toggle').pack(pady=5)
+        self.cancel_button = tb.Button(self, text='Cancel Import', bootstyle=DANGER, command=self.cancel_import)
         self.summary_label = tb.Label(self, text='', font=('Segoe UI', 12))
         self.summary_label.pack(pady=10)
 
@@ -21,33 +28,71 @@ class ImportView(tb.Frame):
         file_path = filedialog.askopenfilename(filetypes=[('CSV/TXT Files', '*.csv *.txt')])
         if not file_path:
             return
-        students = read_student_data(file_path)
-        if not students:
-            messagebox.showerror('Import Error', 'No valid student data found in file.')
+        # Parsing is pipelined into the COPY stream, so rows are written
+        # while the rest of the file is still being read (large files are
+        # split across worker processes); all of it runs on a background
+        # worker so the window stays responsive
+        errors = ImportErrorCollector()
+        self.stop_import = threading.Event()
+        stop = self.stop_import
+        on_conflict = 'update' if self.update_existing.get() else 'skip'
+        self.summary_label.config(text='Importing...')
+        self.cancel_button.pack(pady=5)
+        self.import_task = self.tasks.submit(
+            lambda db: db.import_students_file(file_path, on_conflict, errors, should_stop=stop.is_set),
+            on_success=lambda result: self.import_finished(result, errors),
+            on_error=self.import_failed,
+            key='import-file',
+            busy=[self.select_button],
+            owner=self
+        )
+
+    def import_finished(self, result, errors):
+        self.import_task = None
+        self.cancel_button.pack_forget()
+        if result['already_imported']:
+            self.summary_label.config(text='')
+            messagebox.showinfo('Import Summary', 'This file has already been imported; nothing was changed.')
+            return
+        if result['cancelled']:
+            self.summary_label.config(text='Import cancelled. Import the file again to resume.')
+            return
+        if result['failed']:
+            # Rows committed by earlier batches are kept; show why the rest weren't
+            failures = [detail['message'] for detail in result['error_details'] if detail['record'] is None]
+            self.summary_label.config(text='Import failed.')
+            messagebox.showerror('Import Error', '\n'.join(failures) or 'Import failed.')
             return
-        success_count = 0
-        duplicate_count = 0
-        error_count = 0
-        for student in students:
-            try:
-                if self.db.student_exists(student['index_number']):
-                    duplicate_count += 1
-                    continue
-                if self.db.insert_student(
-                    student['index_number'],
-                    student['full_name'],
-                    student['course'],
-                    student['score']
-                ):
-                    success_count += 1
-                else:
-                    error_count += 1
-            except Exception as e:
-                error_count += 1
-        summary = f"Import complete!\nSuccessfully inserted: {success_count}\nDuplicates skipped: {duplicate_count}\nErrors: {error_count}"
+        if not result['resumed_from'] and not result['inserted'] and not result['updated'] and not result['skipped']:
+            self.summary_label.config(text='')
+            # Show the first few reasons, e.g. the file was not found
+            lines = ['No valid student data found in file.'] + [detail['message'] for detail in errors.details[:5]]
+            messagebox.showerror('Import Error', '\n'.join(lines))
+            return
+        success_count = result['inserted']
+        skipped_count = result['skipped'] + result['duplicates']
+        error_count = result['errors'] + errors.count
+        summary = (f"Import complete!\nSuccessfully inserted: {success_count}\nUpdated: {result['updated']}\n"
+                   f"Duplicates skipped: {skipped_count}\nErrors: {error_count}")
+        if result['resumed_from']:
+            summary += f"\n(Resumed an earlier import at byte {result['resumed_from']:,})"
         self.summary_label.config(text=summary)
         messagebox.showinfo('Import Summary', summary)
 
-    def destroy(self):
-        self.db.close()
-        super().destroy() 
\ No newline at end of file
+    def import_failed(self, error):
+        self.import_task = None
+        self.cancel_button.pack_forget()
+        self.summary_label.config(text='')
+        messagebox.showerror('Import Error', f'Import failed: {error}')
+
+    def cancel_import(self):
+        # Cancelling stops the COPY on the server (or the worker processes
+        # of a parallel import); batches already committed are kept and a
+        # later import of the same file resumes after them
+        if self.stop_import is not None:
+            self.stop_import.set()
+        if self.import_task is not None:
+            self.import_task.cancel()
+            self.import_task = None
+        self.cancel_button.pack_forget()
+        self.summary_label.config(text='Import cancelled. Import the file again to resume.')
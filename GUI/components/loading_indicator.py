@@ -0,0 +1,55 @@
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+# Don't flash the indicator for work that finishes this quickly
+SHOW_DELAY_MS = 200
+
+
+class LoadingIndicator(tb.Frame):
+    """Status strip with a running progress bar shown while a TaskRunner is busy"""
+
+    def __init__(self, parent, runner, text="Loading..."):
+        super().__init__(parent)
+        self.runner = runner
+        self._pending_show = None
+        self._shown = False
+
+        self.progress = tb.Progressbar(self, mode='indeterminate', bootstyle=INFO, length=160)
+        self.progress.pack(side='right', padx=10, pady=4)
+        self.label = tb.Label(self, text=text, font=("Segoe UI", 9))
+        self.label.pack(side='right')
+
+        runner.add_busy_listener(self.set_busy)
+
+    def set_busy(self, busy):
+        """Show the strip shortly after work starts and hide it when it ends"""
+        if busy:
+            if not self._shown and self._pending_show is None:
+                self._pending_show = self.after(SHOW_DELAY_MS, self._show)
+            return
+        if self._pending_show is not None:
+            self.after_cancel(self._pending_show)
+            self._pending_show = None
+        if self._shown:
+            self.progress.stop()
+            self.pack_forget()
+            self._shown = False
+
+    def destroy(self):
+        self.runner.remove_busy_listener(self.set_busy)
+        if self._pending_show is not None:
+            self.after_cancel(self._pending_show)
+            self._pending_show = None
+        super().destroy()
+
+    def _show(self):
+        self._pending_show = None
+        if self.runner.busy:
+            # Pack ahead of the other widgets so it keeps its height when space is short
+            siblings = [w for w in self.master.pack_slaves() if w is not self]
+            if siblings:
+                self.pack(side='bottom', fill='x', before=siblings[0])
+            else:
+                self.pack(side='bottom', fill='x')
+            self.progress.start(15)
+            self._shown = True
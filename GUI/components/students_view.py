@@ -1,16 +1,23 @@
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from database.operations import StudentResultsDB
+from GUI.services.task_runner import get_task_runner
+from GUI.services.change_feed import get_change_feed
+from GUI.components.diff_table import DiffTable
 from utils.grade_calculator import validate_score
 from tkinter import messagebox, simpledialog
 
 class StudentsView(tb.Frame):
     def __init__(self, parent):
         super().__init__(parent)
-        self.db = StudentResultsDB()
-        self.db.connect()
+        # Database work goes through the shared workers rather than a
+        # connection of our own
+        self.tasks = get_task_runner(self)
+        # Cursor from the last refresh; later refreshes fetch only what changed
+        self.cursor = None
         self.create_widgets()
         self.refresh_table()
+        # Edits from other sessions arrive as notices and are applied as a diff
+        get_change_feed(self).subscribe(self.on_changes, tables=('student_results',), owner=self)
 
     def create_widgets(self):
         tb.Label(self, text='Students', font=('Segoe UI', 18, 'bold')).pack(pady=10)
@@ -21,6 +28,11 @@ class StudentsView(tb.Frame):
             self.table.heading(col, text=col.replace('_', ' ').title())
             self.table.column(col, width=120, anchor='center')
         self.table.pack(pady=10, padx=10, fill='x')
+        self.rows = DiffTable(
+            self.table, 'index_number',
+            values=lambda s: (s['index_number'], s['full_name'], s['course'], s['score'], s['grade']),
+            order=lambda s: s['full_name']
+        )
         # Buttons
         btn_frame = tb.Frame(self)
         btn_frame.pack(pady=10)
@@ -30,20 +42,35 @@ class StudentsView(tb.Frame):
         tb.Button(btn_frame, text='Refresh', bootstyle=SECONDARY, command=self.refresh_table).pack(side='left', padx=5)
 
     def refresh_table(self):
-        for row in self.table.get_children():
-            self.table.delete(row)
-        students = self.db.get_all_students() or []
-        for student in students:
-            self.table.insert('', 'end', values=(student['index_number'], student['full_name'], student['course'], student['score'], student['grade']))
+        # Load off the Tk thread; a newer refresh replaces one still running
+        since = self.cursor
+        self.tasks.submit(
+            lambda db: db.get_students_changed_since(since),
+            on_success=lambda changes: self.apply_changes(changes, full=since is None),
+            key=('students-view', id(self)),
+            replace=True,
+            owner=self
+        )
+
+    def on_changes(self, changes):
+        # Hidden views catch up when they are shown again
+        if self.winfo_ismapped():
+            self.refresh_table()
+
+    def refresh_data(self):
+        self.refresh_table()
+
+    def apply_changes(self, changes, full=False):
+        if changes is None:
+            return
+        self.rows.apply(changes['rows'], changes['deleted'], full=full)
+        self.cursor = changes['cursor']
 
     def add_student(self):
         # Simple dialogs for input
         index_number = simpledialog.askstring('Index Number', 'Enter index number:')
         if not index_number:
             return
-        if self.db.student_exists(index_number):
-            messagebox.showerror('Error', f'Student {index_number} already exists.')
-            return
         full_name = simpledialog.askstring('Full Name', 'Enter full name:')
         if not full_name:
             return
@@ -54,42 +81,55 @@ class StudentsView(tb.Frame):
         if not validate_score(score):
             messagebox.showerror('Error', 'Invalid score. Please enter a number between 0 and 100.')
             return
-        if self.db.insert_student(index_number, full_name, course, int(score)):
-            messagebox.showinfo('Success', 'Student added successfully!')
-            self.refresh_table()
-        else:
-            messagebox.showerror('Error', 'Failed to add student.')
+
+        def add(db):
+            record = {'index_number': index_number, 'full_name': full_name, 'course': course, 'score': int(score)}
+            return db.upsert_students([record])
+
+        def added(result):
+            if result['skipped']:
+                messagebox.showerror('Error', f'Student {index_number} already exists.')
+            elif result['inserted']:
+                messagebox.showinfo('Success', 'Student added successfully!')
+                self.refresh_table()
+            else:
+                messagebox.showerror('Error', 'Failed to add student.')
+
+        self.tasks.submit(add, on_success=added, owner=self)
 
     def update_score(self):
         selected = self.table.selection()
         if not selected:
             messagebox.showerror('Error', 'Select a student to update.')
             return
-        index_number = self.table.item(selected[0])['values'][0]
+        # Item ids are the index numbers, kept as strings
+        index_number = selected[0]
         new_score = simpledialog.askstring('Update Score', 'Enter new score (0-100):')
         if not validate_score(new_score):
             messagebox.showerror('Error', 'Invalid score. Please enter a number between 0 and 100.')
             return
-        if self.db.update_student_score(index_number, int(new_score)):
-            messagebox.showinfo('Success', f'Student {index_number} score updated!')
-            self.refresh_table()
-        else:
-            messagebox.showerror('Error', 'Failed to update score.')
+        def updated(ok):
+            if ok:
+                messagebox.showinfo('Success', f'Student {index_number} score updated!')
+                self.refresh_table()
+            else:
+                messagebox.showerror('Error', 'Failed to update score.')
+
+        self.tasks.submit(lambda db: db.update_student_score(index_number, int(new_score)), on_success=updated, owner=self)
 
     def delete_student(self):
         selected = self.table.selection()
         if not selected:
             messagebox.showerror('Error', 'Select a student to delete.')
             return
-        index_number = self.table.item(selected[0])['values'][0]
+        index_number = selected[0]
         confirm = messagebox.askyesno('Delete Student', f'Are you sure you want to delete student {index_number}?')
         if confirm:
-            if self.db.delete_student(index_number):
-                messagebox.showinfo('Success', 'Student deleted.')
-                self.refresh_table()
-            else:
-                messagebox.showerror('Error', 'Failed to delete student.')
+            def deleted(ok):
+                if ok:
+                    messagebox.showinfo('Success', 'Student deleted.')
+                    self.refresh_table()
+                else:
+                    messagebox.showerror('Error', 'Failed to delete student.')
 
-    def destroy(self):
-        self.db.close()
-        super().destroy() 
\ No newline at end of file
+            self.tasks.submit(lambda db: db.delete_student(index_number), on_success=deleted, owner=self) 
\ No newline at end of file
@@ -1,6 +1,9 @@
+from collections import Counter
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from database.operations import StudentResultsDB
+from GUI.services.task_runner import get_task_runner
+from GUI.services.change_feed import get_change_feed
+from GUI.components.diff_table import DiffTable
 from utils.grade_calculator import get_grade_description
 from utils.file_handler import write_summary_report
 from tkinter import messagebox
@@ -8,43 +11,87 @@ from tkinter import messagebox
 class SummaryView(tb.Frame):
     def __init__(self, parent):
         super().__init__(parent)
-        self.db = StudentResultsDB()
-        self.db.connect()
+        self.tasks = get_task_runner(self)
+        self.cursor = None
+        # Grade of every listed student by index number, kept in step with
+        # the table so the counts need no query of their own
+        self.grades = {}
         self.create_widgets()
+        self.load_summary()
+        # Edits from other sessions arrive as notices and are applied as a diff
+        get_change_feed(self).subscribe(self.on_changes, tables=('student_results',), owner=self)
 
     def create_widgets(self):
         tb.Label(self, text='Summary', font=('Segoe UI', 18, 'bold')).pack(pady=10)
-        total = self.db.get_total_students()
-        tb.Label(self, text=f'Total Students: {total}', font=('Segoe UI', 14)).pack(pady=5)
+        self.total_label = tb.Label(self, text='Total Students: ...', font=('Segoe UI', 14))
+        self.total_label.pack(pady=5)
         # Grade distribution
-        dist = self.db.get_grade_distribution() or []
-        dist_dict = {d['grade']: d['count'] for d in dist}
-        grades = ['A', 'B', 'C', 'D', 'F']
-        dist_str = '  '.join([f"{g}: {dist_dict.get(g, 0)}" for g in grades])
-        tb.Label(self, text=f'Grade Distribution: {dist_str}', font=('Segoe UI', 12)).pack(pady=5)
+        self.dist_label = tb.Label(self, text='Grade Distribution: ...', font=('Segoe UI', 12))
+        self.dist_label.pack(pady=5)
         # Download summary button
         tb.Button(self, text='Download Summary Report', bootstyle=PRIMARY, command=self.download_summary).pack(pady=10)
         # Table of students
         tb.Label(self, text='Student List', font=('Segoe UI', 14, 'bold')).pack(pady=(15, 5))
         columns = ('full_name', 'index_number', 'course', 'score', 'grade')
-        table = tb.Treeview(self, columns=columns, show='headings', height=10, bootstyle=PRIMARY)
+        self.table = tb.Treeview(self, columns=columns, show='headings', height=10, bootstyle=PRIMARY)
         for col in columns:
-            table.heading(col, text=col.replace('_', ' ').title())
-            table.column(col, width=120, anchor='center')
-        table.pack(pady=10, padx=10, fill='x')
-        students = self.db.get_all_students() or []
-        for student in students:
-            table.insert('', 'end', values=(student['full_name'], student['index_number'], student['course'], student['score'], f"{student['grade']} - {get_grade_description(student['grade'])}"))
+            self.table.heading(col, text=col.replace('_', ' ').title())
+            self.table.column(col, width=120, anchor='center')
+        self.table.pack(pady=10, padx=10, fill='x')
+        self.rows = DiffTable(
+            self.table, 'index_number',
+            values=lambda s: (s['full_name'], s['index_number'], s['course'], s['score'], f"{s['grade']} - {get_grade_description(s['grade'])}"),
+            order=lambda s: s['full_name']
+        )
+
+    def load_summary(self):
+        # Only the rows changed since the last load are fetched; the counts
+        # are worked out from the rows already held
+        since = self.cursor
+        self.tasks.submit(
+            lambda db: db.get_students_changed_since(since),
+            on_success=lambda changes: self.show_summary(changes, full=since is None),
+            key=('summary-view', id(self)),
+            replace=True,
+            owner=self
+        )
+
+    def on_changes(self, changes):
+        # Hidden views catch up when they are shown again
+        if self.winfo_ismapped():
+            self.load_summary()
+
+    def refresh_data(self):
+        self.load_summary()
+
+    def show_summary(self, changes, full=False):
+        if changes is None:
+            return
+        self.rows.apply(changes['rows'], changes['deleted'], full=full)
+        self.cursor = changes['cursor']
+        if full:
+            self.grades = {}
+        for index_number in changes['deleted']:
+            self.grades.pop(index_number, None)
+        for row in changes['rows']:
+            self.grades[row['index_number']] = row['grade']
+
+        self.total_label.config(text=f'Total Students: {len(self.grades)}')
+        dist_dict = Counter(self.grades.values())
+        grades = ['A', 'B', 'C', 'D', 'F']
+        dist_str = '  '.join([f"{g}: {dist_dict.get(g, 0)}" for g in grades])
+        self.dist_label.config(text=f'Grade Distribution: {dist_str}')
 
     def download_summary(self):
-        total = self.db.get_total_students()
-        dist = self.db.get_grade_distribution() or []
-        path = write_summary_report(total, dist)
-        if path:
-            messagebox.showinfo('Summary Report', f'Summary report saved to:\n{path}')
-        else:
-            messagebox.showerror('Error', 'Failed to save summary report.')
-
-    def destroy(self):
-        self.db.close()
-        super().destroy() 
\ No newline at end of file
+        def saved(path):
+            if path:
+                messagebox.showinfo('Summary Report', f'Summary report saved to:\n{path}')
+            else:
+                messagebox.showerror('Error', 'Failed to save summary report.')
+
+        self.tasks.submit(
+            lambda db: write_summary_report(db.get_total_students(), db.get_grade_distribution() or []),
+            on_success=saved,
+            key=('summary-download', id(self)),
+            owner=self
+        ) 
\ No newline at end of file
@@ -0,0 +1,310 @@
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from GUI.services.task_runner import get_task_runner
+from GUI.services.change_feed import get_change_feed
+
+# Rows fetched per request when the table is backed by a paged query
+DEFAULT_FETCH_SIZE = 200
+
+# Load the next page once the view is this many screens from the end of
+# the loaded rows
+PREFETCH_SCREENS = 2
+
+
+class VirtualTable(tb.Frame):
+    """
+    Table that only materializes the rows currently on screen
+
+    The Treeview holds one item per visible line; scrolling moves a window
+    over the loaded rows and rewrites those items in place, so a listing
+    costs the same number of widgets whether it has 20 rows or 200k.
+
+    Rows come either from a paged query, fetched on a background worker
+    as the user scrolls:
+
+        VirtualTable(parent, columns, fetch_page=StudentResultsDB.get_students_page,
+                     sort_keys=STUDENT_SORT_KEYS, sort='full_name')
+
+    or from a list, given up front or loaded in the background:
+
+        VirtualTable(parent, columns, rows=records)
+        VirtualTable(parent, columns).load_rows(lambda db: db.get_all_courses())
+
+    columns is a list of (key, heading, width) tuples. fetch_page is called
+    on a worker thread as fetch_page(db, page_size, token, sort, descending)
+    and must return a Page or None. Clicking a heading sorts by that column: in the database
+    for keys in sort_keys, in memory for list-backed tables.
+
+    watch names tables whose change notices refresh the table while it is
+    on screen, optionally narrowed by watch_match (see ChangeFeed.subscribe).
+    """
+
+    def __init__(self, parent, columns, fetch_page=None, rows=None, sort_keys=None,
+                 sort=None, descending=False, height=20, fetch_size=DEFAULT_FETCH_SIZE,
+                 empty_text="No records found", formatters=None, watch=None, watch_match=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.sort_keys = sort_keys or {}
+        self.sort = sort
+        self.descending = descending
+        self.fetch_size = fetch_size
+        self.empty_text = empty_text
+        self.formatters = formatters or {}
+
+        self.rows = []
+        self.offset = 0
+        self.visible = height
+        self._next_token = None
+        self._failed = False
+        self._loading = None
+        self._load_func = None
+        self._replace_rows = False
+        self.runner = get_task_runner(self)
+
+        self.create_widgets(height)
+        self._update_headings()
+        if fetch_page is not None:
+            self.reload()
+        else:
+            self.set_rows(rows or [])
+        if watch:
+            get_change_feed(self).subscribe(self._on_changes, tables=watch, match=watch_match, owner=self)
+
+    def create_widgets(self, height):
+        keys = [key for key, _, _ in self.columns]
+        body = tb.Frame(self)
+        body.pack(fill='both', expand=True)
+
+        self.tree = tb.Treeview(body, columns=keys, show='headings', height=height, selectmode='browse')
+        for key, heading, width in self.columns:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width, anchor='w')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        self.scrollbar = tb.Scrollbar(body, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.status = tb.Label(self, font=("Segoe UI", 10, "italic"))
+        self.status.pack(pady=10)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self._on_key(-1))
+        self.tree.bind('<Down>', lambda e: self._on_key(1))
+        self.tree.bind('<Prior>', lambda e: self._on_key(-self.visible))
+        self.tree.bind('<Next>', lambda e: self._on_key(self.visible))
+
+    @property
+    def has_more(self):
+        """True if a paged table has rows it has not fetched yet"""
+        return self._next_token is not None
+
+    def reload(self):
+        """Drop the loaded rows and fetch from the top in the current sort"""
+        self.rows = []
+        self.offset = 0
+        self._next_token = None
+        self._failed = False
+        self._replace_rows = False
+        self._fetch(None, replace=True)
+        self.render()
+
+    def set_rows(self, rows):
+        """Show an in-memory list of rows"""
+        self.rows = list(rows)
+        self.offset = 0
+        self._next_token = None
+        if self.sort:
+            self._sort_rows()
+        self.render()
+
+    def load_rows(self, func):
+        """Fill a list-backed table with func(db), run on a background worker"""
+        self._load_func = func
+        self._failed = False
+        self._loading = self.runner.submit(
+            func,
+            on_success=self._on_rows,
+            on_error=lambda error: self._on_rows(None),
+            key=('virtual-table', id(self)),
+            replace=True
+        )
+        self.render()
+
+    def refresh_data(self):
+        """Fetch the rows again, e.g. when a cached screen is shown again"""
+        if self.fetch_page is not None:
+            # Keep the old rows on screen until the first page replaces them
+            self._replace_rows = True
+            self._failed = False
+            self._fetch(None, replace=True)
+        elif self._load_func is not None:
+            self.load_rows(self._load_func)
+
+    def _on_changes(self, changes):
+        # Hidden tables catch up when their screen is shown again
+        if self.winfo_ismapped():
+            self.refresh_data()
+
+    def sort_by(self, key):
+        """Sort by a column, toggling direction on repeated clicks"""
+        if self.fetch_page is not None and key not in self.sort_keys:
+            return
+        self.descending = not self.descending if key == self.sort else False
+        self.sort = key
+        self._update_headings()
+        if self.fetch_page is not None:
+            self.reload()
+        else:
+            self._sort_rows()
+            self.offset = 0
+            self.render()
+
+    def scroll(self, lines):
+        """Move the window by a number of lines"""
+        self.offset += lines
+        self.render()
+        return "break"
+
+    def selected_row(self):
+        """Return the row under the selection, or None"""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        index = self.offset + self.tree.index(selection[0])
+        return self.rows[index] if index < len(self.rows) else None
+
+    def render(self):
+        """Rewrite the visible items for the current offset"""
+        if self.fetch_page is not None:
+            self._ensure_loaded()
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+
+        items = self.tree.get_children()
+        window = self.rows[self.offset:self.offset + self.visible]
+        for i, row in enumerate(window):
+            values = [self._format(key, row.get(key)) for key, _, _ in self.columns]
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', 'end', values=values)
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+
+        self._update_scrollbar()
+        self._update_status()
+
+    def _fetch(self, token, replace=False):
+        fetch_page = self.fetch_page
+        args = (self.fetch_size, token, self.sort, self.descending)
+        # A reload replaces any fetch still running for the old sort
+        self._loading = self.runner.submit(
+            lambda db: fetch_page(db, *args),
+            on_success=self._on_page,
+            on_error=lambda error: self._on_page(None),
+            key=('virtual-table', id(self)),
+            replace=replace
+        )
+
+    def _on_page(self, page):
+        self._loading = None
+        replace, self._replace_rows = self._replace_rows, False
+        if page is None:
+            self._failed = True
+            self._next_token = None
+        else:
+            if replace:
+                self.rows = []
+            self.rows.extend(page.rows)
+            self._next_token = page.next_token
+        self.render()
+
+    def _on_rows(self, rows):
+        self._loading = None
+        if rows is None:
+            self._failed = True
+        self.set_rows(rows or [])
+
+    def _ensure_loaded(self):
+        # Fetch ahead so scrolling near the end doesn't wait on the database
+        wanted = self.offset + self.visible * (PREFETCH_SCREENS + 1)
+        if self._loading is None and self._next_token is not None and len(self.rows) < wanted:
+            self._fetch(self._next_token)
+
+    def _sort_rows(self):
+        key = self.sort
+        # None sorts first ascending, last descending, like the other values
+        self.rows.sort(key=lambda row: (row.get(key) is not None, row.get(key)), reverse=self.descending)
+
+    def _format(self, key, value):
+        if key in self.formatters:
+            return self.formatters[key](value)
+        return 'N/A' if value is None else value
+
+    def _update_headings(self):
+        for key, heading, _ in self.columns:
+            arrow = ''
+            if key == self.sort:
+                arrow = ' ▼' if self.descending else ' ▲'
+            self.tree.heading(key, text=heading + arrow)
+
+    def _update_scrollbar(self):
+        # Leave room past the end while more rows can still be fetched
+        total = len(self.rows) + (self.visible if self.has_more else 0)
+        if total <= self.visible:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible) / total)
+
+    def _update_status(self):
+        if self._failed and not self.rows:
+            text = "✗ Failed to load records"
+        elif self._loading is not None and not self.rows:
+            text = "Loading..."
+        elif not self.rows:
+            text = self.empty_text
+        else:
+            count = f"{len(self.rows)}+" if self.has_more else str(len(self.rows))
+            text = f"{count} rows"
+        self.status.configure(text=text)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            total = len(self.rows) + (self.visible if self.has_more else 0)
+            self.offset = int(float(value) * total)
+        elif action == 'scroll':
+            step = self.visible if unit == 'pages' else 1
+            self.offset += int(value) * step
+        self.render()
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        lines = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self.scroll(lines * 3)
+
+    def _on_key(self, lines):
+        selection = self.tree.selection()
+        items = self.tree.get_children()
+        if selection and items:
+            position = self.tree.index(selection[0]) + lines
+            if 0 <= position < len(items):
+                # Moving within the window is the Treeview's own job
+                return None
+        self.scroll(lines)
+        return "break"
+
+    def destroy(self):
+        if self._loading is not None:
+            self._loading.cancel()
+        super().destroy()
+
+    def _on_resize(self, event):
+        row_height = tb.Style().lookup('Treeview', 'rowheight') or 20
+        # Leave room for the heading row
+        visible = max(1, event.height // int(row_height) - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
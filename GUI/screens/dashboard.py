@@ -3,6 +3,7 @@ from ttkbootstrap.constants import *
 from GUI.components.students_view import StudentsView
 from GUI.components.import_view import ImportView
 from GUI.components.summary_view import SummaryView
+from GUI.services.screen_cache import ScreenCache
 
 class DashboardScreen(tb.Frame):
     def __init__(self, parent, controller):
@@ -19,31 +20,22 @@ class DashboardScreen(tb.Frame):
         # Main content area
         self.main = tb.Frame(self)
         self.main.pack(side='left', fill='both', expand=True)
+        # Each view is built once; switching back reloads only its data
+        self.views = ScreenCache(self.main)
         self.current_view = None
         self.current_widget = None
         self.show_students()
 
-    def clear_main(self):
-        if self.current_widget:
-            self.current_widget.destroy()
-            self.current_widget = None
-        for widget in self.main.winfo_children():
-            widget.destroy()
+    def show_view(self, name, view_class):
+        screen = self.views.show(name, lambda parent: view_class(parent).pack(fill='both', expand=True))
+        self.current_widget = screen.frame.winfo_children()[0]
+        self.current_view = name
 
     def show_students(self):
-        self.clear_main()
-        self.current_widget = StudentsView(self.main)
-        self.current_widget.pack(fill='both', expand=True)
-        self.current_view = 'students'
+        self.show_view('students', StudentsView)
 
     def show_import(self):
-        self.clear_main()
-        self.current_widget = ImportView(self.main)
-        self.current_widget.pack(fill='both', expand=True)
-        self.current_view = 'import'
+        self.show_view('import', ImportView)
 
     def show_summary(self):
-        self.clear_main()
-        self.current_widget = SummaryView(self.main)
-        self.current_widget.pack(fill='both', expand=True)
-        self.current_view = 'summary' 
\ No newline at end of file
+        self.show_view('summary', SummaryView)
@@ -0,0 +1,111 @@
+import queue
+from database.notifications import ChangeListener
+
+# How often the Tk thread hands received changes to subscribers; changes
+# arriving within one interval are delivered together
+POLL_INTERVAL_MS = 250
+
+
+class ChangeFeed:
+    """
+    Deliver database change notices to widgets on the Tk thread
+
+    Wraps a ChangeListener: notices are queued by the listener thread and
+    handed out in batches from after(), so callbacks can touch widgets:
+
+        feed.subscribe(lambda changes: table.refresh_data(),
+                       tables=('academic_records',),
+                       match={'student_id': student_id}, owner=table)
+    """
+
+    def __init__(self, root, listener=None):
+        self.root = root
+        self.listener = listener or ChangeListener()
+        self._changes = queue.Queue()
+        self._subscribers = []
+        self._polling = None
+        self.listener.subscribe(self._changes.put)
+
+    def start(self):
+        """Start listening and delivering changes"""
+        self.listener.start()
+        if self._polling is None:
+            self._polling = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def stop(self):
+        """Stop listening; no more callbacks are made"""
+        if self._polling is not None:
+            self.root.after_cancel(self._polling)
+            self._polling = None
+        self.listener.stop()
+
+    def subscribe(self, callback, tables=None, match=None, owner=None):
+        """
+        Call callback(changes) on the Tk thread with each batch of relevant changes
+
+        Args:
+            callback (callable): Takes a list of change dictionaries
+            tables (iterable, optional): Tables of interest (all if None)
+            match (dict, optional): Key values a change must have, e.g.
+                {'student_id': 5}; changes whose key lacks a column (or
+                table-wide changes) always match
+            owner (widget, optional): Unsubscribe once this widget is destroyed
+
+        Returns:
+            callable: The callback, for unsubscribe()
+        """
+        self._subscribers.append((callback, frozenset(tables) if tables else None, match or {}, owner))
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop delivering changes to callback"""
+        self._subscribers = [s for s in self._subscribers if s[0] is not callback]
+
+    def _poll(self):
+        changes = []
+        while True:
+            try:
+                changes.append(self._changes.get_nowait())
+            except queue.Empty:
+                break
+        if changes:
+            self._deliver(changes)
+        self._polling = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _deliver(self, changes):
+        for subscriber in list(self._subscribers):
+            callback, tables, match, owner = subscriber
+            if owner is not None and not self._exists(owner):
+                self._subscribers.remove(subscriber)
+                continue
+            relevant = [c for c in changes if self._matches(c, tables, match)]
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    print(f"✗ Change subscriber failed: {e}")
+
+    def _matches(self, change, tables, match):
+        if change['table'] == '*':
+            return True
+        if tables is not None and change['table'] not in tables:
+            return False
+        key = change['key'] or {}
+        return all(key.get(column, value) == value for column, value in match.items())
+
+    def _exists(self, widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+
+def get_change_feed(widget):
+    """Return the ChangeFeed shared by every widget in widget's window, starting it on first use"""
+    root = widget._root()
+    feed = getattr(root, '_change_feed', None)
+    if feed is None:
+        feed = ChangeFeed(root)
+        feed.start()
+        root._change_feed = feed
+    return feed
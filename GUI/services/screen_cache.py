@@ -0,0 +1,134 @@
+from collections import OrderedDict
+import ttkbootstrap as tb
+
+# Screens kept alive at once; the least recently shown is destroyed first
+DEFAULT_MAX_SCREENS = 8
+
+
+class Screen:
+    """One screen held by a ScreenCache"""
+
+    def __init__(self, name, frame, keep=True):
+        self.name = name
+        self.frame = frame
+        self.keep = keep
+        # Called on every revisit to reload data the widgets can't reload themselves
+        self.refresh = None
+
+
+def refresh_widgets(widget):
+    """
+    Ask every data-bearing widget under widget to reload its data
+
+    A widget opts in by defining refresh_data(); its own children are left
+    to it.
+    """
+    for child in widget.winfo_children():
+        if hasattr(child, 'refresh_data'):
+            child.refresh_data()
+        else:
+            refresh_widgets(child)
+
+
+class ScreenCache:
+    """
+    Build each screen once and swap between them by packing and unpacking
+
+    Revisiting a screen shows the widgets built last time and reloads only
+    their data, so navigation doesn't rebuild widget trees:
+
+        screens.show('students', self.build_students)
+
+    build(frame) fills the screen's frame and may return a callable that
+    refreshes its data on later visits. Up to max_screens screens are kept;
+    beyond that the least recently shown one is destroyed.
+    """
+
+    def __init__(self, container, max_screens=DEFAULT_MAX_SCREENS):
+        self.container = container
+        self.max_screens = max(1, max_screens)
+        self.current = None
+        self._screens = OrderedDict()
+
+    def show(self, name, build, keep=True):
+        """
+        Show a screen, building it on the first visit
+
+        Args:
+            name (hashable): Cache key for the screen
+            build (callable): Fills a new frame; may return a refresh callable
+            keep (bool): False for screens rebuilt on every visit (e.g. ones
+                holding passwords), which are destroyed once hidden
+
+        Returns:
+            Screen: The screen now on show
+        """
+        screen = self._screens.get(name)
+        if screen is not None and screen is self.current:
+            self.refresh(screen)
+            return screen
+
+        self._hide_current()
+        if screen is not None:
+            self._screens.move_to_end(name)
+            self.current = screen
+            screen.frame.pack(fill='both', expand=True)
+            self.refresh(screen)
+            return screen
+
+        screen = Screen(name, tb.Frame(self.container), keep)
+        self._screens[name] = screen
+        self.current = screen
+        screen.frame.pack(fill='both', expand=True)
+        try:
+            refresh = build(screen.frame)
+        except Exception:
+            self.invalidate(name)
+            raise
+        if refresh is not None:
+            screen.refresh = refresh
+        self._evict()
+        return screen
+
+    def refresh(self, screen):
+        """Reload the data shown on a screen"""
+        refresh_widgets(screen.frame)
+        if screen.refresh:
+            screen.refresh()
+
+    def invalidate(self, name):
+        """Destroy a screen so the next visit builds it again"""
+        screen = self._screens.pop(name, None)
+        if screen is None:
+            return
+        if screen is self.current:
+            self.current = None
+        screen.frame.destroy()
+
+    def clear(self):
+        """Destroy every screen, e.g. when the user logs out"""
+        for name in list(self._screens):
+            self.invalidate(name)
+
+    def __contains__(self, name):
+        return name in self._screens
+
+    def __len__(self):
+        return len(self._screens)
+
+    def _hide_current(self):
+        screen = self.current
+        if screen is None:
+            return
+        self.current = None
+        if screen.keep:
+            screen.frame.pack_forget()
+        else:
+            self.invalidate(screen.name)
+
+    def _evict(self):
+        for name in list(self._screens):
+            if len(self._screens) <= self.max_screens:
+                break
+            if self._screens[name] is not self.current:
+                self.invalidate(name)
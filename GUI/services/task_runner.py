@@ -0,0 +1,253 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from database.operations import StudentResultsDB
+
+# How often the Tk thread checks for finished tasks while any are pending
+POLL_INTERVAL_MS = 50
+
+# Worker threads; each holds one pooled connection while it exists
+DEFAULT_WORKERS = 3
+
+
+class Task:
+    """Handle for one piece of database work submitted to a TaskRunner"""
+
+    def __init__(self, key, func, on_success, on_error, busy, owner):
+        self.key = key
+        self.func = func
+        self.on_success = on_success
+        self.on_error = on_error
+        self.busy = busy
+        self.owner = owner
+        self.cancelled = False
+        self.finished = False
+        self.future = None
+        self._db = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Drop the result, and stop the query if one is already running"""
+        with self._lock:
+            if self.cancelled or self.finished:
+                return
+            self.cancelled = True
+            if self.future is not None and self.future.cancel():
+                return
+            # Cancel under the lock: once _run clears _db the worker's
+            # connection may already be running the next task's query
+            db = self._db
+            if db is not None and db.db.connection is not None:
+                try:
+                    # Safe from another thread; the running statement fails
+                    # with QueryCanceled and the worker moves on
+                    db.db.connection.cancel()
+                except psycopg2.Error:
+                    pass
+
+
+class TaskRunner:
+    """
+    Run StudentResultsDB work on worker threads and deliver results on the Tk thread
+
+    Each worker thread has its own StudentResultsDB, passed as the only
+    argument to the submitted function. Callbacks run on the Tk thread via
+    after(), so they can touch widgets:
+
+        runner.submit(lambda db: db.get_total_students(),
+                      on_success=lambda total: label.config(text=total),
+                      key='total-students')
+    """
+
+    def __init__(self, root, max_workers=DEFAULT_WORKERS):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-worker')
+        self._results = queue.Queue()
+        self._local = threading.local()
+        self._worker_dbs = []
+        self._worker_dbs_lock = threading.Lock()
+        self._pending = {}
+        self._active = set()
+        self._busy_listeners = []
+        self._polling = False
+        self._closed = False
+
+    def submit(self, func, on_success=None, on_error=None, key=None, replace=False, busy=(), owner=None):
+        """
+        Queue func(db) to run off the Tk thread
+
+        Args:
+            func (callable): Takes a StudentResultsDB and returns the result
+            on_success (callable, optional): Called with the result on the Tk thread
+            on_error (callable, optional): Called with the exception on the Tk thread
+            key (hashable, optional): Coalesce tasks; while a task with this
+                key is pending, repeat submits return it instead of queuing
+            replace (bool): Cancel the pending task with the same key and
+                queue this one instead (for refreshes and re-sorts)
+            busy (iterable): Widgets to disable while the task runs
+            owner (widget, optional): Skip the callbacks if this widget has
+                been destroyed by the time the result arrives
+
+        Returns:
+            Task: Handle that can be cancelled, or None after shutdown
+        """
+        if self._closed:
+            return None
+        if key is not None and key in self._pending:
+            if not replace:
+                return self._pending[key]
+            self._pending[key].cancel()
+
+        task = Task(key, func, on_success, on_error, tuple(busy), owner)
+        if key is not None:
+            self._pending[key] = task
+        self._active.add(task)
+        self._set_busy(task.busy, True)
+        self._notify_busy()
+        task.future = self._executor.submit(self._run, task)
+        self._start_polling()
+        return task
+
+    def cancel(self, key):
+        """Cancel the pending task with this key, if any"""
+        task = self._pending.get(key)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        """Cancel every pending task"""
+        for task in list(self._active):
+            task.cancel()
+
+    @property
+    def busy(self):
+        """True while any task is queued or running"""
+        return bool(self._active)
+
+    def add_busy_listener(self, callback):
+        """Call callback(busy) on the Tk thread whenever the runner starts or stops being busy"""
+        self._busy_listeners.append(callback)
+
+    def remove_busy_listener(self, callback):
+        """Stop calling a callback added with add_busy_listener"""
+        if callback in self._busy_listeners:
+            self._busy_listeners.remove(callback)
+
+    def shutdown(self):
+        """Cancel outstanding work, stop the workers and release their connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._worker_dbs_lock:
+            for db in self._worker_dbs:
+                db.close()
+            self._worker_dbs = []
+
+    def _worker_db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = StudentResultsDB()
+            with self._worker_dbs_lock:
+                self._worker_dbs.append(db)
+            self._local.db = db
+        if db.db.connection is None or db.db.connection.closed:
+            # First use, or the last task left the connection broken
+            if not db.connect():
+                raise psycopg2.OperationalError("could not connect to the database")
+        return db
+
+    def _run(self, task):
+        # Runs on a worker thread: never touch widgets here
+        try:
+            db = self._worker_db()
+            with task._lock:
+                if task.cancelled:
+                    # Still report back so the task leaves the active set
+                    self._results.put((task, None, None))
+                    return
+                task._db = db
+            try:
+                result = task.func(db)
+            finally:
+                with task._lock:
+                    task._db = None
+            self._results.put((task, result, None))
+        except Exception as e:
+            self._results.put((task, None, e))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(task, result, error)
+
+        # Tasks cancelled before they started never report back
+        for task in [t for t in self._active if t.future.done() and t.future.cancelled()]:
+            self._finish(task, None, None)
+
+        if self._active and not self._closed:
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _finish(self, task, result, error):
+        if task not in self._active:
+            return
+        with task._lock:
+            task.finished = True
+        self._active.discard(task)
+        if task.key is not None and self._pending.get(task.key) is task:
+            del self._pending[task.key]
+        self._set_busy(task.busy, False)
+        self._notify_busy()
+
+        if task.cancelled:
+            return
+        if task.owner is not None and not self._exists(task.owner):
+            # The screen that asked for this was navigated away from
+            return
+        if error is not None:
+            if task.on_error:
+                task.on_error(error)
+            else:
+                print(f"✗ Background task failed: {error}")
+        elif task.on_success:
+            task.on_success(result)
+
+    def _set_busy(self, widgets, busy):
+        for widget in widgets:
+            try:
+                widget.configure(state='disabled' if busy else 'normal')
+            except Exception:
+                # The widget was destroyed while the task ran
+                pass
+
+    def _exists(self, widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _notify_busy(self):
+        for callback in list(self._busy_listeners):
+            callback(self.busy)
+
+
+def get_task_runner(widget):
+    """Return the TaskRunner shared by every widget in widget's window, creating it on first use"""
+    root = widget._root()
+    runner = getattr(root, '_task_runner', None)
+    if runner is None:
+        runner = TaskRunner(root)
+        root._task_runner = runner
+    return runner
@@ -0,0 +1,2 @@
+# api/__init__.py
+# This file makes the api directory a Python package
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+REASONS = {
+    200: 'OK',
+    201: 'Created',
+    204: 'No Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+# Limits on what a client may send before the request is refused
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+
+
+class HttpError(Exception):
+    """Ends a request with an error status and a JSON {'error': message} body"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    """A parsed HTTP request"""
+
+    def __init__(self, method, target, version, headers, body=b''):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = unquote(parts.path)
+        self.query = dict(parse_qsl(parts.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+        # Set by the router
+        self.params = {}
+        self.session = None
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    def json(self):
+        """Parse the body as a JSON object; raises HttpError(400) if it isn't one"""
+        try:
+            value = json.loads(self.body or b'{}')
+        except ValueError:
+            raise HttpError(400, "Request body must be JSON")
+        if not isinstance(value, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return value
+
+
+class Response:
+    """
+    A response with a complete body, or a body streamed as a series of chunks
+
+    chunks is an async iterator of bytes. It is sent with Transfer-Encoding:
+    chunked, one chunk at a time, and the next chunk is only produced once
+    the client has taken the last one.
+    """
+
+    def __init__(self, status=200, body=b'', headers=None, chunks=None):
+        self.status = status
+        self.body = body
+        self.chunks = chunks
+        self.headers = {'Content-Type': 'application/json'}
+        self.headers.update(headers or {})
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_json(value):
+    """Encode a value as compact UTF-8 JSON (Decimals as numbers, datetimes as ISO 8601)"""
+    return json.dumps(value, default=_json_default, separators=(',', ':')).encode()
+
+
+def json_response(value, status=200, headers=None):
+    """Response with value as its JSON body"""
+    return Response(status, encode_json(value), headers)
+
+
+def error_response(status, message, headers=None):
+    return json_response({'error': message}, status, headers)
+
+
+async def json_stream(batches):
+    """
+    Response streaming rows as a JSON array, one chunk per batch
+
+    Only one batch is held in memory at a time. The first batch is read
+    before the response is returned, so a query that fails at once still
+    gets an error status; if a later batch fails, the response is cut off
+    (see write_response). Streamed responses carry no ETag.
+
+    Args:
+        batches: Async iterator of lists of rows, e.g. AsyncDatabaseConnection.stream()
+    """
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        return json_response([])
+
+    async def chunks():
+        try:
+            yield b'[' + b','.join(encode_json(row) for row in first)
+            async for rows in batches:
+                yield b',' + b','.join(encode_json(row) for row in rows)
+            yield b']'
+        finally:
+            await batches.aclose()
+
+    return Response(chunks=chunks())
+
+
+def apply_etag(request, response):
+    """
+    Tag a successful read with an ETag, and answer 304 if the client has it
+
+    The tag is a hash of the body, so it changes exactly when the data does.
+    HEAD is tagged like GET, so both send the same headers. Streamed
+    responses aren't tagged, since their body isn't known until it is sent.
+    """
+    if request.method not in ('GET', 'HEAD') or response.status != 200 or response.chunks is not None:
+        return response
+    etag = f'"{hashlib.sha256(response.body).hexdigest()[:32]}"'
+    # Authenticated data: clients may keep it but must check it's current
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    response.headers.update(headers)
+
+    wanted = request.headers.get('if-none-match')
+    if wanted:
+        tags = [tag.strip() for tag in wanted.split(',')]
+        if '*' in tags or etag in tags or f'W/{etag}' in tags:
+            return Response(304, headers=headers)
+    return response
+
+
+async def read_request(reader, max_body_bytes):
+    """
+    Read one request from a client connection
+
+    Returns:
+        Request: The request, or None if the client closed the connection
+        between requests
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if len(line) > MAX_REQUEST_LINE or not line.endswith(b'\r\n'):
+        raise HttpError(400, "Malformed request line")
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    if version not in ('HTTP/1.0', 'HTTP/1.1'):
+        raise HttpError(400, "Unsupported HTTP version")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS or len(line) > MAX_REQUEST_LINE:
+            raise HttpError(431, "Too many or too large headers")
+        name, sep, value = line.decode('latin-1').partition(':')
+        if not sep:
+            raise HttpError(400, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b''
+    if 'transfer-encoding' in headers:
+        raise HttpError(411, "Send the body with a Content-Length")
+    if 'content-length' in headers:
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > max_body_bytes:
+            raise HttpError(413, f"Body larger than {max_body_bytes} bytes")
+        body = await reader.readexactly(length)
+    return Request(method, target, version, headers, body)
+
+
+async def write_response(writer, request, response, keep_alive, timeout=None):
+    """
+    Send a response; a HEAD request gets the headers only
+
+    A client that takes more than timeout seconds to accept a chunk raises
+    asyncio.TimeoutError, so a stalled reader doesn't hold a streamed
+    response's database connection. If producing a chunk fails, the
+    response is cut off without its final chunk and ConnectionAbortedError
+    is raised, so the client can tell it is incomplete.
+    """
+    reason = REASONS.get(response.status, 'Unknown')
+    headers = dict(response.headers)
+    headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+    no_body = response.status in (204, 304) or (request is not None and request.method == 'HEAD')
+    if response.status in (204, 304):
+        headers.pop('Content-Type', None)
+    elif response.chunks is not None:
+        headers['Transfer-Encoding'] = 'chunked'
+    else:
+        headers['Content-Length'] = str(len(response.body))
+
+    head = f"HTTP/1.1 {response.status} {reason}\r\n"
+    head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write((head + "\r\n").encode('latin-1'))
+    try:
+        if not no_body:
+            if response.chunks is None:
+                writer.write(response.body)
+            else:
+                await _write_chunks(writer, response.chunks, timeout)
+        await asyncio.wait_for(writer.drain(), timeout)
+    finally:
+        if response.chunks is not None:
+            # Ends the stream (and frees its connection) if it wasn't sent in full
+            await response.chunks.aclose()
+
+
+async def _write_chunks(writer, chunks, timeout):
+    while True:
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            break
+        except Exception as e:
+            print(f"✗ Response stream failed: {e}")
+            raise ConnectionAbortedError("Response stream failed") from e
+        writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        # Don't produce more than the client is taking
+        await asyncio.wait_for(writer.drain(), timeout)
+    writer.write(b'0\r\n\r\n')
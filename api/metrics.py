@@ -0,0 +1,104 @@
+from collections import defaultdict
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Cumulative request-latency histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        """Record one request that took seconds"""
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Estimate the q-quantile (0-1) as the bound of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return bound
+        return float('inf')
+
+
+class ApiMetrics:
+    """
+    Per-endpoint latency histograms and status counts for the API
+
+    Endpoints are keyed by route (e.g. 'GET /api/students/{student_id}/gpa'),
+    not by the concrete path, so the number of series stays fixed. Only
+    touched from the event loop, so there is no locking.
+    """
+
+    def __init__(self):
+        self.latency = defaultdict(LatencyHistogram)
+        self.statuses = defaultdict(int)
+        self.rejected = 0
+        self.in_flight = 0
+
+    def observe(self, route, status, seconds):
+        """Record a finished request"""
+        self.latency[route].observe(seconds)
+        self.statuses[(route, status)] += 1
+
+    def summary(self):
+        """
+        Return the figures as plain data
+
+        Returns:
+            dict: in_flight, rejected (503s from the concurrency limit) and
+            'routes', mapping each route to its count, avg_ms, p50_ms and
+            p95_ms (bucket bounds) and a status -> count map
+        """
+        routes = {}
+        for route, histogram in sorted(self.latency.items()):
+            routes[route] = {
+                'count': histogram.count,
+                'avg_ms': round(histogram.total / histogram.count * 1000, 1) if histogram.count else 0.0,
+                'p50_ms': histogram.quantile(0.5) * 1000,
+                'p95_ms': histogram.quantile(0.95) * 1000,
+                'statuses': {
+                    str(status): count for (name, status), count in sorted(self.statuses.items()) if name == route
+                },
+            }
+        return {'in_flight': self.in_flight, 'rejected': self.rejected, 'routes': routes}
+
+    def render(self, gauges=None):
+        """
+        Return the metrics in the Prometheus text exposition format
+
+        Args:
+            gauges (dict, optional): Extra name -> value gauges to include
+        """
+        lines = [
+            "# TYPE api_request_duration_seconds histogram",
+        ]
+        for route, histogram in sorted(self.latency.items()):
+            label = f'route="{route}"'
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'api_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'api_request_duration_seconds_bucket{{{label},le="+Inf"}} {histogram.count}')
+            lines.append(f'api_request_duration_seconds_sum{{{label}}} {histogram.total:.6f}')
+            lines.append(f'api_request_duration_seconds_count{{{label}}} {histogram.count}')
+        lines.append("# TYPE api_requests_total counter")
+        for (route, status), count in sorted(self.statuses.items()):
+            lines.append(f'api_requests_total{{route="{route}",status="{status}"}} {count}')
+        lines.append("# TYPE api_requests_rejected_total counter")
+        lines.append(f"api_requests_rejected_total {self.rejected}")
+        lines.append("# TYPE api_requests_in_flight gauge")
+        lines.append(f"api_requests_in_flight {self.in_flight}")
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
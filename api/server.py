@@ -0,0 +1,441 @@
+import asyncio
+import re
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import API_CONFIG
+from database.async_operations import AsyncStudentResultsDB, DATABASE_ERRORS
+from api.http import (
+    HttpError, Response, json_response, error_response, json_stream, apply_etag,
+    read_request, write_response
+)
+from api.metrics import ApiMetrics
+from api.sessions import SessionStore
+
+ALL_USERS = ('admin', 'staff', 'student')
+STAFF_AND_ADMIN = ('admin', 'staff')
+
+# Past this many entries, expired reads are swept from the read cache
+READ_CACHE_SWEEP_SIZE = 10000
+
+
+class ReadCache:
+    """
+    Share one database read between identical requests
+
+    While a read is loading, and for ttl seconds after, the same key gets
+    the same result instead of another query, so a burst of students
+    refreshing their results costs one query per student per ttl. Failed
+    reads (None or an exception) are not kept.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+
+    async def get(self, key, load):
+        """Return the shared result for key, calling load() (a coroutine function) if there is none"""
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] > loop.time() or not entry[1].done()):
+            return await asyncio.shield(entry[1])
+
+        if len(self._entries) > READ_CACHE_SWEEP_SIZE:
+            self._sweep(loop.time())
+        future = asyncio.ensure_future(load())
+        self._entries[key] = (loop.time() + self.ttl, future)
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            self._discard(key, future)
+            raise
+        if result is None:
+            self._discard(key, future)
+        return result
+
+    def clear(self):
+        """Forget every kept result (after a write)"""
+        self._entries.clear()
+
+    def _discard(self, key, future):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def _sweep(self, now):
+        for key in [key for key, (expires, future) in self._entries.items() if expires <= now and future.done()]:
+            del self._entries[key]
+
+
+def _required(values, *names):
+    """Get the named fields from a query or body, raising HttpError(400) if any is missing"""
+    missing = [name for name in names if not values.get(name)]
+    if missing:
+        raise HttpError(400, f"Missing {', '.join(missing)}")
+    return [values[name] for name in names]
+
+
+def _found(value, what="Database"):
+    """Pass a read's result through, turning a failed read (None) into a 503"""
+    if value is None:
+        raise HttpError(503, f"{what} unavailable, try again shortly", {'Retry-After': '1'})
+    return value
+
+
+class ApiServer:
+    """
+    HTTP/1.1 JSON API over AsyncStudentResultsDB
+
+        server = ApiServer()
+        await server.start()
+        await server.serve_forever()
+
+    Clients log in at POST /api/auth/login and send the returned token as
+    'Authorization: Bearer <token>'. Students can only see their own data;
+    staff see rosters and GPA reports of the courses they are assigned, and
+    the records of students enrolled in them. Rosters and GPA reports,
+    which grow with enrollment, are streamed from a database cursor (see
+    json_stream); other reads send an ETag and answer If-None-Match with
+    304. Latency histograms per endpoint are served at /metrics.
+
+    At most max_in_flight requests are handled at once; others wait up to
+    queue_timeout seconds for a slot, then get 503 with Retry-After.
+    """
+
+    def __init__(self, host=None, port=None, config=API_CONFIG):
+        self.host = host or config['host']
+        self.port = port or config['port']
+        self.queue_timeout = config['queue_timeout']
+        self.idle_timeout = config['idle_timeout']
+        self.max_body_bytes = config['max_body_bytes']
+        self.stream_batch_rows = config['stream_batch_rows']
+
+        self.db = AsyncStudentResultsDB()
+        self.sessions = SessionStore(config['session_ttl'])
+        self.metrics = ApiMetrics()
+        self.reads = ReadCache(config['read_cache_ttl'])
+        self._slots = asyncio.Semaphore(config['max_in_flight'])
+        self._server = None
+
+        # (method, pattern, route name, handler, allowed user types or
+        # None for public, counts against max_in_flight)
+        self.routes = []
+        self._route('GET', '/health', self.health, None, limited=False)
+        self._route('GET', '/metrics', self.show_metrics, None, limited=False)
+        self._route('POST', '/api/auth/login', self.login, None)
+        self._route('POST', '/api/auth/logout', self.logout, ALL_USERS)
+        self._route('GET', '/api/auth/me', self.me, ALL_USERS)
+        self._route('GET', '/api/courses', self.list_courses, ALL_USERS)
+        self._route('GET', '/api/courses/{course_code}/roster', self.course_roster, STAFF_AND_ADMIN)
+        self._route('GET', '/api/students/{student_id}/enrollments', self.list_enrollments, ALL_USERS)
+        self._route('POST', '/api/students/{student_id}/enrollments', self.enroll, ('admin', 'student'))
+        self._route('DELETE', '/api/students/{student_id}/enrollments/{course_code}', self.unenroll,
+                    ('admin', 'student'))
+        self._route('GET', '/api/students/{student_id}/records', self.academic_records, ALL_USERS)
+        self._route('GET', '/api/students/{student_id}/gpa', self.gpa_summary, ALL_USERS)
+        self._route('GET', '/api/reports/dashboard', self.dashboard_report, ('admin',))
+        self._route('GET', '/api/reports/gpas', self.gpa_report, STAFF_AND_ADMIN)
+
+    def _route(self, method, path, handler, user_types, limited=True):
+        pattern = re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', path) + '$')
+        self.routes.append((method, pattern, f"{method} {path}", handler, user_types, limited))
+
+    # Server lifecycle
+    async def start(self):
+        """Open the database pool and start listening; returns False if the database is unreachable"""
+        if not await self.db.connect():
+            return False
+        self._server = await asyncio.start_server(
+            self._serve_connection, self.host, self.port, backlog=1024
+        )
+        print(f"✓ API listening on http://{self.host}:{self.port}")
+        return True
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and close the database pool"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.db.close()
+
+    async def _serve_connection(self, reader, writer):
+        """Answer requests on one client connection until it closes or idles out"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader, self.max_body_bytes), self.idle_timeout)
+                except HttpError as e:
+                    await write_response(writer, None, error_response(e.status, e.message), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                await write_response(writer, request, response, request.keep_alive, self.idle_timeout)
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # Idle, cut off mid-request, or a line past the stream limit
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, request):
+        """Route a request, check its token, run its handler and record its latency"""
+        started = time.monotonic()
+        route = 'unmatched'
+        try:
+            route, handler, user_types, limited = self._match(request)
+            if user_types is not None:
+                request.session = self._authenticate(request, user_types)
+            if limited:
+                response = await self._run_limited(handler, request)
+            else:
+                response = await handler(request)
+            response = apply_etag(request, response)
+        except HttpError as e:
+            response = error_response(e.status, e.message, e.headers)
+        except Exception as e:
+            print(f"✗ Error handling {request.method} {request.path}: {e}")
+            response = error_response(500, "Internal server error")
+        self.metrics.observe(route, response.status, time.monotonic() - started)
+        return response
+
+    def _match(self, request):
+        """Find the route for a request; HEAD is served as GET without the body"""
+        method = 'GET' if request.method == 'HEAD' else request.method
+        allowed = []
+        for route_method, pattern, name, handler, user_types, limited in self.routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if route_method == method:
+                request.params = match.groupdict()
+                return name, handler, user_types, limited
+            allowed.append(route_method)
+        if allowed:
+            raise HttpError(405, "Method not allowed", {'Allow': ', '.join(allowed)})
+        raise HttpError(404, "Not found")
+
+    def _authenticate(self, request, user_types):
+        """Get the request's session, checking its user may use the route"""
+        scheme, _, token = request.headers.get('authorization', '').partition(' ')
+        session = self.sessions.get(token.strip()) if scheme.lower() == 'bearer' else None
+        if session is None:
+            raise HttpError(401, "Log in first", {'WWW-Authenticate': 'Bearer'})
+        if session['user_type'] not in user_types:
+            raise HttpError(403, "Not allowed for this account")
+        return session
+
+    async def _run_limited(self, handler, request):
+        """Run a handler once one of the max_in_flight slots is free"""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.rejected += 1
+            raise HttpError(503, "Server busy, try again shortly", {'Retry-After': '1'})
+        self.metrics.in_flight += 1
+        try:
+            return await handler(request)
+        finally:
+            self.metrics.in_flight -= 1
+            self._slots.release()
+
+    async def _student_db_id(self, request):
+        """Resolve the {student_id} in the path, checking a student only asks about themself and staff about their students"""
+        student_id = request.params['student_id']
+        session = request.session
+        if session['user_type'] == 'student':
+            if session['user']['student_id'] != student_id:
+                raise HttpError(403, "Students can only see their own records")
+            return session['user']['id']
+        student_db_id = await self.reads.get(('student', student_id), lambda: self.db.get_student_db_id(student_id))
+        if student_db_id is None:
+            raise HttpError(404, "No such student")
+        if session['user_type'] == 'staff':
+            staff_db_id = session['user']['id']
+            teaches = _found(await self.reads.get(
+                ('staff-teaches', staff_db_id, student_db_id),
+                lambda: self.db.staff_teaches_student(staff_db_id, student_db_id)
+            ))
+            if not teaches:
+                raise HttpError(403, "Staff can only see students in their assigned courses")
+        return student_db_id
+
+    async def _check_assigned(self, session, course_id, academic_year=None, semester=None):
+        """Check a staff session is assigned the course (for the term, if one is given)"""
+        if session['user_type'] != 'staff':
+            return
+        staff_db_id = session['user']['id']
+        assigned = _found(await self.reads.get(
+            ('staff-courses', staff_db_id, academic_year, semester),
+            lambda: self.db.get_staff_courses(staff_db_id, academic_year, semester)
+        ))
+        if not any(course['id'] == course_id for course in assigned):
+            raise HttpError(403, "You are not assigned to this course for that term")
+
+    async def _course_id(self, course_code):
+        course_id = await self.reads.get(('course', course_code), lambda: self.db.get_course_id(course_code))
+        if course_id is None:
+            raise HttpError(404, "No such course")
+        return course_id
+
+    def _term(self, request):
+        return request.query.get('academic_year'), request.query.get('semester')
+
+    async def _stream(self, batches):
+        """Stream a list response, turning a query that fails before the first row into a 503"""
+        try:
+            return await json_stream(batches)
+        except DATABASE_ERRORS:
+            raise HttpError(503, "Database unavailable, try again shortly", {'Retry-After': '1'})
+
+    # Service endpoints
+    async def health(self, request):
+        """GET /health: liveness plus database pool usage"""
+        return json_response({'status': 'ok', 'database_pool': self.db.db.stats()})
+
+    async def show_metrics(self, request):
+        """GET /metrics: Prometheus text, or JSON with ?format=json"""
+        if request.query.get('format') == 'json':
+            return json_response(self.metrics.summary())
+        pool = self.db.db.stats()
+        gauges = {
+            'api_sessions': len(self.sessions),
+            'api_db_pool_in_use': pool['in_use'],
+            'api_db_pool_idle': pool['idle'],
+        }
+        return Response(body=self.metrics.render(gauges).encode(),
+                        headers={'Content-Type': 'text/plain; version=0.0.4'})
+
+    # Authentication
+    async def login(self, request):
+        """POST /api/auth/login {user_type, username, password}: returns a bearer token"""
+        body = request.json()
+        user_type, username, password = _required(body, 'user_type', 'username', 'password')
+        authenticate = {
+            'admin': self.db.authenticate_admin,
+            'staff': self.db.authenticate_staff,
+            'student': self.db.authenticate_student,
+        }.get(user_type)
+        if authenticate is None:
+            raise HttpError(400, f"user_type must be one of {', '.join(ALL_USERS)}")
+        user = await authenticate(username, password)
+        if user is None:
+            raise HttpError(401, "Invalid credentials")
+        token = self.sessions.create(user_type, user)
+        session = self.sessions.get(token)
+        return json_response({
+            'token': token,
+            'user_type': user_type,
+            'user': session['user'],
+            'expires_in': self.sessions.session_ttl,
+        })
+
+    async def logout(self, request):
+        """POST /api/auth/logout: ends the session"""
+        _, _, token = request.headers['authorization'].partition(' ')
+        self.sessions.revoke(token.strip())
+        return Response(204)
+
+    async def me(self, request):
+        """GET /api/auth/me: the logged-in user"""
+        return json_response({'user_type': request.session['user_type'], 'user': request.session['user']})
+
+    # Courses
+    async def list_courses(self, request):
+        """GET /api/courses"""
+        courses = _found(await self.reads.get(('courses',), self.db.get_all_courses))
+        return json_response(courses)
+
+    async def course_roster(self, request):
+        """GET /api/courses/{course_code}/roster?academic_year=&semester=[&include_waitlist=1]"""
+        academic_year, semester = _required(request.query, 'academic_year', 'semester')
+        course_id = await self._course_id(request.params['course_code'])
+        await self._check_assigned(request.session, course_id, academic_year, semester)
+        include_waitlist = request.query.get('include_waitlist', '').lower() in ('1', 'true', 'yes')
+        return await self._stream(self.db.stream_course_roster(
+            course_id, (academic_year, semester), include_waitlist, self.stream_batch_rows
+        ))
+
+    # Enrollments
+    async def list_enrollments(self, request):
+        """GET /api/students/{student_id}/enrollments[?academic_year=&semester=]"""
+        student_db_id = await self._student_db_id(request)
+        academic_year, semester = self._term(request)
+        enrollments = _found(await self.reads.get(
+            ('enrollments', student_db_id, academic_year, semester),
+            lambda: self.db.get_student_enrollments(student_db_id, academic_year, semester)
+        ))
+        return json_response(enrollments)
+
+    async def enroll(self, request):
+        """POST /api/students/{student_id}/enrollments {course_code, academic_year, semester[, waitlist]}"""
+        student_db_id = await self._student_db_id(request)
+        body = request.json()
+        course_code, academic_year, semester = _required(body, 'course_code', 'academic_year', 'semester')
+        course_id = await self._course_id(course_code)
+        status = _found(await self.db.enroll_student(
+            student_db_id, course_id, academic_year, semester, bool(body.get('waitlist', True))
+        ))
+        self.reads.clear()
+        # 'enrolled' or 'waitlisted' created an enrollment; 'duplicate' and
+        # 'full' did not
+        return json_response({'status': status}, 201 if status in ('enrolled', 'waitlisted') else 409)
+
+    async def unenroll(self, request):
+        """DELETE /api/students/{student_id}/enrollments/{course_code}?academic_year=&semester="""
+        student_db_id = await self._student_db_id(request)
+        academic_year, semester = _required(request.query, 'academic_year', 'semester')
+        course_id = await self._course_id(request.params['course_code'])
+        if not await self.db.unenroll_student(student_db_id, course_id, academic_year, semester):
+            raise HttpError(404, "Not enrolled in this course for that term")
+        self.reads.clear()
+        return Response(204)
+
+    # Results
+    async def academic_records(self, request):
+        """GET /api/students/{student_id}/records[?academic_year=&semester=]"""
+        student_db_id = await self._student_db_id(request)
+        academic_year, semester = self._term(request)
+        records = _found(await self.reads.get(
+            ('records', student_db_id, academic_year, semester),
+            lambda: self.db.get_student_academic_record(student_db_id, academic_year, semester)
+        ))
+        return json_response(records)
+
+    async def gpa_summary(self, request):
+        """GET /api/students/{student_id}/gpa: per-term and cumulative GPA"""
+        student_db_id = await self._student_db_id(request)
+        summary = _found(await self.reads.get(
+            ('gpa', student_db_id), lambda: self.db.get_student_gpa_summary(student_db_id)
+        ))
+        return json_response(summary)
+
+    # Reports
+    async def dashboard_report(self, request):
+        """GET /api/reports/dashboard: the admin dashboard figures"""
+        stats = _found(await self.reads.get(('dashboard',), self.db.get_dashboard_stats))
+        return json_response(stats)
+
+    async def gpa_report(self, request):
+        """GET /api/reports/gpas[?course_code=&academic_year=&semester=]: GPAs for every (or a course's) student"""
+        academic_year, semester = self._term(request)
+        course_code = request.query.get('course_code')
+        if request.session['user_type'] == 'staff' and not course_code:
+            raise HttpError(403, "Staff must give the course_code of a course they are assigned")
+        course_id = await self._course_id(course_code) if course_code else None
+        await self._check_assigned(request.session, course_id, academic_year, semester)
+        return await self._stream(self.db.stream_cohort_gpas(
+            course_id=course_id, academic_year=academic_year, semester=semester, batch_size=self.stream_batch_rows
+        ))
@@ -0,0 +1,68 @@
+import secrets
+import time
+
+# Fields of a user row that are safe to hand back to the client
+PUBLIC_USER_FIELDS = ('id', 'student_id', 'staff_id', 'email', 'full_name', 'department')
+
+# Seconds between sweeps for expired sessions
+PURGE_INTERVAL = 60
+
+
+class SessionStore:
+    """
+    In-memory bearer tokens for logged-in API users
+
+    Tokens are random and expire session_ttl seconds after login. They live
+    only in this process, so restarting the API logs everyone out.
+    """
+
+    def __init__(self, session_ttl=3600):
+        self.session_ttl = session_ttl
+        self._sessions = {}
+        self._purged_at = time.monotonic()
+
+    def create(self, user_type, user):
+        """
+        Start a session for an authenticated user
+
+        Args:
+            user_type (str): 'admin', 'staff' or 'student'
+            user (dict): The user's row from authenticate_*
+
+        Returns:
+            str: The session's bearer token
+        """
+        self._purge()
+        token = secrets.token_urlsafe(32)
+        self._sessions[token] = {
+            'user_type': user_type,
+            'user': {name: user[name] for name in PUBLIC_USER_FIELDS if name in user},
+            'expires': time.monotonic() + self.session_ttl,
+        }
+        return token
+
+    def get(self, token):
+        """Get a live session by token, or None"""
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if session['expires'] < time.monotonic():
+            del self._sessions[token]
+            return None
+        return session
+
+    def revoke(self, token):
+        """End a session"""
+        self._sessions.pop(token, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _purge(self):
+        """Drop expired sessions, at most once per PURGE_INTERVAL"""
+        now = time.monotonic()
+        if now - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        for token in [token for token, session in self._sessions.items() if session['expires'] < now]:
+            del self._sessions[token]
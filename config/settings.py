@@ -19,4 +19,52 @@ GRADE_BOUNDARIES = {
     'C': 60,
     'D': 50,
     'F': 0
-}
\ No newline at end of file
+}
+
+# Connection pool settings (shared by every DatabaseConnection in the process)
+DB_POOL_CONFIG = {
+    'min_size': 1,               # connections kept open even when idle
+    'max_size': 10,              # hard cap on open connections per process
+    'checkout_timeout': 30,      # seconds to wait for a free connection
+    'idle_timeout': 300,         # seconds before a spare idle connection is closed
+    'health_check_after': 30     # seconds idle before a connection is re-checked
+}
+
+# Pool for AsyncStudentResultsDB (database/async_operations.py); each
+# connection runs one query at a time, so this caps queries in flight
+ASYNC_DB_POOL_CONFIG = {
+    'min_size': 2,
+    'max_size': 20,
+    'command_timeout': 30,             # seconds before a query is abandoned
+    'max_inactive_connection_lifetime': 300
+}
+
+# In-process cache for reference data (courses and code -> id lookups)
+CACHE_CONFIG = {
+    'reference_ttl': 300,            # seconds before a cached entry is reloaded
+    'reference_max_entries': 10000   # least recently used entries are dropped past this
+}
+
+# Write-behind for score and enrollment writes (database/write_behind.py).
+# When enabled, those writes are saved to a local SQLite queue and the call
+# returns at once; a background thread commits them to PostgreSQL in batches.
+WRITE_BEHIND_CONFIG = {
+    'enabled': False,
+    'queue_path': 'data/write_behind.sqlite3',
+    'batch_size': 500,       # most queued writes committed per transaction
+    'flush_interval': 0.2,   # seconds the flusher waits for writes to collect
+    'retry_interval': 5      # seconds before retrying while PostgreSQL is unreachable
+}
+
+# Local HTTP API (run_api.py, api/)
+API_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8080,
+    'max_in_flight': 200,        # requests handled at once; the rest wait
+    'queue_timeout': 5,          # seconds a request may wait before a 503
+    'read_cache_ttl': 2,         # seconds identical reads share one result
+    'session_ttl': 3600,         # seconds a login token stays valid
+    'idle_timeout': 15,          # seconds an idle keep-alive connection is kept
+    'max_body_bytes': 64 * 1024,
+    'stream_batch_rows': 500     # rows fetched and sent per chunk of a streamed list
+}
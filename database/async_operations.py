@@ -0,0 +1,514 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import itertools
+import re
+from contextlib import asynccontextmanager
+import sys
+import os
+
+try:
+    import asyncpg
+except ImportError:
+    # Only the async service layer needs asyncpg (pip install asyncpg)
+    asyncpg = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DB_CONFIG, ASYNC_DB_POOL_CONFIG
+from database.connection import Transaction, pooled_connection
+from database.schema import ensure_schema
+from database.cache import reference_cache, COURSES_KEY, COURSE_IDS_KEY, student_key, staff_key
+from database.operations import split_bulk_scores, bulk_scores_result, summarize_term_gpas, dashboard_figures
+from database.queries import (
+    AUTHENTICATE_ADMIN_SQL, AUTHENTICATE_STUDENT_SQL, AUTHENTICATE_STAFF_SQL, CREATE_STUDENT_SQL, CREATE_STAFF_SQL,
+    STUDENT_DB_ID_SQL, STAFF_DB_ID_SQL, ADD_COURSE_SQL, ALL_COURSES_SQL, COURSE_ID_SQL, SET_CAPACITY_SQL,
+    CLEAR_SEATS_SQL, PROMOTE_WAITLIST_SQL, ENROLL_SQL, UNENROLL_SQL, COURSE_ENROLLMENTS_SQL, STAFF_TEACHES_STUDENT_SQL,
+    RECORD_SCORE_SQL,
+    RECORD_SCORES_BULK_SQL, GPA_SUMMARY_SQL, DASHBOARD_COUNTERS_SQL, staff_courses_query,
+    student_enrollments_query, course_roster_query, student_records_query, student_gpa_query, cohort_gpas_query
+)
+from utils.grade_calculator import calculate_grade, calculate_gpa_points
+
+# Errors a statement can fail with: server errors, and a connection that
+# was lost or is in the wrong state
+DATABASE_ERRORS = (asyncpg.PostgresError, asyncpg.InterfaceError, OSError) if asyncpg else (OSError,)
+
+
+
+def _ensure_schema():
+    """Apply pending migrations over a blocking connection (run in a thread)"""
+    with pooled_connection() as conn:
+        return ensure_schema(conn)
+
+
+@functools.lru_cache(maxsize=1024)
+def numbered_placeholders(query):
+    """Rewrite a query's psycopg2 placeholders (%s, and %% for a literal %) as asyncpg's $1, $2, ..."""
+    numbers = itertools.count(1)
+    return re.sub(r'%[s%]', lambda match: f"${next(numbers)}" if match.group() == '%s' else '%', query)
+
+
+class AsyncDatabaseConnection:
+    """
+    asyncpg connection pool with the DatabaseConnection interface, awaited
+
+    Statements borrow a pooled connection for just as long as they run, so
+    one process can keep up to max_size of them in flight without a thread
+    each. asyncpg prepares and caches every statement per connection and
+    pipelines executemany(). Inside transaction() every statement of the
+    task runs on the transaction's connection. Statements are written with
+    psycopg2's %s placeholders, like those in database/queries.py, and
+    rewritten for asyncpg before they are sent.
+    """
+
+    def __init__(self):
+        self.pool = None
+        # The open transaction and its connection, per task
+        self._transaction = contextvars.ContextVar('transaction', default=None)
+        self._connection = contextvars.ContextVar('connection', default=None)
+
+    async def connect(self):
+        """Open the connection pool"""
+        if asyncpg is None:
+            print("✗ asyncpg is not installed (pip install asyncpg)")
+            return False
+        try:
+            self.pool = await asyncpg.create_pool(
+                host=DB_CONFIG['host'], port=int(DB_CONFIG['port']),
+                database=DB_CONFIG['database'], user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'], **ASYNC_DB_POOL_CONFIG
+            )
+            print("✓ Database connection established successfully")
+            return True
+        except DATABASE_ERRORS as e:
+            print(f"✗ Error connecting to database: {e}")
+            return False
+
+    async def close(self):
+        """Close every pooled connection"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        print("✓ Database connection closed")
+
+    async def ensure_schema(self):
+        """Apply pending schema migrations"""
+        return await asyncio.to_thread(_ensure_schema)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Run a block of statements as one transaction
+
+            async with db.transaction() as tx:
+                await db.create_student(...)
+                await db.enroll_student(...)
+            if not tx.ok:
+                ...  # nothing was written
+
+        A nested call joins the outer transaction. Statements of one
+        transaction share a connection, so don't run them concurrently
+        (e.g. with asyncio.gather) inside the block.
+
+        Yields:
+            Transaction: Handle whose ``ok`` flag reports the outcome
+        """
+        outer = self._transaction.get()
+        if outer is not None:
+            yield outer
+            return
+
+        tx = Transaction()
+        if self.pool is None:
+            print("✗ No database connection available")
+            tx.fail(None)
+            yield tx
+            return
+
+        async with self.pool.acquire() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            tx_token = self._transaction.set(tx)
+            connection_token = self._connection.set(connection)
+            try:
+                yield tx
+                if tx.ok:
+                    await transaction.commit()
+                else:
+                    await transaction.rollback()
+            except DATABASE_ERRORS as e:
+                tx.fail(e)
+                await self._safe_rollback(transaction)
+                print(f"✗ Transaction failed: {e}")
+            except BaseException:
+                tx.fail(None)
+                await self._safe_rollback(transaction)
+                raise
+            finally:
+                self._transaction.reset(tx_token)
+                self._connection.reset(connection_token)
+
+    def in_transaction(self):
+        """Check whether the current task has an explicit transaction open"""
+        return self._transaction.get() is not None
+
+    async def execute_query(self, query, params=()):
+        """Execute a query and return its rows as dictionaries"""
+        if not self._ready():
+            return None
+        try:
+            async with self._acquire() as connection:
+                rows = await connection.fetch(numbered_placeholders(query), *params)
+            return [dict(row) for row in rows]
+        except DATABASE_ERRORS as e:
+            print(f"✗ Error executing query: {e}")
+            self._statement_failed(e)
+            return None
+
+    async def execute_update(self, query, params=()):
+        """Execute an update/insert statement"""
+        if not self._ready():
+            return False
+        try:
+            async with self._acquire() as connection:
+                await connection.execute(numbered_placeholders(query), *params)
+            return True
+        except DATABASE_ERRORS as e:
+            print(f"✗ Error executing update: {e}")
+            self._statement_failed(e)
+            return False
+
+    async def execute_many(self, query, params_list):
+        """
+        Run one statement for each parameter tuple, pipelined
+
+        All the executions go out without waiting for each reply, in one
+        implicit transaction unless a transaction() is open.
+
+        Returns:
+            bool: True if every execution succeeded
+        """
+        if not self._ready():
+            return False
+        try:
+            async with self._acquire() as connection:
+                await connection.executemany(numbered_placeholders(query), params_list)
+            return True
+        except DATABASE_ERRORS as e:
+            print(f"✗ Error executing update: {e}")
+            self._statement_failed(e)
+            return False
+
+    async def stream(self, query, params=(), batch_size=500):
+        """
+        Yield a query's rows in lists of up to batch_size dictionaries, read through a server-side cursor
+
+        Only one batch is held in memory at a time. The pooled connection
+        (or the open transaction's) is held until the rows run out or the
+        generator is closed, so close it (aclose()) if it isn't run to the
+        end. A failed statement is reported and re-raised.
+        """
+        if not self._ready():
+            raise ConnectionError("No database connection available")
+        try:
+            async with self._acquire() as connection:
+                # A cursor needs a transaction; inside transaction() this is a savepoint
+                async with connection.transaction():
+                    cursor = await connection.cursor(numbered_placeholders(query), *params)
+                    while True:
+                        rows = await cursor.fetch(batch_size)
+                        if not rows:
+                            return
+                        yield [dict(row) for row in rows]
+        except DATABASE_ERRORS as e:
+            print(f"✗ Error executing query: {e}")
+            self._statement_failed(e)
+            raise
+
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        if self.pool is None:
+            return {'in_use': 0, 'idle': 0, 'max_size': ASYNC_DB_POOL_CONFIG['max_size']}
+        return {
+            'in_use': self.pool.get_size() - self.pool.get_idle_size(),
+            'idle': self.pool.get_idle_size(),
+            'max_size': self.pool.get_max_size()
+        }
+
+    @asynccontextmanager
+    async def _acquire(self):
+        """Yield the transaction's connection, or borrow one for a single statement"""
+        connection = self._connection.get()
+        if connection is not None:
+            yield connection
+        else:
+            async with self.pool.acquire() as connection:
+                yield connection
+
+    def _ready(self):
+        """Check the pool is usable before running a statement"""
+        if self.pool is None:
+            print("✗ No database connection available")
+            return False
+        tx = self._transaction.get()
+        if tx is not None and not tx.ok:
+            # The server rejects everything after a failed statement until
+            # the transaction ends, so don't send it
+            return False
+        return True
+
+    def _statement_failed(self, error):
+        """Record a failed statement against the open transaction"""
+        tx = self._transaction.get()
+        if tx is not None:
+            tx.fail(error)
+
+    async def _safe_rollback(self, transaction):
+        try:
+            await transaction.rollback()
+        except DATABASE_ERRORS:
+            pass
+
+
+class AsyncStudentResultsDB:
+    """
+    Awaitable counterpart of StudentResultsDB for asyncio services
+
+        db = AsyncStudentResultsDB()
+        await db.connect()
+        records, gpa = await asyncio.gather(
+            db.get_student_academic_record(student_id),
+            db.calculate_student_gpa(student_id)
+        )
+
+    Methods take the same arguments and return the same values as their
+    StudentResultsDB namesakes, with two differences suited to serving
+    many users from one object: authenticate_* return the user's row (or
+    None) instead of setting current_user, and writes always go straight
+    to PostgreSQL (write-behind is for the desktop clients). The lists
+    that grow with enrollment also have stream_* variants that yield
+    their rows in batches from a server-side cursor.
+    """
+
+    def __init__(self):
+        self.db = AsyncDatabaseConnection()
+
+    async def connect(self):
+        """Open the pool and apply any pending schema migrations"""
+        if await self.db.connect():
+            return await self.db.ensure_schema()
+        return False
+
+    async def close(self):
+        """Close the pool"""
+        await self.db.close()
+
+    def transaction(self):
+        """Group several awaited operations into one atomic commit (see AsyncDatabaseConnection.transaction)"""
+        return self.db.transaction()
+
+    # Authentication methods
+    def hash_password(self, password):
+        """Hash password using SHA-256"""
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    async def _first(self, query, params):
+        result = await self.db.execute_query(query, params)
+        return result[0] if result else None
+
+    async def authenticate_admin(self, email, password):
+        """Get the admin user with these credentials, or None"""
+        return await self._first(AUTHENTICATE_ADMIN_SQL, (email, self.hash_password(password)))
+
+    async def authenticate_student(self, student_id, pin):
+        """Get the student with these credentials, or None"""
+        return await self._first(AUTHENTICATE_STUDENT_SQL, (student_id, pin))
+
+    async def authenticate_staff(self, staff_id, pin):
+        """Get the staff member with these credentials, or None"""
+        return await self._first(AUTHENTICATE_STAFF_SQL, (staff_id, pin))
+
+    # User management methods
+    async def create_student(self, student_id, pin, full_name, email=None, phone=None):
+        """Create a new student"""
+        created = await self.db.execute_update(CREATE_STUDENT_SQL, (student_id, pin, full_name, email, phone))
+        if created:
+            reference_cache.invalidate(student_key(student_id))
+        return created
+
+    async def create_staff(self, staff_id, pin, full_name, email=None, department=None):
+        """Create a new staff member"""
+        created = await self.db.execute_update(CREATE_STAFF_SQL, (staff_id, pin, full_name, email, department))
+        if created:
+            reference_cache.invalidate(staff_key(staff_id))
+        return created
+
+    async def get_student_db_id(self, student_id):
+        """Get a student's database id from their student ID (cached), or None"""
+        async def load():
+            row = await self._first(STUDENT_DB_ID_SQL, (student_id,))
+            return row['id'] if row else None
+        return await reference_cache.get_async(student_key(student_id), load)
+
+    async def get_staff_db_id(self, staff_id):
+        """Get a staff member's database id from their staff ID (cached), or None"""
+        async def load():
+            row = await self._first(STAFF_DB_ID_SQL, (staff_id,))
+            return row['id'] if row else None
+        return await reference_cache.get_async(staff_key(staff_id), load)
+
+    # Course management methods
+    async def add_course(self, course_code, course_name, credits=3, description=None, capacity=None):
+        """Add a new course (capacity None means unlimited seats)"""
+        added = await self.db.execute_update(ADD_COURSE_SQL, (course_code, course_name, credits, description, capacity))
+        if added:
+            reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return added
+
+    async def set_course_capacity(self, course_id, capacity):
+        """Change a course's seat limit; returns how many waitlisted students were promoted, or None"""
+        promoted = 0
+        async with self.db.transaction() as tx:
+            updated = await self.db.execute_update(SET_CAPACITY_SQL, (capacity, course_id))
+            if updated and capacity is None:
+                updated = await self.db.execute_update(CLEAR_SEATS_SQL, (course_id,))
+            if updated:
+                offerings = await self.db.execute_query(PROMOTE_WAITLIST_SQL, (course_id,))
+                if offerings is not None:
+                    promoted = sum(row['promoted'] for row in offerings)
+        if not tx.ok:
+            return None
+        reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return promoted
+
+    async def get_all_courses(self):
+        """Get all courses (cached; see database/cache.py)"""
+        courses = await reference_cache.get_async(COURSES_KEY, lambda: self.db.execute_query(ALL_COURSES_SQL))
+        # A new list each call, so callers can't reorder the cached one
+        return list(courses) if courses is not None else None
+
+    async def get_course_id(self, course_code):
+        """Get a course's database id from its code (cached), or None"""
+        async def load():
+            courses = await self.get_all_courses()
+            return {course['course_code']: course['id'] for course in courses} if courses is not None else None
+        course_ids = await reference_cache.get_async(COURSE_IDS_KEY, load)
+        if course_ids is None:
+            return None
+        if course_code in course_ids:
+            return course_ids[course_code]
+        # Not in the cached map; it may have been added since it was loaded
+        row = await self._first(COURSE_ID_SQL, (course_code,))
+        if row is None:
+            return None
+        reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return row['id']
+
+    async def get_staff_courses(self, staff_id, academic_year=None, semester=None):
+        """Get courses assigned to a staff member"""
+        return await self.db.execute_query(*staff_courses_query(staff_id, academic_year, semester))
+
+    async def staff_teaches_student(self, staff_id, student_id):
+        """Check whether a student is enrolled in one of a staff member's assigned course offerings (None on failure)"""
+        row = await self._first(STAFF_TEACHES_STUDENT_SQL, (staff_id, student_id))
+        return row['teaches'] if row else None
+
+    # Enrollment methods
+    async def enroll_student(self, student_id, course_id, academic_year, semester, waitlist=True):
+        """Enroll a student in a course within its capacity; returns the status as StudentResultsDB does"""
+        row = await self._first(ENROLL_SQL, (student_id, course_id, academic_year, semester, waitlist))
+        return row['status'] if row else None
+
+    async def unenroll_student(self, student_id, course_id, academic_year, semester):
+        """Unenroll a student from a course, handing their seat to the waitlist"""
+        row = await self._first(UNENROLL_SQL, (student_id, course_id, academic_year, semester))
+        return bool(row and row['removed'])
+
+    async def get_student_enrollments(self, student_id, academic_year=None, semester=None):
+        """Get all enrollments for a student"""
+        return await self.db.execute_query(*student_enrollments_query(student_id, academic_year, semester))
+
+    async def get_course_enrollments(self, course_id, academic_year, semester):
+        """Get all students enrolled in a specific course"""
+        return await self.db.execute_query(COURSE_ENROLLMENTS_SQL, (course_id, academic_year, semester))
+
+    async def get_course_roster(self, course_id, term, include_waitlist=False):
+        """Get a course offering's enrolled students with their scores, in one query"""
+        return await self.db.execute_query(*course_roster_query(course_id, term, include_waitlist))
+
+    def stream_course_roster(self, course_id, term, include_waitlist=False, batch_size=500):
+        """As get_course_roster, but yielding the rows in batches (see AsyncDatabaseConnection.stream)"""
+        return self.db.stream(*course_roster_query(course_id, term, include_waitlist), batch_size)
+
+    # Academic records methods
+    def _score_params(self, student_id, course_id, staff_id, academic_year, semester, score):
+        return (student_id, course_id, staff_id, academic_year, semester,
+                score, calculate_grade(score), calculate_gpa_points(score))
+
+    async def record_student_score(self, student_id, course_id, staff_id, academic_year, semester, score):
+        """Record a student's score for a course"""
+        return await self.db.execute_update(
+            RECORD_SCORE_SQL, self._score_params(student_id, course_id, staff_id, academic_year, semester, score)
+        )
+
+    async def record_student_scores(self, scores):
+        """
+        Record many scores in one pipelined round of statements
+
+        Args:
+            scores (list): (student_id, course_id, staff_id, academic_year,
+                semester, score) tuples, as record_student_score takes
+
+        Returns:
+            bool: True if every score was recorded (all or none are)
+        """
+        return await self.db.execute_many(RECORD_SCORE_SQL, [self._score_params(*score) for score in scores])
+
+    async def record_scores_bulk(self, course_id, term, scores, staff_id=None):
+        """Record scores for a whole course roster in one statement (see StudentResultsDB.record_scores_bulk)"""
+        academic_year, semester = term
+        columns, invalid = split_bulk_scores(scores)
+        if not columns['student_ids']:
+            return {'recorded': [], 'invalid': invalid}
+        rows = await self.db.execute_query(RECORD_SCORES_BULK_SQL, (
+            staff_id, columns['student_ids'], columns['scores'], columns['grades'], columns['gpa_points'],
+            course_id, academic_year, semester
+        ))
+        if rows is None:
+            return None
+        return bulk_scores_result(columns, invalid, rows)
+
+    async def get_student_academic_record(self, student_id, academic_year=None, semester=None):
+        """Get academic records for a student"""
+        return await self.db.execute_query(*student_records_query(student_id, academic_year, semester))
+
+    async def calculate_student_gpa(self, student_id, academic_year=None, semester=None):
+        """Read a student's credit-weighted GPA from the term summary"""
+        row = await self._first(*student_gpa_query(student_id, academic_year, semester))
+        if not row or row['gpa'] is None:
+            return 0.0
+        return float(row['gpa'])
+
+    async def get_student_gpa_summary(self, student_id):
+        """Get a student's GPA for every term plus the cumulative GPA"""
+        rows = await self.db.execute_query(GPA_SUMMARY_SQL, (student_id,))
+        if rows is None:
+            return None
+        return summarize_term_gpas(rows)
+
+    async def get_cohort_gpas(self, student_ids=None, course_id=None, academic_year=None, semester=None):
+        """Get GPAs for many students in one query (see StudentResultsDB.get_cohort_gpas)"""
+        return await self.db.execute_query(*cohort_gpas_query(student_ids, course_id, academic_year, semester))
+
+    def stream_cohort_gpas(self, student_ids=None, course_id=None, academic_year=None, semester=None,
+                           batch_size=500):
+        """As get_cohort_gpas, but yielding the rows in batches (see AsyncDatabaseConnection.stream)"""
+        return self.db.stream(*cohort_gpas_query(student_ids, course_id, academic_year, semester), batch_size)
+
+    async def get_dashboard_stats(self):
+        """Get the admin dashboard figures in one query (see StudentResultsDB.get_dashboard_stats)"""
+        rows = await self.db.execute_query(DASHBOARD_COUNTERS_SQL)
+        if rows is None:
+            return None
+        return dashboard_figures(rows)
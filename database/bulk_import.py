@@ -0,0 +1,333 @@
+import csv
+import io
+import os
+import time
+from utils.grade_calculator import calculate_grade
+from utils.file_handler import validate_student_record, StudentFileReader, ImportErrorCollector
+from database.notifications import SUPPRESS_ROW_NOTICES_SQL, notify_table_changed
+from database.checkpoints import save_checkpoint, mark_completed
+
+# Keep at most this many row-level error details in an import result
+MAX_ERROR_DETAILS = 100
+
+# Records committed per transaction by ResumableImporter
+IMPORT_BATCH_SIZE = 50000
+
+# Session-private staging for BulkImporter; parallel imports stage into a
+# shared UNLOGGED table instead (see database.parallel_import)
+STAGING_TABLE = 'student_results_staging'
+
+STAGING_TABLE_SQL = """
+CREATE {kind} TABLE {table} (
+    seq BIGINT NOT NULL,
+    index_number VARCHAR(10) NOT NULL,
+    full_name TEXT NOT NULL,
+    course TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    grade CHAR(1) NOT NULL
+){options}
+"""
+
+
+COPY_SQL = """
+COPY {table} (seq, index_number, full_name, course, score, grade)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+# One set-based upsert from the staging table. Each index number is
+# written once: on_conflict='skip' keeps its first occurrence in the input
+# and leaves existing records alone; 'update' takes its last occurrence
+# and overwrites existing records that differ. xmax is 0 only on rows this
+# statement inserted, which tells inserts from updates. Every staged index
+# number comes back with its outcome: 'inserted', 'updated' or 'skipped'.
+UPSERT_SQL = {
+    'skip': """
+    INSERT INTO student_results (index_number, full_name, course, score, grade)
+    SELECT DISTINCT ON (s.index_number) s.index_number, s.full_name, s.course, s.score, s.grade
+    FROM {staging} s
+    ORDER BY s.index_number, s.seq
+    ON CONFLICT (index_number) DO NOTHING
+    RETURNING index_number, xmax = 0 AS inserted
+    """,
+    'update': """
+    INSERT INTO student_results AS r (index_number, full_name, course, score, grade)
+    SELECT DISTINCT ON (s.index_number) s.index_number, s.full_name, s.course, s.score, s.grade
+    FROM {staging} s
+    ORDER BY s.index_number, s.seq DESC
+    ON CONFLICT (index_number) DO UPDATE
+    SET full_name = EXCLUDED.full_name, course = EXCLUDED.course,
+        score = EXCLUDED.score, grade = EXCLUDED.grade
+    WHERE (r.full_name, r.course, r.score, r.grade)
+        IS DISTINCT FROM (EXCLUDED.full_name, EXCLUDED.course, EXCLUDED.score, EXCLUDED.grade)
+    RETURNING index_number, xmax = 0 AS inserted
+    """
+}
+
+OUTCOMES_SQL = """
+WITH written AS ({upsert}),
+outcomes AS (
+    SELECT k.index_number,
+           CASE WHEN w.index_number IS NULL THEN 'skipped'
+                WHEN w.inserted THEN 'inserted'
+                ELSE 'updated' END AS outcome
+    FROM (SELECT DISTINCT index_number FROM {staging}) k
+    LEFT JOIN written w ON w.index_number = k.index_number
+)
+{select}
+"""
+
+SELECT_KEYS = "SELECT index_number, outcome FROM outcomes ORDER BY index_number"
+
+# Counted on the server, so huge imports don't fetch every key
+SELECT_COUNTS = "SELECT outcome, COUNT(*) AS keys FROM outcomes GROUP BY outcome"
+
+CONFLICT_ACTIONS = tuple(UPSERT_SQL)
+
+
+def new_import_result():
+    """Return an empty import result dictionary"""
+    return {
+        'inserted': 0,
+        'updated': 0,
+        'skipped': 0,
+        'duplicates': 0,
+        'errors': 0,
+        'error_details': [],
+        'rows_per_second': 0.0
+    }
+
+
+def new_file_import_result(resumed_from=0):
+    """
+    Return an empty result for a file import, which may be resumed or skipped
+
+    failed is set when a transaction was rolled back; the reason is in
+    error_details.
+    """
+    result = new_import_result()
+    result.update(resumed_from=resumed_from, already_imported=False, cancelled=False, failed=False)
+    return result
+
+
+def add_counts(result, batch):
+    """Add one batch's import result to the running result"""
+    for name in ('inserted', 'updated', 'skipped', 'duplicates', 'errors'):
+        result[name] += batch[name]
+    room = MAX_ERROR_DETAILS - len(result['error_details'])
+    result['error_details'].extend(batch['error_details'][:room])
+
+
+def record_error(result, message, record=None):
+    """Count a rejected row and keep its details if there is room"""
+    result['errors'] += 1
+    if len(result['error_details']) < MAX_ERROR_DETAILS:
+        result['error_details'].append({'message': message, 'record': record})
+
+
+def merge_staged(cursor, staging, on_conflict, result, keys=False):
+    """
+    Upsert staged records into student_results and count the outcomes into result
+
+    Runs inside the caller's transaction; row notices are replaced by one
+    table notice if anything was written.
+
+    Args:
+        cursor: Cursor of the transaction to merge in
+        staging (str): Staging table holding the records
+        on_conflict (str): 'skip' or 'update' (see UPSERT_SQL)
+        result (dict): Import result to add the counts to
+        keys (bool): Also fill result['keys'] with the index numbers per outcome
+    """
+    upsert = UPSERT_SQL[on_conflict].format(staging=staging)
+    cursor.execute(SUPPRESS_ROW_NOTICES_SQL)
+    if keys:
+        cursor.execute(OUTCOMES_SQL.format(upsert=upsert, staging=staging, select=SELECT_KEYS))
+        for row in cursor.fetchall():
+            result['keys'][row['outcome']].append(row['index_number'])
+            result[row['outcome']] += 1
+    else:
+        cursor.execute(OUTCOMES_SQL.format(upsert=upsert, staging=staging, select=SELECT_COUNTS))
+        for row in cursor.fetchall():
+            result[row['outcome']] = row['keys']
+    if result['inserted'] or result['updated']:
+        notify_table_changed(cursor, 'student_results')
+
+
+def check_conflict_action(on_conflict):
+    """Raise ValueError unless on_conflict is one of CONFLICT_ACTIONS"""
+    if on_conflict not in CONFLICT_ACTIONS:
+        raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_ACTIONS)}")
+
+
+class _CopyStream:
+    """File-like object that renders records as CSV on demand for COPY FROM STDIN"""
+
+    def __init__(self, records, result, first_seq=1):
+        self.records = iter(records)
+        self.result = result
+        self.first_seq = first_seq
+        self.staged = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+
+    def read(self, size=-1):
+        # Fill the pending chunk until COPY's requested size is reached,
+        # so only one chunk of rows is held in memory at a time
+        while size < 0 or len(self._pending) < size:
+            record = next(self.records, None)
+            if record is None:
+                break
+            self._stage(record)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        if size < 0:
+            chunk, self._pending = self._pending, ''
+        else:
+            chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    def _stage(self, record):
+        error = validate_student_record(record)
+        if error:
+            record_error(self.result, error, record)
+            return
+        score = int(record['score'])
+        self._writer.writerow((
+            self.first_seq + self.staged,
+            str(record['index_number']).strip(),
+            str(record['full_name']).strip(),
+            str(record['course']).strip(),
+            score,
+            calculate_grade(score)
+        ))
+        self.staged += 1
+
+
+class BulkImporter:
+    def __init__(self, db, on_conflict='skip'):
+        check_conflict_action(on_conflict)
+        self.db = db
+        self.on_conflict = on_conflict
+
+    def import_records(self, records, keys=False):
+        """
+        Stream student records into student_results with COPY and one upsert
+
+        Args:
+            records (iterable): Record dictionaries as produced by read_student_data
+            keys (bool): Also return which index numbers had which outcome
+
+        Returns:
+            dict: inserted, updated and skipped counts (per index number),
+            duplicates (records repeating an index number earlier in the
+            input), errors, up to MAX_ERROR_DETAILS error_details and
+            rows_per_second; with keys, 'keys' maps each outcome to a list
+            of index numbers
+        """
+        result = new_import_result()
+        if keys:
+            result['keys'] = {'inserted': [], 'updated': [], 'skipped': []}
+        stream = _CopyStream(records, result)
+        started = time.monotonic()
+
+        with self.db.transaction() as tx:
+            if tx.ok:
+                cursor = self.db.cursor
+                cursor.execute(STAGING_TABLE_SQL.format(kind='TEMP', table=STAGING_TABLE, options=' ON COMMIT DROP'))
+                cursor.copy_expert(COPY_SQL.format(table=STAGING_TABLE), stream)
+                merge_staged(cursor, STAGING_TABLE, self.on_conflict, result, keys)
+
+        if not tx.ok:
+            # The whole import was rolled back, so every staged row failed
+            result.update(inserted=0, updated=0, skipped=0)
+            if keys:
+                result['keys'] = {'inserted': [], 'updated': [], 'skipped': []}
+            result['errors'] += stream.staged
+            result['error_details'].append({'message': f"import failed: {tx.error}", 'record': None})
+            return result
+
+        result['duplicates'] = stream.staged - result['inserted'] - result['updated'] - result['skipped']
+        elapsed = time.monotonic() - started
+        if elapsed > 0:
+            result['rows_per_second'] = round((stream.staged + result['errors']) / elapsed, 1)
+        return result
+
+
+class ResumableImporter:
+    """
+    Import a file in batches, each committed with a checkpoint
+
+        result = ResumableImporter(db, 'skip').import_file(path, digest, start_offset)
+
+    Every batch of records is upserted and the byte offset after its last
+    line saved to import_checkpoints in one transaction, so an import that
+    dies part way can be resumed from that offset without redoing or
+    repeating any batch. Unlike BulkImporter the file is not imported as a
+    whole: an index number repeated in a later batch counts as skipped (or
+    updated) rather than as a duplicate.
+    """
+
+    def __init__(self, db, on_conflict='skip', batch_size=IMPORT_BATCH_SIZE):
+        check_conflict_action(on_conflict)
+        self.db = db
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+
+    def import_file(self, file_path, digest, start_offset=0, errors=None, should_stop=None):
+        """
+        Import a CSV or TXT file of student records (legacy) from a byte offset
+
+        Args:
+            file_path (str): Path to the data file
+            digest (str): checkpoints.file_hash() of the file
+            start_offset (int): Offset to resume from (a checkpoint's byte_offset)
+            errors (ImportErrorCollector, optional): Receives per-line errors
+            should_stop (callable, optional): Checked between batches;
+                returning True stops after the last committed batch
+
+        Returns:
+            dict: The counts from BulkImporter.import_records (without
+            keys) for this run, plus resumed_from, already_imported,
+            cancelled and failed
+        """
+        errors = errors if errors is not None else ImportErrorCollector()
+        result = new_file_import_result(start_offset)
+        reader = StudentFileReader(file_path, self.batch_size, errors, start_offset=start_offset)
+        started = time.monotonic()
+        staged = 0
+
+        for batch in reader:
+            if should_stop is not None and should_stop():
+                result['cancelled'] = True
+                return result
+            batch_result = new_import_result()
+            stream = _CopyStream(batch, batch_result)
+            with self.db.transaction() as tx:
+                if tx.ok:
+                    cursor = self.db.cursor
+                    cursor.execute(STAGING_TABLE_SQL.format(kind='TEMP', table=STAGING_TABLE, options=' ON COMMIT DROP'))
+                    cursor.copy_expert(COPY_SQL.format(table=STAGING_TABLE), stream)
+                    merge_staged(cursor, STAGING_TABLE, self.on_conflict, batch_result)
+                    save_checkpoint(cursor, digest, self.on_conflict, file_path, reader.offset, stream.staged)
+            if not tx.ok:
+                # Earlier batches stay committed; a re-run resumes before this one
+                batch_result.update(inserted=0, updated=0, skipped=0)
+                batch_result['errors'] += stream.staged
+                batch_result['error_details'].append({'message': f"import failed: {tx.error}", 'record': None})
+                add_counts(result, batch_result)
+                result['failed'] = True
+                return result
+            batch_result['duplicates'] = (stream.staged - batch_result['inserted']
+                                          - batch_result['updated'] - batch_result['skipped'])
+            add_counts(result, batch_result)
+            staged += stream.staged
+
+        if os.path.exists(file_path):
+            mark_completed(self.db, digest, self.on_conflict, file_path, reader.offset)
+        elapsed = time.monotonic() - started
+        if elapsed > 0:
+            result['rows_per_second'] = round((staged + result['errors']) / elapsed, 1)
+        return result
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import CACHE_CONFIG
+
+
+class TTLCache:
+    """
+    Thread-safe read-through cache whose entries expire after ttl seconds
+
+        courses = cache.get(('courses',), load_courses)
+
+    A loader returning None (a failed or empty lookup) is not cached. Past
+    max_entries the least recently used entry is dropped.
+    """
+
+    def __init__(self, ttl=300, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a load that raced one isn't stored
+        self._generation = 0
+
+    def get(self, key, loader):
+        """
+        Return the cached value for key, calling loader() on a miss
+
+        Args:
+            key (hashable): Cache key
+            loader (callable): Loads the value; None results are not cached
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value, generation = self._lookup(key)
+        if generation is None:
+            return value
+        # Load outside the lock so one slow query doesn't block other keys
+        return self._store(key, generation, loader())
+
+    async def get_async(self, key, loader):
+        """As get(), for a loader that is a coroutine function"""
+        value, generation = self._lookup(key)
+        if generation is None:
+            return value
+        return self._store(key, generation, await loader())
+
+    def _lookup(self, key):
+        """Return (value, None) on a hit, else (None, the generation a load must store under)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], None
+            self.misses += 1
+            return None, self._generation
+
+    def _store(self, key, generation, value):
+        """Cache a loaded value unless it is None or an invalidation raced its load"""
+        if value is None:
+            return value
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop the given keys"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return the cache's counters
+
+        Returns:
+            dict: hits, misses, entries and hit_rate (0-1)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Courses and the code -> id maps for courses, students and staff, shared by
+# every StudentResultsDB and AsyncStudentResultsDB in the process
+reference_cache = TTLCache(CACHE_CONFIG['reference_ttl'], CACHE_CONFIG['reference_max_entries'])
+
+COURSES_KEY = ('courses',)
+COURSE_IDS_KEY = ('course_ids',)
+
+
+def student_key(student_id):
+    return ('student_db_id', student_id)
+
+
+def staff_key(staff_id):
+    return ('staff_db_id', staff_id)
+
+
+# Tables whose notices invalidate_reference_data acts on
+REFERENCE_TABLES = ('courses', 'students', 'staff')
+
+
+def invalidate_reference_data(change):
+    """
+    Drop reference data touched by a change notice (see database.notifications)
+
+    Subscribe it to a ChangeListener so writes made by other processes
+    don't wait out the TTL.
+    """
+    table = change['table']
+    if table == '*' or (change['op'] == '*' and table in REFERENCE_TABLES):
+        reference_cache.clear()
+    elif table == 'courses':
+        reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+    elif table == 'students':
+        reference_cache.invalidate(student_key(change['key'].get('student_id')))
+    elif table == 'staff':
+        reference_cache.invalidate(staff_key(change['key'].get('staff_id')))
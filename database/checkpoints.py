@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+# Bytes read at a time while hashing a file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+SAVE_CHECKPOINT_SQL = """
+INSERT INTO import_checkpoints AS c (file_hash, on_conflict, file_name, byte_offset, rows_committed, completed)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (file_hash, on_conflict) DO UPDATE
+SET file_name = EXCLUDED.file_name,
+    byte_offset = EXCLUDED.byte_offset,
+    rows_committed = c.rows_committed + EXCLUDED.rows_committed,
+    completed = EXCLUDED.completed,
+    updated_at = now()
+"""
+
+
+def file_hash(file_path):
+    """
+    Return the SHA-256 of a file's content, read in blocks
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        str: 64 hex digits
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(db, digest, on_conflict):
+    """
+    Get the checkpoint of an earlier import of the same file content
+
+    Args:
+        db (DatabaseConnection): Connection to read with
+        digest (str): file_hash() of the file
+        on_conflict (str): The import's on_conflict action
+
+    Returns:
+        dict: The import_checkpoints row, or None if the file hasn't been
+        imported this way before (or the lookup failed)
+    """
+    result = db.execute_query(
+        "SELECT * FROM import_checkpoints WHERE file_hash = %s AND on_conflict = %s",
+        (digest, on_conflict)
+    )
+    return result[0] if result else None
+
+
+def save_checkpoint(cursor, digest, on_conflict, file_path, byte_offset, rows, completed=False):
+    """
+    Record an import's progress; call inside the transaction that committed the rows
+
+    Args:
+        cursor: Cursor of the import transaction
+        digest (str): file_hash() of the file
+        on_conflict (str): The import's on_conflict action
+        file_path (str): Path of the file, kept for reference
+        byte_offset (int): End of the last line covered
+        rows (int): Rows staged since the previous checkpoint
+        completed (bool): True once the whole file is imported
+    """
+    cursor.execute(SAVE_CHECKPOINT_SQL, (
+        digest, on_conflict, os.path.basename(file_path), byte_offset, rows, completed
+    ))
+
+
+def mark_completed(db, digest, on_conflict, file_path, byte_offset):
+    """
+    Record that a file has been imported in full, so importing it again does nothing
+
+    Args:
+        db (DatabaseConnection): Connection to write with
+        digest (str): file_hash() of the file
+        on_conflict (str): The import's on_conflict action
+        file_path (str): Path of the file
+        byte_offset (int): End of the file
+
+    Returns:
+        bool: True if recorded
+    """
+    return db.execute_update(SAVE_CHECKPOINT_SQL, (
+        digest, on_conflict, os.path.basename(file_path), byte_offset, 0, True
+    ))
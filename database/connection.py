@@ -1,21 +1,258 @@
 import psycopg2
+import psycopg2.pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from psycopg2.extras import RealDictCursor
+from contextlib import contextmanager
+import threading
+import time
 import sys
 import os
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import DB_CONFIG
+from config.settings import DB_CONFIG, DB_POOL_CONFIG
+from database.schema import ensure_schema
+
+
+class ConnectionPool:
+    """Thread-safe, size-limited pool of PostgreSQL connections"""
+    
+    def __init__(self, min_size=1, max_size=10, checkout_timeout=30,
+                 idle_timeout=300, health_check_after=30, **dsn):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.dsn = dsn
+        self.pid = os.getpid()
+        
+        # Idle connections as (connection, returned_at); the most recently
+        # returned connection sits at the end and is handed out first
+        self._idle = []
+        self._in_use = set()
+        # Slots reserved by checkouts that are opening a new connection
+        self._connecting = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reaper = None
+    
+    def getconn(self, timeout=None):
+        """Check a connection out of the pool, waiting if the pool is full"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            conn, returned_at = self._reserve(deadline, timeout)
+            if conn is None:
+                return self._connect()
+            # The health check's round trip runs outside the lock
+            if self._is_healthy(conn, returned_at):
+                return conn
+            self.putconn(conn, close=True)
+    
+    def _reserve(self, deadline, timeout):
+        """
+        Take an idle connection, or a slot to open a new one in
+        
+        Returns:
+            tuple: (connection, returned_at) for an idle connection, now
+            counted as in use; (None, None) when a slot was reserved for
+            _connect()
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                
+                self._reap_idle()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._in_use.add(conn)
+                    return conn, returned_at
+                
+                if len(self._in_use) + self._connecting < self.max_size:
+                    self._connecting += 1
+                    return None, None
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise psycopg2.pool.PoolError(
+                        f"no free connection after {timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+    
+    def _connect(self):
+        """Open a connection in a slot reserved by _reserve(), without holding the lock"""
+        try:
+            conn = psycopg2.connect(**self.dsn)
+            # Plain reads and single writes need no BEGIN/COMMIT;
+            # DatabaseConnection.transaction() switches this off
+            conn.autocommit = True
+        except Exception:
+            with self._cond:
+                self._connecting -= 1
+                self._cond.notify()
+            raise
+        
+        with self._cond:
+            self._connecting -= 1
+            if self._closed:
+                self._discard(conn)
+                self._cond.notify()
+                raise psycopg2.pool.PoolError("connection pool is closed")
+            self._in_use.add(conn)
+            self._start_reaper()
+            return conn
+    
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool"""
+        with self._cond:
+            self._in_use.discard(conn)
+            
+            if close or self._closed or conn.closed:
+                self._discard(conn)
+            else:
+                try:
+                    # Never hand out a connection with an open transaction
+                    if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if not conn.autocommit:
+                        conn.autocommit = True
+                    self._idle.append((conn, time.monotonic()))
+                except psycopg2.Error:
+                    self._discard(conn)
+            
+            self._cond.notify()
+    
+    def reap(self):
+        """Close spare connections that have been idle too long"""
+        with self._cond:
+            self._reap_idle()
+    
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._cond.notify_all()
+    
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        with self._cond:
+            return {
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'max_size': self.max_size
+            }
+    
+    def _is_healthy(self, conn, returned_at):
+        """Check an idle connection before handing it out"""
+        if conn.closed:
+            return False
+        # Only pay a round trip for connections that sat idle for a while
+        if time.monotonic() - returned_at < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def _reap_idle(self):
+        """Close idle connections above min_size that exceeded idle_timeout"""
+        now = time.monotonic()
+        open_count = len(self._idle) + len(self._in_use) + self._connecting
+        kept = []
+        # Oldest connections are at the front of the list
+        for conn, returned_at in self._idle:
+            if open_count > self.min_size and now - returned_at > self.idle_timeout:
+                self._discard(conn)
+                open_count -= 1
+            else:
+                kept.append((conn, returned_at))
+        self._idle = kept
+    
+    def _discard(self, conn):
+        try:
+            if not conn.closed:
+                conn.close()
+        except psycopg2.Error:
+            pass
+    
+    def _start_reaper(self):
+        """Start the background thread that closes idle connections"""
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="db-pool-reaper", daemon=True)
+        self._reaper.start()
+    
+    def _reap_loop(self):
+        interval = max(self.idle_timeout / 2, 1)
+        while not self._closed:
+            time.sleep(interval)
+            self.reap()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        # A forked child must not share sockets with its parent
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(**DB_POOL_CONFIG, **DB_CONFIG)
+        return _pool
+
+
+@contextmanager
+def pooled_connection():
+    """Borrow a raw connection from the pool for the duration of a block"""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+class Transaction:
+    """Outcome of a DatabaseConnection.transaction() block"""
+    
+    def __init__(self):
+        self.ok = True
+        self.error = None
+    
+    def fail(self, error):
+        """Mark the transaction for rollback"""
+        self.ok = False
+        if self.error is None:
+            self.error = error
+    
+    def rollback(self):
+        """Discard the block's changes when it exits"""
+        self.fail(None)
+
 
 class DatabaseConnection:
     def __init__(self):
         self.connection = None
         self.cursor = None
+        self._transaction = None
     
     def connect(self):
-        """Establish connection to PostgreSQL database"""
+        """Check out a connection from the shared pool"""
         try:
-            self.connection = psycopg2.connect(**DB_CONFIG)
+            if self.connection:
+                self.close()
+            self.connection = get_pool().getconn()
             self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
             print("✓ Database connection established successfully")
             return True
@@ -24,175 +261,128 @@ class DatabaseConnection:
             return False
     
     def close(self):
-        """Close database connection"""
+        """Return the connection to the shared pool"""
         if self.cursor:
-            self.cursor.close()
+            try:
+                self.cursor.close()
+            except psycopg2.Error:
+                pass
+            self.cursor = None
         if self.connection:
-            self.connection.close()
+            get_pool().putconn(self.connection)
+            self.connection = None
         print("✓ Database connection closed")
     
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of statements as one transaction
+        
+        Statements inside the block are committed together when it exits, or
+        rolled back if any of them fails or the block raises. A nested call
+        joins the outer transaction instead of starting a new one.
+        
+        Yields:
+            Transaction: Handle whose ``ok`` flag reports the outcome
+        """
+        if self._transaction is not None:
+            yield self._transaction
+            return
+        
+        if not self.connection or not self.cursor:
+            print("✗ No database connection available")
+            tx = Transaction()
+            tx.fail(psycopg2.InterfaceError("no database connection"))
+            yield tx
+            return
+        
+        tx = Transaction()
+        self._transaction = tx
+        self.connection.autocommit = False
+        try:
+            yield tx
+            if tx.ok:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+        except psycopg2.Error as e:
+            tx.fail(e)
+            self._safe_rollback()
+            print(f"✗ Transaction failed: {e}")
+        except BaseException:
+            tx.fail(None)
+            self._safe_rollback()
+            raise
+        finally:
+            self._transaction = None
+            if not self.connection.closed:
+                self.connection.autocommit = True
+    
+    def in_transaction(self):
+        """Check whether an explicit transaction is open"""
+        return self._transaction is not None
+    
     def execute_query(self, query, params=None):
         """Execute a query and return results"""
+        if not self._ready():
+            return None
         try:
-            # Check if connection and cursor exist
-            if not self.connection or not self.cursor:
-                print("✗ No database connection available")
-                return None
-            
-            # Check if connection is in error state
-            if self.connection and self.connection.closed == 0:
-                # Reset any aborted transaction
-                self.connection.rollback()
-            
             self.cursor.execute(query, params)
             return self.cursor.fetchall()
         except psycopg2.Error as e:
             print(f"✗ Error executing query: {e}")
-            # Rollback on error
-            if self.connection and not self.connection.closed:
-                self.connection.rollback()
+            self._statement_failed(e)
             return None
     
     def execute_update(self, query, params=None):
         """Execute an update/insert query"""
+        if not self._ready():
+            return False
         try:
-            # Check if connection and cursor exist
-            if not self.connection or not self.cursor:
-                print("✗ No database connection available")
-                return False
-            
-            # Check if connection is in error state
-            if self.connection and self.connection.closed == 0:
-                # Reset any aborted transaction
-                self.connection.rollback()
-            
             self.cursor.execute(query, params)
-            self.connection.commit()
+            # Outside a transaction the connection autocommits, so a single
+            # statement costs a single round trip
             return True
         except psycopg2.Error as e:
             print(f"✗ Error executing update: {e}")
-            # Rollback on error
+            self._statement_failed(e)
+            return False
+    
+    def _ready(self):
+        """Check the connection is usable before running a statement"""
+        if not self.connection or not self.cursor:
+            print("✗ No database connection available")
+            return False
+        if self._transaction is not None and not self._transaction.ok:
+            # The server rejects everything after a failed statement until
+            # the transaction ends, so don't send it
+            return False
+        return True
+    
+    def _statement_failed(self, error):
+        """Record a failed statement against the open transaction"""
+        if self._transaction is not None:
+            self._transaction.fail(error)
+        elif self.connection and not self.connection.closed and not self.connection.autocommit:
+            self._safe_rollback()
+    
+    def _safe_rollback(self):
+        try:
             if self.connection and not self.connection.closed:
                 self.connection.rollback()
+        except psycopg2.Error:
+            pass
+    
+    def ensure_schema(self):
+        """Apply pending schema migrations (a single query when up to date)"""
+        if not self.connection:
+            print("✗ No database connection available")
             return False
+        return ensure_schema(self.connection)
     
     def create_table(self):
-        """Create all necessary tables for the enhanced system"""
-        # Only create tables if they don't exist - don't drop existing data
-        tables = [
-            # Users table for authentication
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE,
-                password_hash VARCHAR(255) NOT NULL,
-                user_type VARCHAR(20) NOT NULL CHECK (user_type IN ('admin', 'staff', 'student')),
-                full_name TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            
-            # Students table
-            """
-            CREATE TABLE IF NOT EXISTS students (
-                id SERIAL PRIMARY KEY,
-                student_id VARCHAR(8) UNIQUE NOT NULL,
-                pin VARCHAR(5) NOT NULL,
-                full_name TEXT NOT NULL,
-                email VARCHAR(100),
-                phone VARCHAR(20),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            
-            # Staff table
-            """
-            CREATE TABLE IF NOT EXISTS staff (
-                id SERIAL PRIMARY KEY,
-                staff_id VARCHAR(8) UNIQUE NOT NULL,
-                pin VARCHAR(5) NOT NULL,
-                full_name TEXT NOT NULL,
-                email VARCHAR(100),
-                department TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            
-            # Courses table
-            """
-            CREATE TABLE IF NOT EXISTS courses (
-                id SERIAL PRIMARY KEY,
-                course_code VARCHAR(10) UNIQUE NOT NULL,
-                course_name TEXT NOT NULL,
-                credits INTEGER NOT NULL DEFAULT 3 CHECK (credits >= 1 AND credits <= 3),
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            
-            # Course assignments (which staff teaches which course)
-            """
-            CREATE TABLE IF NOT EXISTS course_assignments (
-                id SERIAL PRIMARY KEY,
-                staff_id INTEGER REFERENCES staff(id),
-                course_id INTEGER REFERENCES courses(id),
-                academic_year VARCHAR(9) NOT NULL,
-                semester VARCHAR(20) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(staff_id, course_id, academic_year, semester)
-            );
-            """,
-            
-            # Enrollments (which students are enrolled in which courses)
-            """
-            CREATE TABLE IF NOT EXISTS enrollments (
-                id SERIAL PRIMARY KEY,
-                student_id INTEGER REFERENCES students(id),
-                course_id INTEGER REFERENCES courses(id),
-                academic_year VARCHAR(9) NOT NULL,
-                semester VARCHAR(20) NOT NULL,
-                enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(student_id, course_id, academic_year, semester)
-            );
-            """,
-            
-            # Academic records (student scores and grades)
-            """
-            CREATE TABLE IF NOT EXISTS academic_records (
-                id SERIAL PRIMARY KEY,
-                student_id INTEGER REFERENCES students(id),
-                course_id INTEGER REFERENCES courses(id),
-                staff_id INTEGER REFERENCES staff(id),
-                academic_year VARCHAR(9) NOT NULL,
-                semester VARCHAR(20) NOT NULL,
-                score INTEGER NOT NULL CHECK (score >= 0 AND score <= 100),
-                grade CHAR(1) NOT NULL,
-                gpa_points DECIMAL(3,2) NOT NULL,
-                credits INTEGER NOT NULL DEFAULT 3 CHECK (credits >= 1 AND credits <= 3),
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(student_id, course_id, academic_year, semester)
-            );
-            """,
-            
-            # Legacy student_results table (for backward compatibility)
-            """
-            CREATE TABLE IF NOT EXISTS student_results (
-                id SERIAL PRIMARY KEY,
-                index_number VARCHAR(10) NOT NULL,
-                full_name TEXT NOT NULL,
-                course TEXT NOT NULL,
-                score INTEGER NOT NULL,
-                grade CHAR(1)
-            );
-            """
-        ]
-        
-        for table_query in tables:
-            if not self.execute_update(table_query):
-                return False
-        
-        return True
+        """Create all necessary tables (kept for older callers)"""
+        return self.ensure_schema()
     
     def is_connected(self):
         """Check if database connection is active"""
@@ -208,5 +398,10 @@ class DatabaseConnection:
     def ensure_connection(self):
         """Ensure database connection is active, reconnect if needed"""
         if not self.is_connected():
+            if self.connection:
+                # Drop the broken connection instead of returning it to the pool
+                get_pool().putconn(self.connection, close=True)
+                self.connection = None
+                self.cursor = None
             return self.connect()
         return True
\ No newline at end of file
@@ -0,0 +1,53 @@
+# Indexes shipped by the migrations, keyed by name, with the table they
+# belong to and the query paths that rely on them
+MANAGED_INDEXES = {
+    'idx_academic_records_student_term': ('academic_records', 'get_student_academic_record, calculate_student_gpa'),
+    'idx_academic_records_course_term': ('academic_records', 'course grade listings'),
+    'idx_enrollments_course_term': ('enrollments', 'get_course_enrollments, get_course_roster'),
+    'idx_course_assignments_staff_term': ('course_assignments', 'get_staff_courses'),
+    'student_results_index_number_key': ('student_results', 'upsert_students, student_exists, get_student_by_index, update_student_score, delete_student'),
+    'idx_students_name_id': ('students', 'get_students_page'),
+    'idx_staff_name_id': ('staff', 'get_staff_page'),
+    'idx_student_results_name_id': ('student_results', 'get_legacy_students_page'),
+    'idx_academic_records_recorded_id': ('academic_records', 'get_academic_records_page'),
+    'idx_student_results_updated_at': ('student_results', 'get_students_changed_since'),
+    'idx_student_results_deleted_at': ('student_results_deleted', 'get_students_changed_since'),
+    'idx_course_seats_free': ('course_seats', 'enroll_student (seat claims)'),
+    'idx_course_seats_student': ('course_seats', 'unenroll_student'),
+    'idx_enrollments_waitlist': ('enrollments', 'waitlist promotion'),
+}
+
+
+def check_indexes(connection, managed=MANAGED_INDEXES):
+    """
+    Compare the managed index set with what exists in the database
+
+    Args:
+        connection: Open psycopg2 connection
+        managed (dict): Index name -> (table, description)
+
+    Returns:
+        dict: 'missing' (names not in the database), 'unused' (managed
+        indexes never scanned since statistics were last reset) and
+        'present' (managed indexes found), each a list of dictionaries
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT s.indexrelname AS name, s.relname AS table_name, s.idx_scan,
+                   pg_relation_size(s.indexrelid) AS size_bytes
+            FROM pg_stat_user_indexes s
+            WHERE s.indexrelname = ANY(%s)
+        """, (list(managed),))
+        found = {row[0]: row for row in cursor.fetchall()}
+
+    report = {'missing': [], 'unused': [], 'present': []}
+    for name, (table, used_by) in managed.items():
+        if name not in found:
+            report['missing'].append({'name': name, 'table': table, 'used_by': used_by})
+            continue
+        _, table_name, scans, size_bytes = found[name]
+        entry = {'name': name, 'table': table_name, 'scans': scans, 'size_bytes': size_bytes, 'used_by': used_by}
+        report['present'].append(entry)
+        if scans == 0:
+            report['unused'].append(entry)
+    return report
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Database maintenance commands
+
+Usage:
+    python -m database.maintenance status
+    python -m database.maintenance migrate
+    python -m database.maintenance check-indexes
+    python -m database.maintenance rebuild-gpa-summary
+    python -m database.maintenance recount-stats
+    python -m database.maintenance flush-writes
+"""
+
+import argparse
+import sys
+import os
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import pooled_connection
+from database.schema import SchemaMigrator
+from database.indexes import check_indexes
+from database.operations import dashboard_figures
+from database.queries import DASHBOARD_COUNTERS_SQL
+from database.write_behind import WriteBehind, WriteQueue
+from config.settings import WRITE_BEHIND_CONFIG
+
+
+def show_status(conn):
+    """Print applied and pending migrations"""
+    migrator = SchemaMigrator(conn)
+    current = migrator.current_version()
+    print(f"Schema version: {current} (head: {migrator.head_version})")
+    pending = migrator.pending_migrations(current)
+    if pending:
+        print("Pending migrations:")
+        for version, name, _ in pending:
+            print(f"  {version:04d}_{name}")
+    else:
+        print("✓ Schema is up to date")
+    return True
+
+
+def run_migrations(conn):
+    """Apply all pending migrations"""
+    applied = SchemaMigrator(conn).migrate()
+    if not applied:
+        print("✓ Nothing to migrate")
+    return True
+
+
+def report_indexes(conn):
+    """Report managed indexes that are missing or have never been scanned"""
+    report = check_indexes(conn)
+    for entry in report['present']:
+        print(f"  {entry['name']:<40} {entry['scans']:>10} scans  {entry['size_bytes'] // 1024:>8} KB")
+    for entry in report['missing']:
+        print(f"✗ Missing index {entry['name']} on {entry['table']} (used by {entry['used_by']})")
+    for entry in report['unused']:
+        print(f"! Unused index {entry['name']} on {entry['table']} (no scans since stats reset)")
+    if not report['missing'] and not report['unused']:
+        print("✓ All managed indexes present and in use")
+    return not report['missing']
+
+
+def _run_transaction(conn, work):
+    """Run work(cursor) in one transaction on a maintenance connection"""
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cursor:
+            result = work(cursor)
+        conn.commit()
+        return result
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"✗ {e}")
+        return None
+    finally:
+        conn.autocommit = autocommit
+
+
+def rebuild_gpa_summary(conn):
+    """Recompute the per-term GPA summary from academic records"""
+    def rebuild(cursor):
+        # Hold off score writes so no delta lands between the delete and the insert
+        cursor.execute("LOCK TABLE academic_records IN SHARE MODE")
+        cursor.execute("DELETE FROM student_term_summary")
+        cursor.execute("""
+            INSERT INTO student_term_summary (student_id, academic_year, semester, total_points, total_credits, gpa)
+            SELECT ar.student_id, ar.academic_year, ar.semester,
+                   SUM(ar.gpa_points * c.credits), SUM(c.credits),
+                   ROUND(SUM(ar.gpa_points * c.credits) / NULLIF(SUM(c.credits), 0), 2)
+            FROM academic_records ar
+            JOIN courses c ON ar.course_id = c.id
+            WHERE ar.student_id IS NOT NULL
+            GROUP BY ar.student_id, ar.academic_year, ar.semester
+        """)
+        return cursor.rowcount
+
+    rows = _run_transaction(conn, rebuild)
+    if rows is None:
+        print("✗ GPA summary rebuild failed")
+        return False
+    print(f"✓ Rebuilt GPA summary ({rows} student terms)")
+    return True
+
+
+def recount_stats(conn):
+    """Reset the dashboard counters to exact row counts"""
+    def recount(cursor):
+        # Hold off writes so none is counted twice or missed
+        cursor.execute("LOCK TABLE students, staff, courses, enrollments, academic_records IN SHARE MODE")
+        cursor.execute("SELECT recount_dashboard_counters()")
+        cursor.execute(DASHBOARD_COUNTERS_SQL)
+        return dashboard_figures({'name': name, 'value': value} for name, value in cursor.fetchall())
+
+    stats = _run_transaction(conn, recount)
+    if stats is None:
+        print("✗ Dashboard recount failed")
+        return False
+    print(f"✓ Recounted dashboard stats: {stats['students']} students, {stats['staff']} staff, "
+          f"{stats['courses']} courses, {stats['enrollments']} enrollments")
+    return True
+
+
+def flush_writes(conn):
+    """Commit writes left in the write-behind queue (e.g. after a crash)"""
+    if not os.path.exists(WRITE_BEHIND_CONFIG['queue_path']):
+        print("✓ No write-behind queue to flush")
+        return True
+    write_behind = WriteBehind(WriteQueue(WRITE_BEHIND_CONFIG['queue_path']),
+                               batch_size=WRITE_BEHIND_CONFIG['batch_size'])
+    try:
+        drained = write_behind.flush()
+        metrics = write_behind.metrics()
+    finally:
+        write_behind.queue.close()
+    if not drained:
+        print(f"✗ Could not flush the write-behind queue ({metrics['depth']} writes still pending)")
+        return False
+    print(f"✓ Flushed {metrics['flushed']} queued writes in {metrics['batches']} batches")
+    if metrics['failed']:
+        print(f"! {metrics['failed']} rejected writes are kept in the queue's failed_writes table")
+    return True
+
+
+COMMANDS = {
+    'status': (show_status, "Show the schema version and pending migrations"),
+    'migrate': (run_migrations, "Apply pending schema migrations"),
+    'check-indexes': (report_indexes, "Report missing or unused managed indexes"),
+    'rebuild-gpa-summary': (rebuild_gpa_summary, "Recompute student GPA summaries from academic records"),
+    'recount-stats': (recount_stats, "Reset the dashboard counters to exact counts"),
+    'flush-writes': (flush_writes, "Commit writes left in the write-behind queue"),
+}
+
+
+def main(argv=None):
+    """Parse arguments and run a maintenance command"""
+    parser = argparse.ArgumentParser(description="Student results database maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args(argv)
+
+    command, _ = COMMANDS[args.command]
+    with pooled_connection() as conn:
+        return 0 if command(conn) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+-- Initial schema: the tables previously created by DatabaseConnection.create_table().
+-- IF NOT EXISTS keeps this safe on databases that already have them.
+
+-- Users table for authentication
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    user_type VARCHAR(20) NOT NULL CHECK (user_type IN ('admin', 'staff', 'student')),
+    full_name TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Students table
+CREATE TABLE IF NOT EXISTS students (
+    id SERIAL PRIMARY KEY,
+    student_id VARCHAR(8) UNIQUE NOT NULL,
+    pin VARCHAR(5) NOT NULL,
+    full_name TEXT NOT NULL,
+    email VARCHAR(100),
+    phone VARCHAR(20),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Staff table
+CREATE TABLE IF NOT EXISTS staff (
+    id SERIAL PRIMARY KEY,
+    staff_id VARCHAR(8) UNIQUE NOT NULL,
+    pin VARCHAR(5) NOT NULL,
+    full_name TEXT NOT NULL,
+    email VARCHAR(100),
+    department TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Courses table
+CREATE TABLE IF NOT EXISTS courses (
+    id SERIAL PRIMARY KEY,
+    course_code VARCHAR(10) UNIQUE NOT NULL,
+    course_name TEXT NOT NULL,
+    credits INTEGER NOT NULL DEFAULT 3 CHECK (credits >= 1 AND credits <= 3),
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Course assignments (which staff teaches which course)
+CREATE TABLE IF NOT EXISTS course_assignments (
+    id SERIAL PRIMARY KEY,
+    staff_id INTEGER REFERENCES staff(id),
+    course_id INTEGER REFERENCES courses(id),
+    academic_year VARCHAR(9) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(staff_id, course_id, academic_year, semester)
+);
+
+-- Enrollments (which students are enrolled in which courses)
+CREATE TABLE IF NOT EXISTS enrollments (
+    id SERIAL PRIMARY KEY,
+    student_id INTEGER REFERENCES students(id),
+    course_id INTEGER REFERENCES courses(id),
+    academic_year VARCHAR(9) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(student_id, course_id, academic_year, semester)
+);
+
+-- Academic records (student scores and grades)
+CREATE TABLE IF NOT EXISTS academic_records (
+    id SERIAL PRIMARY KEY,
+    student_id INTEGER REFERENCES students(id),
+    course_id INTEGER REFERENCES courses(id),
+    staff_id INTEGER REFERENCES staff(id),
+    academic_year VARCHAR(9) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    score INTEGER NOT NULL CHECK (score >= 0 AND score <= 100),
+    grade CHAR(1) NOT NULL,
+    gpa_points DECIMAL(3,2) NOT NULL,
+    credits INTEGER NOT NULL DEFAULT 3 CHECK (credits >= 1 AND credits <= 3),
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(student_id, course_id, academic_year, semester)
+);
+
+-- Legacy student_results table (for backward compatibility)
+CREATE TABLE IF NOT EXISTS student_results (
+    id SERIAL PRIMARY KEY,
+    index_number VARCHAR(10) NOT NULL,
+    full_name TEXT NOT NULL,
+    course TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    grade CHAR(1)
+);
@@ -0,0 +1,30 @@
+-- Indexes for the hot lookup paths in database/operations.py.
+-- Keep database/indexes.py:MANAGED_INDEXES in sync with this file.
+-- INCLUDE columns need PostgreSQL 11 or newer.
+
+-- get_student_academic_record / calculate_student_gpa filter on student_id
+-- and optionally the term; the included columns let the GPA sums run as
+-- index-only scans
+CREATE INDEX IF NOT EXISTS idx_academic_records_student_term
+    ON academic_records (student_id, academic_year, semester)
+    INCLUDE (course_id, score, grade, gpa_points);
+
+-- Course grade listings filter on the course offering
+CREATE INDEX IF NOT EXISTS idx_academic_records_course_term
+    ON academic_records (course_id, academic_year, semester);
+
+-- get_course_enrollments; the unique constraint leads with student_id and
+-- cannot serve this filter
+CREATE INDEX IF NOT EXISTS idx_enrollments_course_term
+    ON enrollments (course_id, academic_year, semester)
+    INCLUDE (student_id);
+
+-- get_staff_courses filters on staff_id and optionally the term
+CREATE INDEX IF NOT EXISTS idx_course_assignments_staff_term
+    ON course_assignments (staff_id, academic_year, semester)
+    INCLUDE (course_id);
+
+-- Legacy lookups: student_exists, get_student_by_index,
+-- update_student_score and delete_student
+CREATE INDEX IF NOT EXISTS idx_student_results_index_number
+    ON student_results (index_number);
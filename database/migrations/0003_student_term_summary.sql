@@ -0,0 +1,95 @@
+-- Per-student, per-term GPA totals kept up to date by a trigger on
+-- academic_records, so reading a GPA is a primary-key lookup.
+-- Credits come from the course at the time the record is written; run
+-- `python -m database.maintenance rebuild-gpa-summary` after changing a
+-- course's credits.
+
+CREATE TABLE IF NOT EXISTS student_term_summary (
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    academic_year VARCHAR(9) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    total_points NUMERIC(10,2) NOT NULL DEFAULT 0,
+    total_credits INTEGER NOT NULL DEFAULT 0,
+    gpa NUMERIC(3,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, academic_year, semester)
+);
+
+-- Add (or with negative values, remove) one record's contribution
+CREATE OR REPLACE FUNCTION apply_term_summary_delta(
+    p_student_id INTEGER, p_academic_year VARCHAR, p_semester VARCHAR,
+    p_points NUMERIC, p_credits INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO student_term_summary AS t
+        (student_id, academic_year, semester, total_points, total_credits, gpa)
+    VALUES (
+        p_student_id, p_academic_year, p_semester, p_points, p_credits,
+        CASE WHEN p_credits > 0 THEN ROUND(p_points / p_credits, 2) ELSE 0 END
+    )
+    ON CONFLICT (student_id, academic_year, semester) DO UPDATE
+    SET total_points = t.total_points + EXCLUDED.total_points,
+        total_credits = t.total_credits + EXCLUDED.total_credits,
+        gpa = CASE WHEN t.total_credits + EXCLUDED.total_credits > 0
+                   THEN ROUND((t.total_points + EXCLUDED.total_points)
+                              / (t.total_credits + EXCLUDED.total_credits), 2)
+                   ELSE 0 END,
+        updated_at = CURRENT_TIMESTAMP;
+
+    IF p_credits < 0 THEN
+        DELETE FROM student_term_summary
+        WHERE student_id = p_student_id AND academic_year = p_academic_year
+          AND semester = p_semester AND total_credits <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION academic_records_term_summary() RETURNS TRIGGER AS $$
+DECLARE
+    old_credits INTEGER;
+    new_credits INTEGER;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.student_id IS NOT DISTINCT FROM NEW.student_id
+       AND OLD.course_id IS NOT DISTINCT FROM NEW.course_id
+       AND OLD.academic_year = NEW.academic_year
+       AND OLD.semester = NEW.semester
+       AND OLD.gpa_points = NEW.gpa_points THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.student_id IS NOT NULL THEN
+        SELECT credits INTO old_credits FROM courses WHERE id = OLD.course_id;
+        PERFORM apply_term_summary_delta(
+            OLD.student_id, OLD.academic_year, OLD.semester,
+            -(OLD.gpa_points * old_credits), -old_credits
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.student_id IS NOT NULL THEN
+        SELECT credits INTO new_credits FROM courses WHERE id = NEW.course_id;
+        PERFORM apply_term_summary_delta(
+            NEW.student_id, NEW.academic_year, NEW.semester,
+            NEW.gpa_points * new_credits, new_credits
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_academic_records_term_summary ON academic_records;
+CREATE TRIGGER trg_academic_records_term_summary
+    AFTER INSERT OR UPDATE OR DELETE ON academic_records
+    FOR EACH ROW EXECUTE FUNCTION academic_records_term_summary();
+
+-- Backfill from records written before this migration
+DELETE FROM student_term_summary;
+INSERT INTO student_term_summary (student_id, academic_year, semester, total_points, total_credits, gpa)
+SELECT ar.student_id, ar.academic_year, ar.semester,
+       SUM(ar.gpa_points * c.credits), SUM(c.credits),
+       ROUND(SUM(ar.gpa_points * c.credits) / NULLIF(SUM(c.credits), 0), 2)
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.id
+WHERE ar.student_id IS NOT NULL
+GROUP BY ar.student_id, ar.academic_year, ar.semester;
@@ -0,0 +1,16 @@
+-- Sort indexes for the paginated listings in database/operations.py.
+-- Each matches a keyset cursor's ORDER BY so every page is an index range
+-- scan. Keep database/indexes.py:MANAGED_INDEXES in sync with this file.
+-- courses is paged on course_code, which its unique constraint covers.
+
+CREATE INDEX IF NOT EXISTS idx_students_name_id
+    ON students (full_name, id);
+
+CREATE INDEX IF NOT EXISTS idx_staff_name_id
+    ON staff (full_name, id);
+
+CREATE INDEX IF NOT EXISTS idx_student_results_name_id
+    ON student_results (full_name, id);
+
+CREATE INDEX IF NOT EXISTS idx_academic_records_recorded_id
+    ON academic_records (recorded_at, id);
@@ -0,0 +1,44 @@
+-- Change tracking for the legacy student_results table, so views can ask
+-- for the rows changed since their last refresh instead of reloading
+-- everything (see StudentResultsDB.get_students_changed_since).
+-- updated_at is the writing transaction's start time; TIMESTAMPTZ so
+-- cursors compare correctly whatever the session time zone.
+
+ALTER TABLE student_results
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- Deleted (or renumbered) index numbers, kept so a refresh can remove them
+CREATE TABLE IF NOT EXISTS student_results_deleted (
+    id BIGSERIAL PRIMARY KEY,
+    index_number VARCHAR(10) NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION student_results_track_changes() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO student_results_deleted (index_number) VALUES (OLD.index_number);
+        RETURN OLD;
+    END IF;
+
+    IF NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NEW;
+    END IF;
+    IF NEW.index_number IS DISTINCT FROM OLD.index_number THEN
+        INSERT INTO student_results_deleted (index_number) VALUES (OLD.index_number);
+    END IF;
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_student_results_track_changes ON student_results;
+CREATE TRIGGER trg_student_results_track_changes
+    BEFORE UPDATE OR DELETE ON student_results
+    FOR EACH ROW EXECUTE FUNCTION student_results_track_changes();
+
+CREATE INDEX IF NOT EXISTS idx_student_results_updated_at
+    ON student_results (updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_student_results_deleted_at
+    ON student_results_deleted (deleted_at);
@@ -0,0 +1,80 @@
+-- Change notifications on the 'sr_changes' channel, so open screens and
+-- in-process caches refresh only what another session changed (see
+-- database/notifications.py). Each notice is compact JSON:
+--   {"t": "<table>", "op": "I|U|D", "k": {<key columns>}}
+-- A transaction that sets app.suppress_change_notify = 'on' (bulk
+-- imports) sends no row notices and one {"t": "<table>", "op": "*"}
+-- notice instead. Notices are delivered when the transaction commits.
+
+-- Trigger arguments name the key columns to send for each table
+CREATE OR REPLACE FUNCTION notify_change() RETURNS TRIGGER AS $$
+DECLARE
+    new_key JSONB := '{}';
+    old_key JSONB := '{}';
+    i INTEGER;
+BEGIN
+    IF current_setting('app.suppress_change_notify', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NULL;
+    END IF;
+
+    FOR i IN 0 .. TG_NARGS - 1 LOOP
+        IF TG_OP <> 'DELETE' THEN
+            new_key := new_key || jsonb_build_object(TG_ARGV[i], to_jsonb(NEW) -> TG_ARGV[i]);
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            old_key := old_key || jsonb_build_object(TG_ARGV[i], to_jsonb(OLD) -> TG_ARGV[i]);
+        END IF;
+    END LOOP;
+
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('sr_changes', jsonb_build_object('t', TG_TABLE_NAME, 'op', 'D', 'k', old_key)::text);
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND new_key <> old_key THEN
+        -- A changed key is a delete of the old key plus an insert
+        PERFORM pg_notify('sr_changes', jsonb_build_object('t', TG_TABLE_NAME, 'op', 'D', 'k', old_key)::text);
+        PERFORM pg_notify('sr_changes', jsonb_build_object('t', TG_TABLE_NAME, 'op', 'I', 'k', new_key)::text);
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('sr_changes', jsonb_build_object('t', TG_TABLE_NAME, 'op', left(TG_OP, 1), 'k', new_key)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_notify ON students;
+CREATE TRIGGER trg_students_notify
+    AFTER INSERT OR UPDATE OR DELETE ON students
+    FOR EACH ROW EXECUTE FUNCTION notify_change('id', 'student_id');
+
+DROP TRIGGER IF EXISTS trg_staff_notify ON staff;
+CREATE TRIGGER trg_staff_notify
+    AFTER INSERT OR UPDATE OR DELETE ON staff
+    FOR EACH ROW EXECUTE FUNCTION notify_change('id', 'staff_id');
+
+DROP TRIGGER IF EXISTS trg_courses_notify ON courses;
+CREATE TRIGGER trg_courses_notify
+    AFTER INSERT OR UPDATE OR DELETE ON courses
+    FOR EACH ROW EXECUTE FUNCTION notify_change('id', 'course_code');
+
+DROP TRIGGER IF EXISTS trg_course_assignments_notify ON course_assignments;
+CREATE TRIGGER trg_course_assignments_notify
+    AFTER INSERT OR UPDATE OR DELETE ON course_assignments
+    FOR EACH ROW EXECUTE FUNCTION notify_change('staff_id', 'course_id');
+
+DROP TRIGGER IF EXISTS trg_enrollments_notify ON enrollments;
+CREATE TRIGGER trg_enrollments_notify
+    AFTER INSERT OR UPDATE OR DELETE ON enrollments
+    FOR EACH ROW EXECUTE FUNCTION notify_change('student_id', 'course_id');
+
+DROP TRIGGER IF EXISTS trg_academic_records_notify ON academic_records;
+CREATE TRIGGER trg_academic_records_notify
+    AFTER INSERT OR UPDATE OR DELETE ON academic_records
+    FOR EACH ROW EXECUTE FUNCTION notify_change('student_id', 'course_id');
+
+DROP TRIGGER IF EXISTS trg_student_results_notify ON student_results;
+CREATE TRIGGER trg_student_results_notify
+    AFTER INSERT OR UPDATE OR DELETE ON student_results
+    FOR EACH ROW EXECUTE FUNCTION notify_change('index_number');
@@ -0,0 +1,124 @@
+-- Row counts and the grade distribution for the admin dashboard, kept by
+-- statement-level triggers so reading them never scans the big tables
+-- (see StudentResultsDB.get_dashboard_stats). Each counter is spread over
+-- 8 slots picked by backend pid, so concurrent writers rarely wait on the
+-- same row; a counter's value is the sum of its slots. Run
+-- `python -m database.maintenance recount-stats` to reset them to exact
+-- counts.
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    name VARCHAR(20) NOT NULL,
+    slot SMALLINT NOT NULL,
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, slot)
+);
+
+CREATE OR REPLACE FUNCTION bump_dashboard_counter(p_name VARCHAR, p_delta BIGINT) RETURNS VOID AS $$
+BEGIN
+    IF p_delta <> 0 THEN
+        INSERT INTO dashboard_counters AS d (name, slot, value)
+        VALUES (p_name, pg_backend_pid() % 8, p_delta)
+        ON CONFLICT (name, slot) DO UPDATE SET value = d.value + EXCLUDED.value;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row count of a table; the counter name is the trigger argument
+CREATE OR REPLACE FUNCTION dashboard_count_rows() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_dashboard_counter(TG_ARGV[0], (SELECT COUNT(*) FROM new_rows));
+    ELSE
+        PERFORM bump_dashboard_counter(TG_ARGV[0], -(SELECT COUNT(*) FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Grade distribution of academic_records, as counters named 'grade:<grade>'
+CREATE OR REPLACE FUNCTION dashboard_count_grades() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_dashboard_counter('grade:' || grade, COUNT(*))
+        FROM new_rows GROUP BY grade;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_dashboard_counter('grade:' || grade, -COUNT(*))
+        FROM old_rows GROUP BY grade;
+    ELSE
+        PERFORM bump_dashboard_counter('grade:' || grade, SUM(delta))
+        FROM (
+            SELECT grade, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT grade, -1 AS delta FROM old_rows
+        ) changes
+        GROUP BY grade;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence a trigger per event
+DROP TRIGGER IF EXISTS trg_students_count_insert ON students;
+CREATE TRIGGER trg_students_count_insert AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('students');
+DROP TRIGGER IF EXISTS trg_students_count_delete ON students;
+CREATE TRIGGER trg_students_count_delete AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('students');
+
+DROP TRIGGER IF EXISTS trg_staff_count_insert ON staff;
+CREATE TRIGGER trg_staff_count_insert AFTER INSERT ON staff
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('staff');
+DROP TRIGGER IF EXISTS trg_staff_count_delete ON staff;
+CREATE TRIGGER trg_staff_count_delete AFTER DELETE ON staff
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('staff');
+
+DROP TRIGGER IF EXISTS trg_courses_count_insert ON courses;
+CREATE TRIGGER trg_courses_count_insert AFTER INSERT ON courses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('courses');
+DROP TRIGGER IF EXISTS trg_courses_count_delete ON courses;
+CREATE TRIGGER trg_courses_count_delete AFTER DELETE ON courses
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('courses');
+
+DROP TRIGGER IF EXISTS trg_enrollments_count_insert ON enrollments;
+CREATE TRIGGER trg_enrollments_count_insert AFTER INSERT ON enrollments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('enrollments');
+DROP TRIGGER IF EXISTS trg_enrollments_count_delete ON enrollments;
+CREATE TRIGGER trg_enrollments_count_delete AFTER DELETE ON enrollments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_rows('enrollments');
+
+DROP TRIGGER IF EXISTS trg_academic_records_grades_insert ON academic_records;
+CREATE TRIGGER trg_academic_records_grades_insert AFTER INSERT ON academic_records
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_grades();
+DROP TRIGGER IF EXISTS trg_academic_records_grades_update ON academic_records;
+CREATE TRIGGER trg_academic_records_grades_update AFTER UPDATE ON academic_records
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_grades();
+DROP TRIGGER IF EXISTS trg_academic_records_grades_delete ON academic_records;
+CREATE TRIGGER trg_academic_records_grades_delete AFTER DELETE ON academic_records
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_grades();
+
+-- Reset every counter to an exact count; callers must keep writers out
+-- (the recount-stats command locks the tables first)
+CREATE OR REPLACE FUNCTION recount_dashboard_counters() RETURNS VOID AS $$
+BEGIN
+    DELETE FROM dashboard_counters;
+    INSERT INTO dashboard_counters (name, slot, value)
+    SELECT 'students', 0, COUNT(*) FROM students
+    UNION ALL SELECT 'staff', 0, COUNT(*) FROM staff
+    UNION ALL SELECT 'courses', 0, COUNT(*) FROM courses
+    UNION ALL SELECT 'enrollments', 0, COUNT(*) FROM enrollments
+    UNION ALL SELECT 'grade:' || grade, 0, COUNT(*) FROM academic_records GROUP BY grade;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT recount_dashboard_counters();
@@ -0,0 +1,22 @@
+-- One legacy record per index number, so imports can upsert with
+-- INSERT ... ON CONFLICT instead of checking first (see
+-- StudentResultsDB.upsert_students). Earlier check-then-insert imports
+-- could race and leave repeats; the first record inserted for a number
+-- is kept, matching how imports have always treated duplicates.
+
+-- The removed repeats share their number with a kept row, so open screens
+-- have nothing to drop; one table notice covers them
+SET LOCAL app.suppress_change_notify = 'on';
+
+DELETE FROM student_results r
+USING student_results kept
+WHERE kept.index_number = r.index_number
+  AND kept.id < r.id;
+
+SELECT pg_notify('sr_changes', '{"t":"student_results","op":"*"}');
+
+-- The unique index replaces the plain lookup index from 0002
+ALTER TABLE student_results
+    ADD CONSTRAINT student_results_index_number_key UNIQUE (index_number);
+
+DROP INDEX IF EXISTS idx_student_results_index_number;
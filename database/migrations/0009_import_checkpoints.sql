@@ -0,0 +1,18 @@
+-- Progress of file imports, so an interrupted import resumes where it
+-- stopped and a file already imported in full is not imported again (see
+-- database/checkpoints.py). Files are identified by a SHA-256 of their
+-- content; the same file imported with another on_conflict action is a
+-- separate import. byte_offset is the end of the last line committed and
+-- is saved in the same transaction as the rows it covers.
+
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    file_hash CHAR(64) NOT NULL,
+    on_conflict VARCHAR(10) NOT NULL,
+    file_name TEXT NOT NULL,
+    byte_offset BIGINT NOT NULL DEFAULT 0,
+    rows_committed BIGINT NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (file_hash, on_conflict)
+);
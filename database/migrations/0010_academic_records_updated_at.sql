@@ -0,0 +1,27 @@
+-- Last-modified time of each academic record, shown on course rosters (see
+-- StudentResultsDB.get_course_roster). recorded_at stays the time a score
+-- was first recorded; updated_at moves whenever the record changes.
+
+ALTER TABLE academic_records ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ;
+
+-- Only the new column changes, so open screens need no notices
+SET LOCAL app.suppress_change_notify = 'on';
+UPDATE academic_records SET updated_at = COALESCE(recorded_at, now()) WHERE updated_at IS NULL;
+
+ALTER TABLE academic_records
+    ALTER COLUMN updated_at SET DEFAULT now(),
+    ALTER COLUMN updated_at SET NOT NULL;
+
+CREATE OR REPLACE FUNCTION academic_records_touch() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW IS DISTINCT FROM OLD THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_academic_records_touch ON academic_records;
+CREATE TRIGGER trg_academic_records_touch
+    BEFORE UPDATE ON academic_records
+    FOR EACH ROW EXECUTE FUNCTION academic_records_touch();
@@ -0,0 +1,302 @@
+-- Seat limits for course offerings, with an optional waitlist (see
+-- StudentResultsDB.enroll_student). A course with a NULL capacity is
+-- unlimited. For a limited course, each offering (course, year, semester)
+-- gets one course_seats row per seat. Enrolling claims a free seat with
+-- FOR UPDATE SKIP LOCKED, so concurrent enrollments each take a different
+-- seat instead of queueing on a shared counter, and no more seats are
+-- handed out than exist. Students who find no free seat are waitlisted.
+-- Waitlisted students are promoted in order when a seat frees up.
+
+ALTER TABLE courses
+    ADD COLUMN IF NOT EXISTS capacity INTEGER CHECK (capacity IS NULL OR capacity >= 0);
+
+ALTER TABLE enrollments
+    ADD COLUMN IF NOT EXISTS status VARCHAR(12) NOT NULL DEFAULT 'enrolled'
+    CHECK (status IN ('enrolled', 'waitlisted'));
+
+CREATE TABLE IF NOT EXISTS course_seats (
+    course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    academic_year VARCHAR(9) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    seat_no INTEGER NOT NULL,
+    student_id INTEGER REFERENCES students(id),
+    PRIMARY KEY (course_id, academic_year, semester, seat_no)
+);
+
+-- Free seats, in the order they are handed out
+CREATE INDEX IF NOT EXISTS idx_course_seats_free
+    ON course_seats (course_id, academic_year, semester, seat_no)
+    WHERE student_id IS NULL;
+
+-- A student holds at most one seat per offering; also finds it on release
+CREATE UNIQUE INDEX IF NOT EXISTS idx_course_seats_student
+    ON course_seats (course_id, academic_year, semester, student_id)
+    WHERE student_id IS NOT NULL;
+
+-- Waitlist order within an offering
+CREATE INDEX IF NOT EXISTS idx_enrollments_waitlist
+    ON enrollments (course_id, academic_year, semester, id)
+    WHERE status = 'waitlisted';
+
+-- Create an offering's seat rows on first use, seating students enrolled
+-- before the course had a capacity. Serialized per offering by an advisory
+-- lock, which is only taken while seats are missing.
+CREATE OR REPLACE FUNCTION ensure_course_seats(p_course INTEGER, p_year VARCHAR, p_semester VARCHAR)
+RETURNS VOID AS $$
+DECLARE
+    v_capacity INTEGER;
+BEGIN
+    SELECT capacity INTO v_capacity FROM courses WHERE id = p_course;
+    IF v_capacity IS NULL OR v_capacity = 0 OR EXISTS (
+        SELECT 1 FROM course_seats
+        WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+          AND seat_no = v_capacity
+    ) THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('course_seats'), hashtext(p_course || '/' || p_year || '/' || p_semester));
+
+    INSERT INTO course_seats (course_id, academic_year, semester, seat_no)
+    SELECT p_course, p_year, p_semester, n FROM generate_series(1, v_capacity) n
+    ON CONFLICT DO NOTHING;
+
+    WITH unseated AS (
+        SELECT e.student_id, row_number() OVER (ORDER BY e.id) AS n
+        FROM enrollments e
+        WHERE e.course_id = p_course AND e.academic_year = p_year AND e.semester = p_semester
+          AND e.status = 'enrolled'
+          AND NOT EXISTS (
+              SELECT 1 FROM course_seats s
+              WHERE s.course_id = p_course AND s.academic_year = p_year AND s.semester = p_semester
+                AND s.student_id = e.student_id
+          )
+    ), free AS (
+        SELECT seat_no, row_number() OVER (ORDER BY seat_no) AS n
+        FROM course_seats
+        WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+          AND student_id IS NULL AND seat_no <= v_capacity
+    )
+    UPDATE course_seats s SET student_id = u.student_id
+    FROM unseated u JOIN free f ON f.n = u.n
+    WHERE s.course_id = p_course AND s.academic_year = p_year AND s.semester = p_semester
+      AND s.seat_no = f.seat_no;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Claim a free seat for a student; returns the seat number or NULL when none is free
+CREATE OR REPLACE FUNCTION claim_course_seat(p_student INTEGER, p_course INTEGER, p_year VARCHAR, p_semester VARCHAR)
+RETURNS INTEGER AS $$
+DECLARE
+    v_seat INTEGER;
+BEGIN
+    UPDATE course_seats s SET student_id = p_student
+    WHERE (s.course_id, s.academic_year, s.semester, s.seat_no) = (
+        SELECT f.course_id, f.academic_year, f.semester, f.seat_no
+        FROM course_seats f
+        JOIN courses c ON c.id = f.course_id
+        WHERE f.course_id = p_course AND f.academic_year = p_year AND f.semester = p_semester
+          AND f.student_id IS NULL AND f.seat_no <= c.capacity
+        ORDER BY f.seat_no
+        LIMIT 1
+        FOR UPDATE OF f SKIP LOCKED
+    )
+    RETURNING s.seat_no INTO v_seat;
+    RETURN v_seat;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Enroll a student in one statement's worth of work. Returns 'enrolled',
+-- 'waitlisted', 'full' (no seat and p_waitlist is false) or 'duplicate'.
+CREATE OR REPLACE FUNCTION enroll_in_course(p_student INTEGER, p_course INTEGER, p_year VARCHAR,
+                                            p_semester VARCHAR, p_waitlist BOOLEAN)
+RETURNS TEXT AS $$
+DECLARE
+    v_capacity INTEGER;
+    v_seat INTEGER;
+    v_status VARCHAR(12);
+BEGIN
+    SELECT capacity INTO v_capacity FROM courses WHERE id = p_course;
+
+    IF v_capacity IS NULL THEN
+        INSERT INTO enrollments (student_id, course_id, academic_year, semester)
+        VALUES (p_student, p_course, p_year, p_semester)
+        ON CONFLICT DO NOTHING;
+        RETURN CASE WHEN FOUND THEN 'enrolled' ELSE 'duplicate' END;
+    END IF;
+
+    PERFORM ensure_course_seats(p_course, p_year, p_semester);
+    v_seat := claim_course_seat(p_student, p_course, p_year, p_semester);
+    IF v_seat IS NULL AND NOT p_waitlist THEN
+        IF EXISTS (
+            SELECT 1 FROM enrollments
+            WHERE student_id = p_student AND course_id = p_course
+              AND academic_year = p_year AND semester = p_semester
+        ) THEN
+            RETURN 'duplicate';
+        END IF;
+        RETURN 'full';
+    END IF;
+
+    v_status := CASE WHEN v_seat IS NULL THEN 'waitlisted' ELSE 'enrolled' END;
+    INSERT INTO enrollments (student_id, course_id, academic_year, semester, status)
+    VALUES (p_student, p_course, p_year, p_semester, v_status)
+    ON CONFLICT DO NOTHING;
+    IF NOT FOUND THEN
+        -- Already enrolled or waitlisted: give back the seat just taken
+        IF v_seat IS NOT NULL THEN
+            UPDATE course_seats SET student_id = NULL
+            WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+              AND seat_no = v_seat;
+        END IF;
+        RETURN 'duplicate';
+    END IF;
+    RETURN v_status;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Seat enrolled students who hold no seat within the capacity: those past
+-- a capacity cut, or enrolled before the course had a capacity and left
+-- over when its seats were created. They get a freed seat before the
+-- waitlist does.
+CREATE OR REPLACE FUNCTION reseat_over_capacity(p_course INTEGER, p_year VARCHAR, p_semester VARCHAR)
+RETURNS VOID AS $$
+DECLARE
+    v_capacity INTEGER;
+    v_over RECORD;
+BEGIN
+    SELECT capacity INTO v_capacity FROM courses WHERE id = p_course;
+    LOOP
+        SELECT e.student_id, s.seat_no INTO v_over
+        FROM enrollments e
+        LEFT JOIN course_seats s
+            ON s.course_id = e.course_id AND s.academic_year = e.academic_year
+           AND s.semester = e.semester AND s.student_id = e.student_id
+        WHERE e.course_id = p_course AND e.academic_year = p_year AND e.semester = p_semester
+          AND e.status = 'enrolled' AND (s.seat_no IS NULL OR s.seat_no > v_capacity)
+        ORDER BY e.id
+        LIMIT 1
+        FOR UPDATE OF e SKIP LOCKED;
+        EXIT WHEN NOT FOUND;
+
+        UPDATE course_seats SET student_id = NULL
+        WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+          AND seat_no = v_over.seat_no;
+        IF claim_course_seat(v_over.student_id, p_course, p_year, p_semester) IS NULL THEN
+            UPDATE course_seats SET student_id = v_over.student_id
+            WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+              AND seat_no = v_over.seat_no;
+            EXIT;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move waitlisted students into free seats, oldest request first; returns
+-- how many were promoted
+CREATE OR REPLACE FUNCTION promote_waitlist(p_course INTEGER, p_year VARCHAR, p_semester VARCHAR)
+RETURNS INTEGER AS $$
+DECLARE
+    v_next RECORD;
+    v_promoted INTEGER := 0;
+BEGIN
+    IF (SELECT capacity FROM courses WHERE id = p_course) IS NULL THEN
+        UPDATE enrollments SET status = 'enrolled'
+        WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+          AND status = 'waitlisted';
+        GET DIAGNOSTICS v_promoted = ROW_COUNT;
+        RETURN v_promoted;
+    END IF;
+
+    PERFORM ensure_course_seats(p_course, p_year, p_semester);
+    PERFORM reseat_over_capacity(p_course, p_year, p_semester);
+    LOOP
+        SELECT id, student_id INTO v_next
+        FROM enrollments
+        WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+          AND status = 'waitlisted'
+        ORDER BY id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED;
+        EXIT WHEN NOT FOUND;
+        EXIT WHEN claim_course_seat(v_next.student_id, p_course, p_year, p_semester) IS NULL;
+        UPDATE enrollments SET status = 'enrolled' WHERE id = v_next.id;
+        v_promoted := v_promoted + 1;
+    END LOOP;
+    RETURN v_promoted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Remove an enrollment, freeing its seat for the waitlist; returns false if
+-- there was no such enrollment
+CREATE OR REPLACE FUNCTION unenroll_from_course(p_student INTEGER, p_course INTEGER, p_year VARCHAR, p_semester VARCHAR)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_status VARCHAR(12);
+BEGIN
+    DELETE FROM enrollments
+    WHERE student_id = p_student AND course_id = p_course
+      AND academic_year = p_year AND semester = p_semester
+    RETURNING status INTO v_status;
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE course_seats SET student_id = NULL
+    WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+      AND student_id = p_student;
+    IF FOUND THEN
+        PERFORM promote_waitlist(p_course, p_year, p_semester);
+    END IF;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Dashboard: 'enrollments' now counts enrolled students only, and
+-- 'waitlisted' the waitlist (see 0007)
+CREATE OR REPLACE FUNCTION dashboard_count_enrollments() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_dashboard_counter(CASE status WHEN 'enrolled' THEN 'enrollments' ELSE status END, COUNT(*))
+        FROM new_rows GROUP BY status;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_dashboard_counter(CASE status WHEN 'enrolled' THEN 'enrollments' ELSE status END, -COUNT(*))
+        FROM old_rows GROUP BY status;
+    ELSE
+        PERFORM bump_dashboard_counter(CASE status WHEN 'enrolled' THEN 'enrollments' ELSE status END, SUM(delta))
+        FROM (
+            SELECT status, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, -1 AS delta FROM old_rows
+        ) changes
+        GROUP BY status;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_enrollments_count_insert ON enrollments;
+CREATE TRIGGER trg_enrollments_count_insert AFTER INSERT ON enrollments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_enrollments();
+DROP TRIGGER IF EXISTS trg_enrollments_count_update ON enrollments;
+CREATE TRIGGER trg_enrollments_count_update AFTER UPDATE ON enrollments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_enrollments();
+DROP TRIGGER IF EXISTS trg_enrollments_count_delete ON enrollments;
+CREATE TRIGGER trg_enrollments_count_delete AFTER DELETE ON enrollments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_enrollments();
+
+CREATE OR REPLACE FUNCTION recount_dashboard_counters() RETURNS VOID AS $$
+BEGIN
+    DELETE FROM dashboard_counters;
+    INSERT INTO dashboard_counters (name, slot, value)
+    SELECT 'students', 0, COUNT(*) FROM students
+    UNION ALL SELECT 'staff', 0, COUNT(*) FROM staff
+    UNION ALL SELECT 'courses', 0, COUNT(*) FROM courses
+    UNION ALL SELECT 'enrollments', 0, COUNT(*) FROM enrollments WHERE status = 'enrolled'
+    UNION ALL SELECT 'waitlisted', 0, COUNT(*) FROM enrollments WHERE status = 'waitlisted'
+    UNION ALL SELECT 'grade:' || grade, 0, COUNT(*) FROM academic_records GROUP BY grade;
+END;
+$$ LANGUAGE plpgsql;
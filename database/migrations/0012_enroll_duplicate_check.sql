@@ -0,0 +1,59 @@
+-- enroll_in_course (see 0011) claimed a seat before checking for an
+-- existing enrollment. A student who already held a seat would be moved
+-- onto a second one, which idx_course_seats_student rejects with a
+-- unique_violation instead of the function returning 'duplicate'. Check
+-- first, and treat a unique_violation from a concurrent enrollment of the
+-- same student as a duplicate too.
+
+CREATE OR REPLACE FUNCTION enroll_in_course(p_student INTEGER, p_course INTEGER, p_year VARCHAR,
+                                            p_semester VARCHAR, p_waitlist BOOLEAN)
+RETURNS TEXT AS $$
+DECLARE
+    v_capacity INTEGER;
+    v_seat INTEGER;
+    v_status VARCHAR(12);
+BEGIN
+    SELECT capacity INTO v_capacity FROM courses WHERE id = p_course;
+
+    IF v_capacity IS NULL THEN
+        INSERT INTO enrollments (student_id, course_id, academic_year, semester)
+        VALUES (p_student, p_course, p_year, p_semester)
+        ON CONFLICT DO NOTHING;
+        RETURN CASE WHEN FOUND THEN 'enrolled' ELSE 'duplicate' END;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM enrollments
+        WHERE student_id = p_student AND course_id = p_course
+          AND academic_year = p_year AND semester = p_semester
+    ) THEN
+        RETURN 'duplicate';
+    END IF;
+
+    PERFORM ensure_course_seats(p_course, p_year, p_semester);
+    BEGIN
+        v_seat := claim_course_seat(p_student, p_course, p_year, p_semester);
+    EXCEPTION WHEN unique_violation THEN
+        -- The same student's enrollment committed a seat meanwhile
+        RETURN 'duplicate';
+    END;
+    IF v_seat IS NULL AND NOT p_waitlist THEN
+        RETURN 'full';
+    END IF;
+
+    v_status := CASE WHEN v_seat IS NULL THEN 'waitlisted' ELSE 'enrolled' END;
+    INSERT INTO enrollments (student_id, course_id, academic_year, semester, status)
+    VALUES (p_student, p_course, p_year, p_semester, v_status)
+    ON CONFLICT DO NOTHING;
+    IF NOT FOUND THEN
+        -- Enrolled or waitlisted concurrently: give back the seat just taken
+        IF v_seat IS NOT NULL THEN
+            UPDATE course_seats SET student_id = NULL
+            WHERE course_id = p_course AND academic_year = p_year AND semester = p_semester
+              AND seat_no = v_seat;
+        END IF;
+        RETURN 'duplicate';
+    END IF;
+    RETURN v_status;
+END;
+$$ LANGUAGE plpgsql;
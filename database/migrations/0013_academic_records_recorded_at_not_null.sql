@@ -0,0 +1,16 @@
+-- get_academic_records_page pages on (recorded_at, id) by default, and a
+-- keyset row comparison never matches a NULL recorded_at, so rows without
+-- one fell out of the listing between pages. Backfill them from updated_at
+-- (set from recorded_at or the migration time in 0010) and forbid NULLs,
+-- as RECORD_SORT_KEYS requires of its columns.
+
+-- Only recorded_at changes: keep updated_at, the term summaries and the
+-- dashboard counters as they are, and send open screens no notices
+SET LOCAL app.suppress_change_notify = 'on';
+ALTER TABLE academic_records DISABLE TRIGGER USER;
+UPDATE academic_records SET recorded_at = updated_at WHERE recorded_at IS NULL;
+ALTER TABLE academic_records ENABLE TRIGGER USER;
+
+ALTER TABLE academic_records
+    ALTER COLUMN recorded_at SET DEFAULT CURRENT_TIMESTAMP,
+    ALTER COLUMN recorded_at SET NOT NULL;
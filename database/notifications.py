@@ -0,0 +1,160 @@
+import json
+import select
+import threading
+import psycopg2
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DB_CONFIG
+
+# Channel the notify_change() trigger publishes on (migration 0006)
+CHANNEL = 'sr_changes'
+
+# Seconds between checks for shutdown while waiting for notices
+WAIT_TIMEOUT = 1.0
+
+# Seconds to wait before reconnecting after the connection drops
+RECONNECT_DELAY = 5.0
+
+# Set inside a transaction to replace its row notices with one per table
+SUPPRESS_ROW_NOTICES_SQL = "SET LOCAL app.suppress_change_notify = 'on'"
+
+
+def parse_change(payload):
+    """
+    Decode a notice sent by the notify_change() trigger
+
+    Args:
+        payload (str): Notice payload
+
+    Returns:
+        dict: 'table', 'op' ('I', 'U', 'D', or '*' when any row of the
+        table may have changed) and 'key' (key columns, or None for '*'),
+        or None if the payload isn't a change notice
+    """
+    try:
+        data = json.loads(payload)
+        change = {'table': data['t'], 'op': data['op'], 'key': data.get('k')}
+    except (ValueError, TypeError, KeyError):
+        return None
+    if change['op'] not in ('I', 'U', 'D', '*'):
+        return None
+    return change
+
+
+def notify_table_changed(cursor, table):
+    """Send one notice that any row of table may have changed (on commit)"""
+    payload = json.dumps({'t': table, 'op': '*'}, separators=(',', ':'))
+    cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+
+
+class ChangeListener:
+    """
+    Receive change notices on a dedicated connection and pass them to subscribers
+
+        listener = ChangeListener()
+        listener.subscribe(on_change, tables=('student_results',))
+        listener.start()
+
+    Callbacks run on the listener thread with one change dictionary (see
+    parse_change). After the connection is lost and re-established a
+    change for table '*' with op '*' is sent to every subscriber, since
+    notices sent in between were missed.
+    """
+
+    def __init__(self, channel=CHANNEL, reconnect_delay=RECONNECT_DELAY):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._connection = None
+
+    def subscribe(self, callback, tables=None):
+        """
+        Call callback(change) for notices about tables (all tables if None)
+
+        Returns:
+            callable: The callback, for unsubscribe()
+        """
+        with self._lock:
+            self._subscribers.append((callback, frozenset(tables) if tables else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop sending notices to callback"""
+        with self._lock:
+            self._subscribers = [(cb, tables) for cb, tables in self._subscribers if cb is not callback]
+
+    def start(self):
+        """Start listening on a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='change-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop listening and close the connection"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=WAIT_TIMEOUT * 2)
+            self._thread = None
+
+    def dispatch(self, change):
+        """Pass a change to every subscriber interested in its table"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, tables in subscribers:
+            if tables is None or change['table'] == '*' or change['table'] in tables:
+                try:
+                    callback(change)
+                except Exception as e:
+                    print(f"✗ Change subscriber failed: {e}")
+
+    def _connect(self):
+        connection = psycopg2.connect(**DB_CONFIG)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def _run(self):
+        reconnecting = False
+        while not self._stop.is_set():
+            try:
+                self._connection = self._connect()
+                self.connected = True
+                if reconnecting:
+                    self.dispatch({'table': '*', 'op': '*', 'key': None})
+                self._listen()
+            except psycopg2.Error as e:
+                if not self._stop.is_set():
+                    print(f"✗ Change listener lost its connection: {e}")
+            finally:
+                self.connected = False
+                self._close()
+            reconnecting = True
+            self._stop.wait(self.reconnect_delay)
+
+    def _listen(self):
+        connection = self._connection
+        while not self._stop.is_set():
+            ready, _, _ = select.select([connection], [], [], WAIT_TIMEOUT)
+            if not ready:
+                continue
+            connection.poll()
+            while connection.notifies:
+                notice = connection.notifies.pop(0)
+                change = parse_change(notice.payload)
+                if change is not None:
+                    self.dispatch(change)
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except psycopg2.Error:
+                pass
+            self._connection = None
@@ -1,18 +1,159 @@
 import hashlib
+import os
 import secrets
 from database.connection import DatabaseConnection
+from database.bulk_import import BulkImporter, ResumableImporter, new_file_import_result, check_conflict_action
+from database.checkpoints import file_hash, load_checkpoint
+from database.parallel_import import ParallelImporter, PARALLEL_MIN_BYTES
+from database.pagination import fetch_page, DEFAULT_PAGE_SIZE
+from database.cache import reference_cache, COURSES_KEY, COURSE_IDS_KEY, student_key, staff_key
+from database.queries import (
+    AUTHENTICATE_ADMIN_SQL, AUTHENTICATE_STUDENT_SQL, AUTHENTICATE_STAFF_SQL, CREATE_STUDENT_SQL, CREATE_STAFF_SQL,
+    STUDENT_DB_ID_SQL, STAFF_DB_ID_SQL, ADD_COURSE_SQL, ALL_COURSES_SQL, COURSE_ID_SQL, SET_CAPACITY_SQL,
+    CLEAR_SEATS_SQL, PROMOTE_WAITLIST_SQL, COURSE_ENROLLMENTS_SQL, STAFF_TEACHES_STUDENT_SQL, RECORD_SCORES_BULK_SQL,
+    GPA_SUMMARY_SQL,
+    DASHBOARD_COUNTERS_SQL, staff_courses_query, student_enrollments_query, course_roster_query,
+    student_records_query, student_gpa_query, cohort_gpas_query
+)
+from database.write_behind import (
+    get_write_behind, apply_write, pending_writes, overlay_enrollments, overlay_roster, overlay_scores,
+    QUEUED_RESULTS
+)
 from utils.grade_calculator import calculate_grade, calculate_gpa_points
 
+# Columns each paged listing may be sorted by, mapped to the keyset ORDER BY
+# that implements it; every entry ends in a unique column so pages never
+# overlap. Only NOT NULL columns are listed, since row comparisons skip NULLs.
+STUDENT_SORT_KEYS = {
+    'full_name': ('full_name', 'id'),
+    'student_id': ('student_id',),
+    'id': ('id',),
+}
+STAFF_SORT_KEYS = {
+    'full_name': ('full_name', 'id'),
+    'staff_id': ('staff_id',),
+    'id': ('id',),
+}
+COURSE_SORT_KEYS = {
+    'course_code': ('course_code',),
+    'course_name': ('course_name', 'id'),
+    'credits': ('credits', 'id'),
+    'id': ('id',),
+}
+LEGACY_SORT_KEYS = {
+    'full_name': ('full_name', 'id'),
+    'index_number': ('index_number', 'id'),
+    'course': ('course', 'id'),
+    'score': ('score', 'id'),
+    'id': ('id',),
+}
+RECORD_SORT_KEYS = {
+    'recorded_at': ('ar.recorded_at', 'ar.id'),
+    'student_name': (('s.full_name', 'student_name'), 'ar.id'),
+    'course_name': (('c.course_name', 'course_name'), 'ar.id'),
+    'score': ('ar.score', 'ar.id'),
+    'grade': ('ar.grade', 'ar.id'),
+    'gpa_points': ('ar.gpa_points', 'ar.id'),
+    'academic_year': ('ar.academic_year', 'ar.semester', 'ar.id'),
+    'semester': ('ar.semester', 'ar.id'),
+}
+
+
+def split_bulk_scores(scores):
+    """
+    Validate (student_id, score) pairs for a bulk score write
+    
+    Args:
+        scores (list): (student_id, score) pairs, student_id being the database id
+    
+    Returns:
+        tuple: (columns, invalid). columns holds parallel lists
+        'student_ids', 'scores', 'grades' and 'gpa_points' for the valid
+        pairs; invalid is a list of dictionaries with student_id, score and error
+    """
+    columns = {'student_ids': [], 'scores': [], 'grades': [], 'gpa_points': []}
+    invalid = []
+    seen = set()
+    for student_id, score in scores:
+        try:
+            value = int(score)
+        except (TypeError, ValueError):
+            invalid.append({'student_id': student_id, 'score': score, 'error': "Score must be a number"})
+            continue
+        if value < 0 or value > 100:
+            invalid.append({'student_id': student_id, 'score': score, 'error': "Score must be between 0 and 100"})
+            continue
+        if student_id in seen:
+            invalid.append({'student_id': student_id, 'score': score, 'error': "Duplicate entry for student"})
+            continue
+        seen.add(student_id)
+        columns['student_ids'].append(student_id)
+        columns['scores'].append(value)
+        columns['grades'].append(calculate_grade(value))
+        columns['gpa_points'].append(calculate_gpa_points(value))
+    return columns, invalid
+
+
+def bulk_scores_result(columns, invalid, rows):
+    """Build record_scores_bulk's result from the rows the write returned"""
+    result = {'recorded': [dict(row) for row in rows], 'invalid': invalid}
+    recorded_ids = {row['student_id'] for row in rows}
+    for student_id, score in zip(columns['student_ids'], columns['scores']):
+        if student_id not in recorded_ids:
+            result['invalid'].append({'student_id': student_id, 'score': score, 'error': "Student is not enrolled in this course"})
+    return result
+
+
+def summarize_term_gpas(rows):
+    """Build get_student_gpa_summary's result from student_term_summary rows"""
+    summary = {'cumulative': 0.0, 'total_credits': 0, 'terms': []}
+    total_points = 0
+    for row in rows:
+        total_points += row['total_points']
+        summary['total_credits'] += row['total_credits']
+        summary['terms'].append({
+            'academic_year': row['academic_year'],
+            'semester': row['semester'],
+            'total_credits': row['total_credits'],
+            'gpa': float(row['gpa'])
+        })
+    if summary['total_credits']:
+        summary['cumulative'] = round(float(total_points) / summary['total_credits'], 2)
+    return summary
+
+
+def dashboard_figures(rows):
+    """Build get_dashboard_stats's result from summed dashboard_counters rows"""
+    counters = {row['name']: int(row['value']) for row in rows}
+    grades = [
+        {'grade': name.split(':', 1)[1], 'count': count}
+        for name, count in sorted(counters.items())
+        if name.startswith('grade:') and count > 0
+    ]
+    return {
+        'students': counters.get('students', 0),
+        'staff': counters.get('staff', 0),
+        'courses': counters.get('courses', 0),
+        'enrollments': counters.get('enrollments', 0),
+        'waitlisted': counters.get('waitlisted', 0),
+        'grades': grades
+    }
+
+
 class StudentResultsDB:
     def __init__(self):
         self.db = DatabaseConnection()
         self.current_user = None
     
     def connect(self):
-        """Connect to database and create table if needed"""
+        """Connect to database and apply any pending schema migrations"""
         try:
             if self.db.connect():
-                return self.db.create_table()
+                ready = self.db.ensure_schema()
+                # Starts the write-behind flusher (if enabled), which first
+                # commits anything an earlier run left queued
+                get_write_behind()
+                return ready
             return False
         except Exception as e:
             print(f"✗ Database connection error: {e}")
@@ -31,6 +172,70 @@ class StudentResultsDB:
         """Close database connection"""
         self.db.close()
     
+    def transaction(self):
+        """
+        Group several operations into one atomic commit
+        
+        Every method called inside the block joins the same transaction:
+        
+            with db.transaction() as tx:
+                db.create_student(...)
+                db.enroll_student(...)
+            if not tx.ok:
+                ...  # nothing was written
+        """
+        if not self.db.in_transaction():
+            # The block's writes bypass the write-behind queue
+            self._flush_pending()
+        return self.db.transaction()
+    
+    def _write(self, kind, payload):
+        """Apply a score or enrollment write now, or queue it when write-behind is enabled"""
+        write_behind = get_write_behind()
+        # Inside a transaction() block the write stays part of the block
+        if write_behind is None or self.db.in_transaction():
+            return apply_write(self.db, kind, payload)
+        # Whether a limited course has a seat is only known once the write
+        # is applied, so its enrollments and unenrollments are never queued
+        if kind == 'score' or not self._has_capacity(payload['course_id']):
+            if write_behind.submit(kind, payload) is not None:
+                return QUEUED_RESULTS[kind]
+            return apply_write(self.db, kind, payload)
+        self._flush_pending(course_id=payload['course_id'], academic_year=payload['academic_year'],
+                            semester=payload['semester'])
+        return apply_write(self.db, kind, payload)
+    
+    def _flush_pending(self, **fields):
+        """Commit queued writes matching fields (see WriteQueue.find) before writing past the queue"""
+        write_behind = get_write_behind()
+        # Otherwise the flusher could apply an older queued write after the direct one
+        if write_behind is not None and write_behind.pending(limit=1, **fields):
+            write_behind.flush(wait=True)
+    
+    def _has_capacity(self, course_id):
+        """Check whether a course has a seat limit (read fresh, as another session may have just set one)"""
+        result = self.db.execute_query("SELECT capacity FROM courses WHERE id = %s", (course_id,))
+        # If it can't be read, apply the write now so its real outcome is returned
+        return not result or result[0]['capacity'] is not None
+    
+    def write_behind_stats(self):
+        """Get the write-behind queue's metrics (see WriteBehind.metrics), or None when it is disabled"""
+        write_behind = get_write_behind()
+        return write_behind.metrics() if write_behind is not None else None
+    
+    def _page(self, query, sort_keys, sort, page_size, token, descending=False, params=()):
+        """Fetch one keyset page sorted by a whitelisted column"""
+        order_by = sort_keys.get(sort)
+        if order_by is None:
+            print(f"✗ Cannot sort by {sort}")
+            return None
+        try:
+            return fetch_page(self.db, query, params, order_by, page_size, token, descending)
+        except ValueError as e:
+            # A bad token is reported like a failed query
+            print(f"✗ {e}")
+            return None
+    
     # Authentication methods
     def hash_password(self, password):
         """Hash password using SHA-256"""
@@ -45,11 +250,7 @@ class StudentResultsDB:
                 return False
             
             password_hash = self.hash_password(password)
-            query = """
-            SELECT * FROM users 
-            WHERE email = %s AND password_hash = %s AND user_type = 'admin'
-            """
-            result = self.db.execute_query(query, (email, password_hash))
+            result = self.db.execute_query(AUTHENTICATE_ADMIN_SQL, (email, password_hash))
             if result and len(result) > 0:
                 self.current_user = result[0]
                 return True
@@ -66,11 +267,7 @@ class StudentResultsDB:
                 print("✗ Database connection failed")
                 return False
             
-            query = """
-            SELECT * FROM students 
-            WHERE student_id = %s AND pin = %s
-            """
-            result = self.db.execute_query(query, (student_id, pin))
+            result = self.db.execute_query(AUTHENTICATE_STUDENT_SQL, (student_id, pin))
             if result and len(result) > 0:
                 self.current_user = result[0]
                 return True
@@ -87,11 +284,7 @@ class StudentResultsDB:
                 print("✗ Database connection failed")
                 return False
             
-            query = """
-            SELECT * FROM staff 
-            WHERE staff_id = %s AND pin = %s
-            """
-            result = self.db.execute_query(query, (staff_id, pin))
+            result = self.db.execute_query(AUTHENTICATE_STAFF_SQL, (staff_id, pin))
             if result and len(result) > 0:
                 self.current_user = result[0]
                 return True
@@ -113,33 +306,132 @@ class StudentResultsDB:
     
     def create_student(self, student_id, pin, full_name, email=None, phone=None):
         """Create a new student"""
-        query = """
-        INSERT INTO students (student_id, pin, full_name, email, phone)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        return self.db.execute_update(query, (student_id, pin, full_name, email, phone))
+        created = self.db.execute_update(CREATE_STUDENT_SQL, (student_id, pin, full_name, email, phone))
+        if created:
+            reference_cache.invalidate(student_key(student_id))
+        return created
     
     def create_staff(self, staff_id, pin, full_name, email=None, department=None):
         """Create a new staff member"""
-        query = """
-        INSERT INTO staff (staff_id, pin, full_name, email, department)
-        VALUES (%s, %s, %s, %s, %s)
+        created = self.db.execute_update(CREATE_STAFF_SQL, (staff_id, pin, full_name, email, department))
+        if created:
+            reference_cache.invalidate(staff_key(staff_id))
+        return created
+    
+    def get_student_db_id(self, student_id):
+        """
+        Get a student's database id from their student ID (cached)
+        
+        Args:
+            student_id (str): Student ID, e.g. '20230001'
+        
+        Returns:
+            int: The students.id value, or None if there is no such student
+        """
+        def load():
+            result = self.db.execute_query(STUDENT_DB_ID_SQL, (student_id,))
+            return result[0]['id'] if result else None
+        return reference_cache.get(student_key(student_id), load)
+    
+    def get_staff_db_id(self, staff_id):
+        """
+        Get a staff member's database id from their staff ID (cached)
+        
+        Args:
+            staff_id (str): Staff ID
+        
+        Returns:
+            int: The staff.id value, or None if there is no such staff member
         """
-        return self.db.execute_update(query, (staff_id, pin, full_name, email, department))
+        def load():
+            result = self.db.execute_query(STAFF_DB_ID_SQL, (staff_id,))
+            return result[0]['id'] if result else None
+        return reference_cache.get(staff_key(staff_id), load)
+    
+    def get_students_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, sort='full_name', descending=False):
+        """Get one page of students, sorted by a STUDENT_SORT_KEYS column"""
+        return self._page("SELECT * FROM students WHERE TRUE", STUDENT_SORT_KEYS, sort, page_size, token, descending)
+    
+    def get_staff_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, sort='full_name', descending=False):
+        """Get one page of staff, sorted by a STAFF_SORT_KEYS column"""
+        return self._page("SELECT * FROM staff WHERE TRUE", STAFF_SORT_KEYS, sort, page_size, token, descending)
     
     # Course management methods
-    def add_course(self, course_code, course_name, credits=3, description=None):
-        """Add a new course"""
-        query = """
-        INSERT INTO courses (course_code, course_name, credits, description)
-        VALUES (%s, %s, %s, %s)
+    def add_course(self, course_code, course_name, credits=3, description=None, capacity=None):
+        """Add a new course (capacity None means unlimited seats)"""
+        added = self.db.execute_update(ADD_COURSE_SQL, (course_code, course_name, credits, description, capacity))
+        if added:
+            reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return added
+    
+    def set_course_capacity(self, course_id, capacity):
+        """
+        Change how many students a course's offerings can hold
+        
+        Raising the capacity (or removing it) promotes waitlisted students
+        into the new seats. Lowering it below the current enrollment keeps
+        everyone enrolled; no new seats are handed out until enough leave.
+        
+        Args:
+            course_id (int): Course database id
+            capacity (int): Seats per offering, or None for unlimited
+        
+        Returns:
+            int: Number of waitlisted students promoted, or None on failure
         """
-        return self.db.execute_update(query, (course_code, course_name, credits, description))
+        promoted = 0
+        # Enrollments queued while the course was unlimited go first
+        with self.transaction() as tx:
+            updated = self.db.execute_update(SET_CAPACITY_SQL, (capacity, course_id))
+            if updated and capacity is None:
+                updated = self.db.execute_update(CLEAR_SEATS_SQL, (course_id,))
+            if updated:
+                offerings = self.db.execute_query(PROMOTE_WAITLIST_SQL, (course_id,))
+                if offerings is not None:
+                    promoted = sum(row['promoted'] for row in offerings)
+        if not tx.ok:
+            return None
+        reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return promoted
     
     def get_all_courses(self):
-        """Get all courses"""
-        query = "SELECT * FROM courses ORDER BY course_code"
-        return self.db.execute_query(query)
+        """Get all courses (cached; see database/cache.py)"""
+        courses = reference_cache.get(COURSES_KEY, lambda: self.db.execute_query(ALL_COURSES_SQL))
+        # A new list each call, so callers can't reorder the cached one
+        return list(courses) if courses is not None else None
+    
+    def get_course_id(self, course_code):
+        """
+        Get a course's database id from its code (cached)
+        
+        Args:
+            course_code (str): Course code, e.g. 'CS101'
+        
+        Returns:
+            int: The courses.id value, or None if there is no such course
+        """
+        def load():
+            courses = self.get_all_courses()
+            return {course['course_code']: course['id'] for course in courses} if courses is not None else None
+        course_ids = reference_cache.get(COURSE_IDS_KEY, load)
+        if course_ids is None:
+            return None
+        if course_code in course_ids:
+            return course_ids[course_code]
+        # Not in the cached map; it may have been added since it was loaded
+        result = self.db.execute_query(COURSE_ID_SQL, (course_code,))
+        if not result:
+            return None
+        reference_cache.invalidate(COURSES_KEY, COURSE_IDS_KEY)
+        return result[0]['id']
+    
+    def reference_cache_stats(self):
+        """Get hit/miss counters for the reference-data cache"""
+        return reference_cache.stats()
+    
+    def get_courses_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, sort='course_code', descending=False):
+        """Get one page of courses, sorted by a COURSE_SORT_KEYS column"""
+        return self._page("SELECT * FROM courses WHERE TRUE", COURSE_SORT_KEYS, sort, page_size, token, descending)
     
     def assign_course_to_staff(self, staff_id, course_id, academic_year, semester):
         """Assign a course to a staff member"""
@@ -151,116 +443,222 @@ class StudentResultsDB:
     
     def get_staff_courses(self, staff_id, academic_year=None, semester=None):
         """Get courses assigned to a staff member"""
-        query = """
-        SELECT c.*, ca.academic_year, ca.semester
-        FROM courses c
-        JOIN course_assignments ca ON c.id = ca.course_id
-        WHERE ca.staff_id = %s
-        """
-        params = [staff_id]
-        if academic_year:
-            query += " AND ca.academic_year = %s"
-            params.append(academic_year)
-        if semester:
-            query += " AND ca.semester = %s"
-            params.append(semester)
-        query += " ORDER BY c.course_code"
-        return self.db.execute_query(query, tuple(params))
+        return self.db.execute_query(*staff_courses_query(staff_id, academic_year, semester))
+    
+    def staff_teaches_student(self, staff_id, student_id):
+        """
+        Check whether a student is enrolled in one of a staff member's assigned course offerings
+        
+        Args:
+            staff_id (int): Staff database id
+            student_id (int): Student database id
+        
+        Returns:
+            bool: True if so, or None if the query failed
+        """
+        result = self.db.execute_query(STAFF_TEACHES_STUDENT_SQL, (staff_id, student_id))
+        return result[0]['teaches'] if result else None
     
     # Enrollment methods
-    def enroll_student(self, student_id, course_id, academic_year, semester):
-        """Enroll a student in a course"""
-        query = """
-        INSERT INTO enrollments (student_id, course_id, academic_year, semester)
-        VALUES (%s, %s, %s, %s)
+    def enroll_student(self, student_id, course_id, academic_year, semester, waitlist=True):
+        """
+        Enroll a student in a course, within its capacity
+        
+        One statement claims a seat and inserts the enrollment, so
+        concurrent requests can neither oversell a course nor enroll a
+        student twice (see migration 0011).
+        
+        Args:
+            student_id (int): Student database id
+            course_id (int): Course database id
+            academic_year (str): e.g. '2024/2025'
+            semester (str): e.g. 'First'
+            waitlist (bool): Put the student on the waitlist if the course is full
+        
+        Returns:
+            str: 'enrolled', 'waitlisted', 'full' (no seat and waitlist is
+            False) or 'duplicate' (already enrolled or waitlisted); 'queued'
+            when write-behind is enabled and the course has no capacity;
+            None on failure
         """
-        return self.db.execute_update(query, (student_id, course_id, academic_year, semester))
+        return self._write('enroll', {
+            'student_id': student_id, 'course_id': course_id,
+            'academic_year': academic_year, 'semester': semester, 'waitlist': waitlist
+        })
     
     def unenroll_student(self, student_id, course_id, academic_year, semester):
-        """Unenroll a student from a course"""
-        query = """
-        DELETE FROM enrollments 
-        WHERE student_id = %s AND course_id = %s AND academic_year = %s AND semester = %s
-        """
-        return self.db.execute_update(query, (student_id, course_id, academic_year, semester))
+        """Unenroll a student from a course, handing their seat to the waitlist"""
+        return self._write('unenroll', {
+            'student_id': student_id, 'course_id': course_id,
+            'academic_year': academic_year, 'semester': semester
+        })
     
     def get_student_enrollments(self, student_id, academic_year=None, semester=None):
         """Get all enrollments for a student"""
-        query = """
-        SELECT e.*, c.course_code, c.course_name, c.credits
-        FROM enrollments e
-        JOIN courses c ON e.course_id = c.id
-        WHERE e.student_id = %s
-        """
-        params = [student_id]
-        if academic_year:
-            query += " AND e.academic_year = %s"
-            params.append(academic_year)
-        if semester:
-            query += " AND e.semester = %s"
-            params.append(semester)
-        query += " ORDER BY c.course_code"
-        return self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_query(*student_enrollments_query(student_id, academic_year, semester))
+        pending = pending_writes(get_write_behind(), student_id=student_id,
+                                 academic_year=academic_year, semester=semester)
+        if rows is None or not pending:
+            return rows
+        courses = {course['id']: course for course in self.get_all_courses() or []}
+        return overlay_enrollments(rows, pending, courses)
     
     def get_course_enrollments(self, course_id, academic_year, semester):
-        """Get all students enrolled in a specific course"""
-        query = """
-        SELECT e.*, s.student_id, s.full_name, s.email
-        FROM enrollments e
-        JOIN students s ON e.student_id = s.id
-        WHERE e.course_id = %s AND e.academic_year = %s AND e.semester = %s
-        ORDER BY s.full_name
         """
-        return self.db.execute_query(query, (course_id, academic_year, semester))
+        Get all students enrolled in a specific course
+        
+        student_id is the student's login code; student_db_id is the
+        database id that score and enrollment methods take.
+        """
+        return self.db.execute_query(COURSE_ENROLLMENTS_SQL, (course_id, academic_year, semester))
+    
+    def get_course_roster(self, course_id, term, include_waitlist=False):
+        """
+        Get a course offering's enrolled students with their scores, in one query
+        
+        Args:
+            course_id (int): Course database id
+            term (tuple): (academic_year, semester)
+            include_waitlist (bool): Also list waitlisted students
+        
+        Returns:
+            list: One dictionary per enrolled student, ordered by name, with
+            student_db_id, student_id, full_name, email, status, and score,
+            grade, gpa_points and updated_at (all None until a score is
+            recorded); None if the query failed
+        """
+        academic_year, semester = term
+        rows = self.db.execute_query(*course_roster_query(course_id, term, include_waitlist))
+        pending = pending_writes(get_write_behind(), course_id=course_id,
+                                 academic_year=academic_year, semester=semester)
+        if rows is None or not pending:
+            return rows
+        enrolling = [entry['payload']['student_id'] for entry in pending if entry['kind'] == 'enroll']
+        students = {}
+        if enrolling:
+            found = self.db.execute_query(
+                "SELECT id, student_id, full_name, email FROM students WHERE id = ANY(%s)", (enrolling,)
+            ) or []
+            students = {row['id']: {'student_id': row['student_id'], 'full_name': row['full_name'],
+                                    'email': row['email']} for row in found}
+        return overlay_roster(rows, pending, students)
     
     # Academic records methods
     def record_student_score(self, student_id, course_id, staff_id, academic_year, semester, score):
-        """Record a student's score for a course"""
-        grade = calculate_grade(score)
-        gpa_points = calculate_gpa_points(score)
+        """Record a student's score for a course (queued when write-behind is enabled)"""
+        return self._write('score', {
+            'student_id': student_id, 'course_id': course_id, 'staff_id': staff_id,
+            'academic_year': academic_year, 'semester': semester, 'score': score
+        })
+    
+    def record_scores_bulk(self, course_id, term, scores, staff_id=None):
+        """
+        Record scores for a whole course roster in one statement
         
-        query = """
-        INSERT INTO academic_records (student_id, course_id, staff_id, academic_year, semester, score, grade, gpa_points)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (student_id, course_id, academic_year, semester)
-        DO UPDATE SET score = EXCLUDED.score, grade = EXCLUDED.grade, gpa_points = EXCLUDED.gpa_points
+        Args:
+            course_id (int): Course database id
+            term (tuple): (academic_year, semester)
+            scores (list): (student_id, score) pairs, student_id being the database id
+            staff_id (int, optional): Staff member recording the scores
+        
+        Returns:
+            dict: 'recorded', a list of dictionaries with student_id, score
+            and grade, and 'invalid', a list of dictionaries with student_id,
+            score and error; None if the statement failed
         """
-        return self.db.execute_update(query, (student_id, course_id, staff_id, academic_year, semester, score, grade, gpa_points))
+        academic_year, semester = term
+        columns, invalid = split_bulk_scores(scores)
+        if not columns['student_ids']:
+            return {'recorded': [], 'invalid': invalid}
+        if not self.db.in_transaction():
+            self._flush_pending(course_id=course_id, academic_year=academic_year, semester=semester)
+        
+        rows = self.db.execute_query(RECORD_SCORES_BULK_SQL, (
+            staff_id, columns['student_ids'], columns['scores'], columns['grades'], columns['gpa_points'],
+            course_id, academic_year, semester
+        ))
+        if rows is None:
+            return None
+        return bulk_scores_result(columns, invalid, rows)
     
-    def get_student_academic_record(self, student_id, academic_year=None, semester=None):
-        """Get academic records for a student"""
+    def get_academic_records_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, sort='recorded_at', descending=True):
+        """Get one page of academic records, sorted by a RECORD_SORT_KEYS column"""
         query = """
-        SELECT ar.*, c.course_code, c.course_name, c.credits, s.full_name as staff_name
+        SELECT ar.*, s.full_name as student_name, c.course_name, st.full_name as staff_name
         FROM academic_records ar
+        JOIN students s ON ar.student_id = s.id
         JOIN courses c ON ar.course_id = c.id
-        JOIN staff s ON ar.staff_id = s.id
-        WHERE ar.student_id = %s
-        """
-        params = [student_id]
-        if academic_year:
-            query += " AND ar.academic_year = %s"
-            params.append(academic_year)
-        if semester:
-            query += " AND ar.semester = %s"
-            params.append(semester)
-        query += " ORDER BY c.course_code"
-        return self.db.execute_query(query, tuple(params))
+        LEFT JOIN staff st ON ar.staff_id = st.id
+        WHERE TRUE
+        """
+        return self._page(query, RECORD_SORT_KEYS, sort, page_size, token, descending)
+    
+    def get_student_academic_record(self, student_id, academic_year=None, semester=None):
+        """Get academic records for a student"""
+        rows = self.db.execute_query(*student_records_query(student_id, academic_year, semester))
+        pending = pending_writes(get_write_behind(), student_id=student_id,
+                                 academic_year=academic_year, semester=semester)
+        pending = [entry for entry in pending if entry['kind'] == 'score']
+        if rows is None or not pending:
+            return rows
+        courses = {course['id']: course for course in self.get_all_courses() or []}
+        staff_ids = list({entry['payload']['staff_id'] for entry in pending})
+        staff = self.db.execute_query("SELECT id, full_name FROM staff WHERE id = ANY(%s)", (staff_ids,)) or []
+        return overlay_scores(rows, pending, courses, {row['id']: row['full_name'] for row in staff})
     
     def calculate_student_gpa(self, student_id, academic_year=None, semester=None):
-        """Calculate GPA for a student"""
-        records = self.get_student_academic_record(student_id, academic_year, semester)
-        if not records:
+        """Read a student's credit-weighted GPA from the term summary"""
+        result = self.db.execute_query(*student_gpa_query(student_id, academic_year, semester))
+        if not result or result[0]['gpa'] is None:
             return 0.0
+        return float(result[0]['gpa'])
+    
+    def get_student_gpa_summary(self, student_id):
+        """
+        Get a student's GPA for every term plus the cumulative GPA
+        
+        Returns:
+            dict: 'cumulative' GPA, 'total_credits', and 'terms', a list of
+            dictionaries with academic_year, semester, total_credits and gpa;
+            None if the query failed
+        """
+        rows = self.db.execute_query(GPA_SUMMARY_SQL, (student_id,))
+        if rows is None:
+            return None
+        return summarize_term_gpas(rows)
+    
+    def get_cohort_gpas(self, student_ids=None, course_id=None, academic_year=None, semester=None):
+        """
+        Get GPAs for many students in one query
         
-        total_points = 0
-        total_credits = 0
+        Args:
+            student_ids (list, optional): Restrict to these students (database ids)
+            course_id (int, optional): Restrict to students enrolled in this course
+            academic_year (str, optional): Term GPA for this year instead of cumulative
+            semester (str, optional): Term GPA for this semester instead of cumulative
         
-        for record in records:
-            if record['gpa_points'] is not None:
-                total_points += record['gpa_points'] * record['credits']
-                total_credits += record['credits']
+        Returns:
+            list: One row per student with id, student_id, full_name,
+            total_credits and gpa (0 for students without records)
+        """
+        return self.db.execute_query(*cohort_gpas_query(student_ids, course_id, academic_year, semester))
+    
+    def get_dashboard_stats(self):
+        """
+        Get the admin dashboard figures in one query
+        
+        Reads the trigger-maintained dashboard_counters table, so the cost
+        doesn't grow with the tables being counted.
         
-        return round(total_points / total_credits, 2) if total_credits > 0 else 0.0
+        Returns:
+            dict: students, staff, courses, enrollments and waitlisted
+            counts, and grades
+            (a list of {'grade', 'count'} in grade order), or None on failure
+        """
+        rows = self.db.execute_query(DASHBOARD_COUNTERS_SQL)
+        if rows is None:
+            return None
+        return dashboard_figures(rows)
     
     # Legacy methods for backward compatibility
     def insert_student(self, index_number, full_name, course, score):
@@ -273,11 +671,147 @@ class StudentResultsDB:
         params = (index_number, full_name, course, score, grade)
         return self.db.execute_update(query, params)
     
+    def bulk_insert_students(self, records):
+        """
+        Insert many student records (legacy) with COPY and a single merge
+        
+        Records whose index number already exists are skipped, as are
+        records repeating an index number earlier in the input (duplicates).
+        
+        Args:
+            records (iterable): Record dictionaries from read_student_data
+        
+        Returns:
+            dict: inserted, skipped, duplicates and errors counts plus error_details
+        """
+        return BulkImporter(self.db).import_records(records)
+    
+    def upsert_students(self, records, on_conflict='skip', keys=True):
+        """
+        Insert student records (legacy), resolving existing index numbers in one statement
+        
+        Safe against concurrent imports: the unique index on index_number
+        decides which writer inserts a number, without a separate check.
+        
+        Args:
+            records (iterable): Record dictionaries from read_student_data
+            on_conflict (str): 'skip' leaves existing records as they are;
+                'update' overwrites them with the imported values
+            keys (bool): Return the index numbers behind each count; pass
+                False for very large imports that only need the counts
+        
+        Returns:
+            dict: inserted, updated and skipped counts (one per index
+            number; an update that would change nothing counts as skipped),
+            duplicates (repeats within records), errors and error_details,
+            and with keys, 'keys' mapping 'inserted', 'updated' and
+            'skipped' to lists of index numbers
+        """
+        return BulkImporter(self.db, on_conflict).import_records(records, keys=keys)
+    
+    def import_students_file(self, file_path, on_conflict='skip', errors=None, workers=None, should_stop=None):
+        """
+        Import a CSV or TXT file of student records (legacy), resuming an interrupted import
+        
+        The file's content hash is looked up in import_checkpoints: a file
+        already imported in full is not imported again, and one whose
+        import stopped part way continues after its last committed batch.
+        New files of PARALLEL_MIN_BYTES or more are parsed and staged by
+        worker processes and merged as a whole (see database.parallel_import);
+        everything else is committed in batches with a checkpoint after each.
+        
+        Args:
+            file_path (str): Path to the data file
+            on_conflict (str): 'skip' or 'update', as for upsert_students
+            errors (ImportErrorCollector, optional): Receives per-line errors
+            workers (int, optional): Worker processes (default: CPU count);
+                1 never imports in parallel
+            should_stop (callable, optional): Returns True to stop the
+                import; a later run resumes it
+        
+        Returns:
+            dict: The counts from upsert_students (without keys) for this
+            run, plus resumed_from (byte offset started at), already_imported,
+            cancelled and failed (a transaction was rolled back; see
+            error_details)
+        """
+        check_conflict_action(on_conflict)
+        if not os.path.exists(file_path):
+            if errors is not None:
+                errors.add(f"File not found: {file_path}")
+            return new_file_import_result()
+        
+        digest = file_hash(file_path)
+        checkpoint = load_checkpoint(self.db, digest, on_conflict)
+        if checkpoint and checkpoint['completed']:
+            result = new_file_import_result(checkpoint['byte_offset'])
+            result['already_imported'] = True
+            return result
+        
+        if checkpoint is None and workers != 1 and os.path.getsize(file_path) >= PARALLEL_MIN_BYTES:
+            return ParallelImporter(self.db, on_conflict, workers).import_file(file_path, errors, should_stop, digest)
+        start_offset = checkpoint['byte_offset'] if checkpoint else 0
+        return ResumableImporter(self.db, on_conflict).import_file(file_path, digest, start_offset, errors, should_stop)
+    
     def get_all_students(self):
         """Retrieve all student records (legacy)"""
         query = "SELECT * FROM student_results ORDER BY full_name"
         return self.db.execute_query(query)
     
+    def get_students_changed_since(self, since=None):
+        """
+        Get the student records (legacy) changed since an earlier call
+        
+        Args:
+            since (datetime, optional): cursor from the previous result;
+                None returns every record
+        
+        Returns:
+            dict: 'rows' (records inserted or updated since), 'deleted'
+            (index numbers no longer present) and the 'cursor' to pass next
+            time, or None if a query failed
+        """
+        # Taken before reading, and held back to the start of any transaction
+        # still running, so rows it commits after this read are not skipped.
+        # Rows at the cursor itself may be returned twice, which is harmless.
+        result = self.db.execute_query("""
+        SELECT LEAST(clock_timestamp(), MIN(xact_start)) AS cursor
+        FROM pg_stat_activity
+        WHERE datname = current_database() AND xact_start IS NOT NULL
+          AND pid <> pg_backend_pid()
+        """)
+        if not result:
+            return None
+        cursor = result[0]['cursor']
+        
+        if since is None:
+            rows = self.get_all_students()
+            deleted = []
+        else:
+            rows = self.db.execute_query(
+                "SELECT * FROM student_results WHERE updated_at >= %s ORDER BY full_name",
+                (since,)
+            )
+            deleted = self.db.execute_query("""
+            SELECT DISTINCT d.index_number
+            FROM student_results_deleted d
+            WHERE d.deleted_at >= %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM student_results r WHERE r.index_number = d.index_number
+              )
+            """, (since,))
+        if rows is None or deleted is None:
+            return None
+        return {
+            'rows': rows,
+            'deleted': [row['index_number'] for row in deleted],
+            'cursor': cursor
+        }
+    
+    def get_legacy_students_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, sort='full_name', descending=False):
+        """Get one page of student records (legacy), sorted by a LEGACY_SORT_KEYS column"""
+        return self._page("SELECT * FROM student_results WHERE TRUE", LEGACY_SORT_KEYS, sort, page_size, token, descending)
+    
     def get_student_by_index(self, index_number):
         """Retrieve a student by index number (legacy)"""
         query = "SELECT * FROM student_results WHERE index_number = %s"
@@ -0,0 +1,146 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Page:
+    """One page of rows plus the tokens for the pages either side"""
+
+    def __init__(self, rows, next_token=None, prev_token=None):
+        self.rows = rows
+        self.next_token = next_token
+        self.prev_token = prev_token
+
+    @property
+    def has_next(self):
+        return self.next_token is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_token is not None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def encode_token(values, direction):
+    """
+    Encode the sort key of a boundary row as an opaque page token
+
+    Args:
+        values (list): Values of the ORDER BY columns for the boundary row
+        direction (str): 'next' for rows after it, 'prev' for rows before it
+
+    Returns:
+        str: URL-safe token
+    """
+    payload = json.dumps({'k': values, 'd': direction}, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_token(token, key_count):
+    """
+    Decode a page token produced by encode_token
+
+    Args:
+        token (str): Token from a previous Page
+        key_count (int): Number of ORDER BY columns the listing uses
+
+    Returns:
+        tuple: (values, direction)
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another listing
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        values, direction = payload['k'], payload['d']
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid page token")
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != key_count:
+        raise ValueError("Invalid page token")
+    return values, direction
+
+
+def _split_column(column):
+    """
+    Return (expression, result column) for an ORDER BY entry
+
+    Entries are either an expression like 's.full_name', read back from the
+    result column after the last dot, or an (expression, result column)
+    pair for aliased columns.
+    """
+    if isinstance(column, tuple):
+        return column
+    return column, column.rsplit('.', 1)[-1]
+
+
+def fetch_page(db, query, params=(), order_by=('id',), page_size=DEFAULT_PAGE_SIZE,
+               token=None, descending=False):
+    """
+    Fetch one page of a listing with a keyset cursor
+
+    The page is located with a row comparison on the ORDER BY columns rather
+    than OFFSET, so every page costs the same however deep it is. The last
+    column must make the ordering unique (usually the primary key).
+
+    Args:
+        db (DatabaseConnection): Connection used to run the query
+        query (str): SELECT ending in a WHERE clause (use WHERE TRUE if there
+            is no filter); ORDER BY and LIMIT are appended
+        params (tuple): Parameters for query
+        order_by (tuple): Sort columns, e.g. ('s.full_name', 's.id'); the
+            part after the last dot must name a column in the results, or
+            give an (expression, result column) pair instead
+        page_size (int): Rows per page, capped at MAX_PAGE_SIZE
+        token (str, optional): next_token or prev_token of another page
+        descending (bool): Sort every column descending
+
+    Returns:
+        Page: The rows, or None if the query failed
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    params = list(params)
+    columns = [_split_column(column) for column in order_by]
+    expressions = [expression for expression, _ in columns]
+    direction = 'next'
+    if token:
+        values, direction = decode_token(token, len(columns))
+        # Walking backwards is a forward walk in the opposite order
+        forward = (direction == 'next') != descending
+        query += f" AND ({', '.join(expressions)}) {'>' if forward else '<'} ({', '.join(['%s'] * len(columns))})"
+        params.extend(values)
+
+    reverse = (direction == 'prev') != descending
+    sort = ' DESC' if reverse else ''
+    query += " ORDER BY " + ", ".join(expression + sort for expression in expressions)
+    # One extra row tells us whether another page follows without a COUNT
+    query += " LIMIT %s"
+    params.append(page_size + 1)
+
+    rows = db.execute_query(query, tuple(params))
+    if rows is None:
+        return None
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+    if not rows:
+        return Page(rows)
+
+    keys = [key for _, key in columns]
+    first = [rows[0][key] for key in keys]
+    last = [rows[-1][key] for key in keys]
+    if direction == 'next':
+        next_token = encode_token(last, 'next') if more else None
+        prev_token = encode_token(first, 'prev') if token else None
+    else:
+        next_token = encode_token(last, 'next')
+        prev_token = encode_token(first, 'prev') if more else None
+    return Page(rows, next_token, prev_token)
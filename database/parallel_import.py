@@ -0,0 +1,223 @@
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import psycopg2
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DB_CONFIG
+from utils.file_handler import StudentFileReader, ImportErrorCollector
+from database.bulk_import import (
+    COPY_SQL, STAGING_TABLE_SQL, MAX_ERROR_DETAILS, new_import_result, new_file_import_result,
+    merge_staged, check_conflict_action, _CopyStream
+)
+from database.checkpoints import save_checkpoint
+
+# Files smaller than this are imported serially; starting worker processes
+# costs more than parsing them
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Chunks per worker, so a worker that finishes early picks up more work
+CHUNKS_PER_WORKER = 4
+
+# Seconds between checks for cancellation while chunks are being staged
+STOP_CHECK_INTERVAL = 0.5
+
+# Set in each worker process by _connect_worker
+_worker_connection = None
+
+
+def split_file(file_path, chunks):
+    """
+    Divide a data file into byte ranges that start and end on line boundaries
+
+    A CSV header line is left out of every range (StudentFileReader reads
+    it separately).
+
+    Args:
+        file_path (str): Path to the data file
+        chunks (int): Number of ranges wanted; fewer are returned for small files
+
+    Returns:
+        list: (start_offset, end_offset) tuples in file order
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as file:
+        if file_path.endswith('.csv'):
+            file.readline()
+        bounds = [file.tell()]
+        step = max((size - bounds[0]) // max(chunks, 1), 1)
+        for i in range(1, chunks):
+            # Reading the rest of the line holding the byte before the
+            # target lands on the first line starting at or after it
+            file.seek(bounds[0] + i * step - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundary >= size:
+                break
+            if boundary > bounds[-1]:
+                bounds.append(boundary)
+    if size > bounds[-1]:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _connect_worker(dsn):
+    """Open the worker process's own connection (ProcessPoolExecutor initializer)"""
+    global _worker_connection
+    _worker_connection = psycopg2.connect(**dsn)
+
+
+def _stage_chunk(file_path, start, end, staging):
+    """
+    Parse one byte range of the file and COPY its valid records into staging
+
+    Runs in a worker process. Staged rows are numbered from the range's
+    start offset: a line is at least two bytes, so the numbers stay below
+    the next range's and the merge still sees records in file order.
+
+    Returns:
+        dict: 'start', 'staged', the chunk's import 'result' (record
+        errors), its file 'errors' collector and 'error' (a message if the
+        chunk could not be staged, else None)
+    """
+    errors = ImportErrorCollector()
+    result = new_import_result()
+    reader = StudentFileReader(file_path, errors=errors, start_offset=start, end_offset=end)
+    stream = _CopyStream(reader.records(), result, first_seq=start)
+    error = None
+    try:
+        with _worker_connection.cursor() as cursor:
+            cursor.copy_expert(COPY_SQL.format(table=staging), stream)
+        _worker_connection.commit()
+    except psycopg2.Error as e:
+        _worker_connection.rollback()
+        error = str(e).strip()
+    return {'start': start, 'staged': stream.staged, 'result': result, 'errors': errors, 'error': error}
+
+
+class ParallelImporter:
+    """
+    Import one large file using a pool of worker processes
+
+        result = ParallelImporter(db.db, on_conflict='skip').import_file(path, errors)
+
+    The file is split at line boundaries and each worker parses its chunks
+    and COPYs them into a shared UNLOGGED staging table through its own
+    connection. One transaction then upserts the staged records into
+    student_results exactly as BulkImporter does, so the import still
+    succeeds or fails as a whole.
+    """
+
+    def __init__(self, db, on_conflict='skip', workers=None):
+        check_conflict_action(on_conflict)
+        self.db = db
+        self.on_conflict = on_conflict
+        self.workers = workers or os.cpu_count() or 1
+
+    def import_file(self, file_path, errors=None, should_stop=None, digest=None):
+        """
+        Import a CSV or TXT file of student records (legacy)
+
+        Args:
+            file_path (str): Path to the data file
+            errors (ImportErrorCollector, optional): Receives per-line errors
+                from every chunk, in file order
+            should_stop (callable, optional): Polled while chunks are
+                staged; returning True abandons the import before anything
+                is written to student_results
+            digest (str, optional): checkpoints.file_hash() of the file;
+                if given, the import is recorded as completed when it commits
+
+        Returns:
+            dict: The same counts as BulkImporter.import_records (without
+            keys), plus resumed_from, already_imported, cancelled and failed
+        """
+        errors = errors if errors is not None else ImportErrorCollector()
+        result = new_file_import_result()
+        if not os.path.exists(file_path):
+            errors.add(f"File not found: {file_path}")
+            return result
+
+        started = time.monotonic()
+        staging = f"student_results_import_{uuid.uuid4().hex[:12]}"
+        # UNLOGGED: staged rows are thrown away after the merge, so there
+        # is no point writing them to the WAL
+        if not self.db.execute_update(STAGING_TABLE_SQL.format(kind='UNLOGGED', table=staging, options='')):
+            result['error_details'].append({'message': "import failed: could not create staging table", 'record': None})
+            result['failed'] = True
+            return result
+
+        try:
+            failures = []
+            try:
+                chunks = self._stage(file_path, staging, should_stop)
+            except (BrokenProcessPool, OSError) as e:
+                # A worker died or couldn't connect
+                chunks = []
+                failures.append(f"worker failed: {e}")
+            if chunks is None or (should_stop is not None and should_stop()):
+                result['cancelled'] = True
+                return result
+
+            staged = 0
+            for chunk in chunks:
+                staged += chunk['staged']
+                errors.merge(chunk['errors'])
+                result['errors'] += chunk['result']['errors']
+                room = MAX_ERROR_DETAILS - len(result['error_details'])
+                result['error_details'].extend(chunk['result']['error_details'][:room])
+                if chunk['error']:
+                    failures.append(f"chunk at byte {chunk['start']}: {chunk['error']}")
+
+            if not failures:
+                with self.db.transaction() as tx:
+                    if tx.ok:
+                        merge_staged(self.db.cursor, staging, self.on_conflict, result)
+                        if digest is not None:
+                            save_checkpoint(self.db.cursor, digest, self.on_conflict, file_path,
+                                            os.path.getsize(file_path), staged, completed=True)
+                if not tx.ok:
+                    failures.append(tx.error)
+
+            if failures:
+                # Nothing was merged, so every staged row failed
+                result.update(inserted=0, updated=0, skipped=0)
+                result['errors'] += staged
+                for failure in failures:
+                    result['error_details'].append({'message': f"import failed: {failure}", 'record': None})
+                result['failed'] = True
+                return result
+
+            result['duplicates'] = staged - result['inserted'] - result['updated'] - result['skipped']
+            elapsed = time.monotonic() - started
+            if elapsed > 0:
+                result['rows_per_second'] = round((staged + result['errors']) / elapsed, 1)
+            return result
+        finally:
+            self.db.execute_update(f"DROP TABLE IF EXISTS {staging}")
+
+    def _stage(self, file_path, staging, should_stop):
+        """Stage every chunk; returns their results in file order, or None if stopped"""
+        ranges = split_file(file_path, self.workers * CHUNKS_PER_WORKER)
+        if not ranges:
+            return []
+
+        # spawn, not fork: the parent may hold pooled connections, Tk and
+        # other threads that a forked child must not inherit
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(min(self.workers, len(ranges)), mp_context=context,
+                                 initializer=_connect_worker, initargs=(dict(DB_CONFIG),)) as pool:
+            pending = {pool.submit(_stage_chunk, file_path, start, end, staging) for start, end in ranges}
+            done = []
+            while pending:
+                finished, pending = wait(pending, timeout=STOP_CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+                done.extend(future.result() for future in finished)
+                if pending and should_stop is not None and should_stop():
+                    for future in pending:
+                        future.cancel()
+                    return None
+        return sorted(done, key=lambda chunk: chunk['start'])
@@ -0,0 +1,212 @@
+# SQL shared by StudentResultsDB, AsyncStudentResultsDB and the write-behind
+# flusher, so the blocking and async methods can't drift apart. Statements
+# use psycopg2's %s placeholders; AsyncDatabaseConnection rewrites them to
+# asyncpg's $1, $2, ... Queries with optional filters are built by the
+# *_query functions, which return (query, params).
+
+# Authentication and users
+AUTHENTICATE_ADMIN_SQL = """
+SELECT * FROM users
+WHERE email = %s AND password_hash = %s AND user_type = 'admin'
+"""
+AUTHENTICATE_STUDENT_SQL = """
+SELECT * FROM students
+WHERE student_id = %s AND pin = %s
+"""
+AUTHENTICATE_STAFF_SQL = """
+SELECT * FROM staff
+WHERE staff_id = %s AND pin = %s
+"""
+CREATE_STUDENT_SQL = """
+INSERT INTO students (student_id, pin, full_name, email, phone)
+VALUES (%s, %s, %s, %s, %s)
+"""
+CREATE_STAFF_SQL = """
+INSERT INTO staff (staff_id, pin, full_name, email, department)
+VALUES (%s, %s, %s, %s, %s)
+"""
+STUDENT_DB_ID_SQL = "SELECT id FROM students WHERE student_id = %s"
+STAFF_DB_ID_SQL = "SELECT id FROM staff WHERE staff_id = %s"
+
+# Courses
+ADD_COURSE_SQL = """
+INSERT INTO courses (course_code, course_name, credits, description, capacity)
+VALUES (%s, %s, %s, %s, %s)
+"""
+ALL_COURSES_SQL = "SELECT * FROM courses ORDER BY course_code"
+COURSE_ID_SQL = "SELECT id FROM courses WHERE course_code = %s"
+SET_CAPACITY_SQL = "UPDATE courses SET capacity = %s WHERE id = %s"
+CLEAR_SEATS_SQL = "DELETE FROM course_seats WHERE course_id = %s"
+PROMOTE_WAITLIST_SQL = """
+SELECT promote_waitlist(course_id, academic_year, semester) AS promoted
+FROM (
+    SELECT DISTINCT course_id, academic_year, semester
+    FROM enrollments
+    WHERE course_id = %s AND status = 'waitlisted'
+) waiting
+"""
+
+# Enrollments
+ENROLL_SQL = "SELECT enroll_in_course(%s, %s, %s, %s, %s) AS status"
+UNENROLL_SQL = "SELECT unenroll_from_course(%s, %s, %s, %s) AS removed"
+COURSE_ENROLLMENTS_SQL = """
+SELECT e.*, s.student_id, s.id AS student_db_id, s.full_name, s.email
+FROM enrollments e
+JOIN students s ON e.student_id = s.id
+WHERE e.course_id = %s AND e.academic_year = %s AND e.semester = %s
+  AND e.status = 'enrolled'
+ORDER BY s.full_name
+"""
+# Whether a student is enrolled or waitlisted in an offering the staff member is assigned
+STAFF_TEACHES_STUDENT_SQL = """
+SELECT EXISTS (
+    SELECT 1
+    FROM course_assignments ca
+    JOIN enrollments e
+        ON e.course_id = ca.course_id AND e.academic_year = ca.academic_year AND e.semester = ca.semester
+    WHERE ca.staff_id = %s AND e.student_id = %s
+) AS teaches
+"""
+
+# Scores
+RECORD_SCORE_SQL = """
+INSERT INTO academic_records (student_id, course_id, staff_id, academic_year, semester, score, grade, gpa_points)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (student_id, course_id, academic_year, semester)
+DO UPDATE SET score = EXCLUDED.score, grade = EXCLUDED.grade, gpa_points = EXCLUDED.gpa_points
+"""
+# Only students enrolled in the course for this term are recorded
+RECORD_SCORES_BULK_SQL = """
+INSERT INTO academic_records (student_id, course_id, staff_id, academic_year, semester, score, grade, gpa_points)
+SELECT v.student_id, e.course_id, %s, e.academic_year, e.semester, v.score, v.grade, v.gpa_points
+FROM unnest(%s::int[], %s::int[], %s::char(1)[], %s::float8[]) AS v(student_id, score, grade, gpa_points)
+JOIN enrollments e ON e.student_id = v.student_id
+     AND e.course_id = %s AND e.academic_year = %s AND e.semester = %s
+     AND e.status = 'enrolled'
+ON CONFLICT (student_id, course_id, academic_year, semester)
+DO UPDATE SET score = EXCLUDED.score, grade = EXCLUDED.grade, gpa_points = EXCLUDED.gpa_points
+RETURNING student_id, score, grade
+"""
+
+# GPAs and dashboard
+GPA_SUMMARY_SQL = """
+SELECT academic_year, semester, total_points, total_credits, gpa
+FROM student_term_summary
+WHERE student_id = %s
+ORDER BY academic_year, semester
+"""
+# Summed counters read by get_dashboard_stats and the recount-stats command
+DASHBOARD_COUNTERS_SQL = "SELECT name, SUM(value) AS value FROM dashboard_counters GROUP BY name"
+
+
+def _term_filters(query, params, alias, academic_year, semester):
+    """Append the optional academic_year/semester filters on alias"""
+    if academic_year:
+        query += f" AND {alias}.academic_year = %s"
+        params.append(academic_year)
+    if semester:
+        query += f" AND {alias}.semester = %s"
+        params.append(semester)
+    return query
+
+
+def staff_courses_query(staff_id, academic_year=None, semester=None):
+    """Courses assigned to a staff member (get_staff_courses)"""
+    query = """
+    SELECT c.*, ca.academic_year, ca.semester
+    FROM courses c
+    JOIN course_assignments ca ON c.id = ca.course_id
+    WHERE ca.staff_id = %s
+    """
+    params = [staff_id]
+    query = _term_filters(query, params, 'ca', academic_year, semester)
+    return query + " ORDER BY c.course_code", tuple(params)
+
+
+def student_enrollments_query(student_id, academic_year=None, semester=None):
+    """A student's enrollments with their courses (get_student_enrollments)"""
+    query = """
+    SELECT e.*, c.course_code, c.course_name, c.credits
+    FROM enrollments e
+    JOIN courses c ON e.course_id = c.id
+    WHERE e.student_id = %s
+    """
+    params = [student_id]
+    query = _term_filters(query, params, 'e', academic_year, semester)
+    return query + " ORDER BY c.course_code", tuple(params)
+
+
+def course_roster_query(course_id, term, include_waitlist=False):
+    """An offering's students with their scores (get_course_roster)"""
+    academic_year, semester = term
+    query = """
+    SELECT s.id AS student_db_id, s.student_id, s.full_name, s.email, e.status,
+           ar.score, ar.grade, ar.gpa_points, ar.updated_at
+    FROM enrollments e
+    JOIN students s ON s.id = e.student_id
+    LEFT JOIN academic_records ar
+        ON ar.student_id = e.student_id AND ar.course_id = e.course_id
+       AND ar.academic_year = e.academic_year AND ar.semester = e.semester
+    WHERE e.course_id = %s AND e.academic_year = %s AND e.semester = %s
+    """
+    if not include_waitlist:
+        query += " AND e.status = 'enrolled'"
+    return query + " ORDER BY s.full_name, s.id", (course_id, academic_year, semester)
+
+
+def student_records_query(student_id, academic_year=None, semester=None):
+    """A student's academic records with course and staff names (get_student_academic_record)"""
+    query = """
+    SELECT ar.*, c.course_code, c.course_name, c.credits, s.full_name as staff_name
+    FROM academic_records ar
+    JOIN courses c ON ar.course_id = c.id
+    LEFT JOIN staff s ON ar.staff_id = s.id
+    WHERE ar.student_id = %s
+    """
+    params = [student_id]
+    query = _term_filters(query, params, 'ar', academic_year, semester)
+    return query + " ORDER BY c.course_code", tuple(params)
+
+
+def student_gpa_query(student_id, academic_year=None, semester=None):
+    """A student's credit-weighted GPA from the term summary, as a 'gpa' column (calculate_student_gpa)"""
+    if academic_year and semester:
+        # One term is a single primary-key lookup
+        query = """
+        SELECT gpa FROM student_term_summary
+        WHERE student_id = %s AND academic_year = %s AND semester = %s
+        """
+        return query, (student_id, academic_year, semester)
+    query = """
+    SELECT ROUND(SUM(total_points) / NULLIF(SUM(total_credits), 0), 2) AS gpa
+    FROM student_term_summary
+    WHERE student_id = %s
+    """
+    params = [student_id]
+    query = _term_filters(query, params, 'student_term_summary', academic_year, semester)
+    return query, tuple(params)
+
+
+def cohort_gpas_query(student_ids=None, course_id=None, academic_year=None, semester=None):
+    """GPAs for many students in one query (get_cohort_gpas)"""
+    term_params = []
+    term_filter = _term_filters("", term_params, '{alias}', academic_year, semester)
+    query = """
+    SELECT s.id, s.student_id, s.full_name,
+           COALESCE(SUM(ts.total_credits), 0) AS total_credits,
+           COALESCE(ROUND(SUM(ts.total_points) / NULLIF(SUM(ts.total_credits), 0), 2), 0) AS gpa
+    FROM students s
+    LEFT JOIN student_term_summary ts ON ts.student_id = s.id""" + term_filter.format(alias='ts') + """
+    WHERE TRUE
+    """
+    params = list(term_params)
+    if student_ids is not None:
+        query += " AND s.id = ANY(%s)"
+        params.append(list(student_ids))
+    if course_id is not None:
+        query += """ AND EXISTS (
+            SELECT 1 FROM enrollments e
+            WHERE e.student_id = s.id AND e.course_id = %s AND e.status = 'enrolled'""" + term_filter.format(alias='e') + ")"
+        params.append(course_id)
+        params.extend(term_params)
+    return query + " GROUP BY s.id ORDER BY s.full_name, s.id", tuple(params)
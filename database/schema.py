@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+import psycopg2
+from psycopg2 import errors
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Migration files are named like 0001_initial_schema.sql
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent clients don't
+# apply the same migration twice
+MIGRATION_LOCK_KEY = 71510001
+
+# Set once this process has seen the database at head, so later connects
+# skip the version check entirely
+_verified_head = None
+_verified_lock = threading.Lock()
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """
+    Find migration files in version order
+
+    Args:
+        directory (str): Directory holding NNNN_name.sql files
+
+    Returns:
+        list: (version, name, path) tuples sorted by version
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration version in {directory}")
+    return migrations
+
+
+class SchemaMigrator:
+    def __init__(self, connection, migrations=None):
+        self.connection = connection
+        self.migrations = migrations if migrations is not None else discover_migrations()
+
+    @property
+    def head_version(self):
+        """Version of the newest migration file"""
+        return self.migrations[-1][0] if self.migrations else 0
+
+    def current_version(self):
+        """Return the applied schema version (0 for a fresh database)"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT MAX(version) FROM schema_version")
+                version = cursor.fetchone()[0]
+            self._end_read()
+            return version or 0
+        except errors.UndefinedTable:
+            self.connection.rollback()
+            return 0
+
+    def pending_migrations(self, current=None):
+        """Return migrations newer than the applied version"""
+        current = self.current_version() if current is None else current
+        return [m for m in self.migrations if m[0] > current]
+
+    def is_at_head(self):
+        """Check the schema version with a single query"""
+        return self.current_version() >= self.head_version
+
+    def migrate(self):
+        """
+        Apply pending migrations, each in its own transaction
+
+        Returns:
+            list: Versions applied by this call
+        """
+        applied = []
+        pending = self.pending_migrations()
+        # Each migration must run as a single transaction so the advisory
+        # lock is held until its version row is committed
+        autocommit = self.connection.autocommit
+        self.connection.autocommit = False
+        try:
+            for version, name, path in pending:
+                if self._apply(version, name, path):
+                    applied.append(version)
+        finally:
+            self.connection.autocommit = autocommit
+        return applied
+
+    def _apply(self, version, name, path):
+        """Apply one migration file; returns False if another client already did"""
+        with open(path, 'r', encoding='utf-8') as file:
+            statements = file.read()
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Another client may have applied it while we waited for the lock
+                cursor.execute("SELECT 1 FROM schema_version WHERE version = %s", (version,))
+                if cursor.fetchone():
+                    self.connection.commit()
+                    return False
+                cursor.execute(statements)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+            self.connection.commit()
+            print(f"✓ Applied migration {version:04d}_{name}")
+            return True
+        except psycopg2.Error:
+            self.connection.rollback()
+            raise
+
+    def _end_read(self):
+        # Don't leave an idle transaction open after the version check
+        if not self.connection.autocommit:
+            self.connection.rollback()
+
+
+def ensure_schema(connection):
+    """
+    Bring the database up to the newest migration
+
+    Costs one query when the schema is already at head, and nothing at all
+    once this process has verified that.
+
+    Args:
+        connection: Open psycopg2 connection
+
+    Returns:
+        bool: True if the schema is at head
+    """
+    global _verified_head
+    migrator = SchemaMigrator(connection)
+    if _verified_head == migrator.head_version:
+        return True
+
+    with _verified_lock:
+        try:
+            current = migrator.current_version()
+            if current < migrator.head_version:
+                migrator.migrate()
+            _verified_head = migrator.head_version
+            return True
+        except psycopg2.Error as e:
+            print(f"✗ Error applying schema migrations: {e}")
+            return False
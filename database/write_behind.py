@@ -0,0 +1,607 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import psycopg2
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import WRITE_BEHIND_CONFIG
+from database.connection import DatabaseConnection
+from database.queries import RECORD_SCORE_SQL, ENROLL_SQL, UNENROLL_SQL
+from utils.grade_calculator import calculate_grade, calculate_gpa_points
+
+# Writes that may be queued, with what the StudentResultsDB method returns
+# once one is queued (enroll can't know yet whether a seat was free)
+QUEUED_RESULTS = {
+    'score': True,
+    'enroll': 'queued',
+    'unenroll': True,
+}
+
+# Flush timings kept for the latency figures in WriteBehind.metrics()
+FLUSH_SAMPLES = 200
+
+# Errors that a write will hit again on every retry (e.g. a student deleted
+# since the write was queued); such writes are set aside, not retried
+PERMANENT_ERRORS = (psycopg2.IntegrityError, psycopg2.DataError)
+
+# Payload fields copied into their own pending_writes columns, so reads
+# can find the writes for one student or course without decoding the queue
+KEY_FIELDS = ('student_id', 'course_id', 'academic_year', 'semester')
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    student_id INTEGER,
+    course_id INTEGER,
+    academic_year TEXT,
+    semester TEXT
+);
+CREATE TABLE IF NOT EXISTS failed_writes (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+"""
+
+QUEUE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_pending_writes_student ON pending_writes (student_id);
+CREATE INDEX IF NOT EXISTS idx_pending_writes_course ON pending_writes (course_id);
+"""
+
+
+def apply_write(db, kind, payload):
+    """
+    Run one score or enrollment write against PostgreSQL
+
+    Args:
+        db (DatabaseConnection): Connection to write with
+        kind (str): 'score', 'enroll' or 'unenroll'
+        payload (dict): The write's arguments, named as in StudentResultsDB
+
+    Returns:
+        What the StudentResultsDB method returns: True/False for a score,
+        the enrollment status (None on failure) for an enroll, and whether
+        an enrollment was removed for an unenroll
+    """
+    if kind == 'score':
+        score = payload['score']
+        return db.execute_update(RECORD_SCORE_SQL, (
+            payload['student_id'], payload['course_id'], payload['staff_id'],
+            payload['academic_year'], payload['semester'],
+            score, calculate_grade(score), calculate_gpa_points(score)
+        ))
+    if kind == 'enroll':
+        result = db.execute_query(ENROLL_SQL, (
+            payload['student_id'], payload['course_id'], payload['academic_year'],
+            payload['semester'], payload['waitlist']
+        ))
+        return result[0]['status'] if result else None
+    if kind == 'unenroll':
+        result = db.execute_query(UNENROLL_SQL, (
+            payload['student_id'], payload['course_id'], payload['academic_year'], payload['semester']
+        ))
+        return bool(result and result[0]['removed'])
+    raise ValueError(f"Unknown write kind: {kind}")
+
+
+class WriteQueue:
+    """
+    Durable first-in first-out queue of writes in a local SQLite file
+
+    put() returns once the write is synced to disk, so queued writes
+    survive a crash and are flushed the next time the application starts.
+    Writes that PostgreSQL rejects are moved to the failed_writes table.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit; set_aside() opens its own transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(QUEUE_SCHEMA)
+        self._add_key_columns()
+        self._conn.executescript(QUEUE_INDEXES)
+
+    def _add_key_columns(self):
+        """Give a queue file from before KEY_FIELDS had columns those columns"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pending_writes)")}
+        missing = [name for name in KEY_FIELDS if name not in columns]
+        if not missing:
+            return
+        for name in missing:
+            self._conn.execute(f"ALTER TABLE pending_writes ADD COLUMN {name}")
+        for write_id, payload in self._conn.execute("SELECT id, payload FROM pending_writes").fetchall():
+            payload = json.loads(payload)
+            self._conn.execute(
+                "UPDATE pending_writes SET student_id = ?, course_id = ?, academic_year = ?, semester = ? WHERE id = ?",
+                tuple(payload.get(name) for name in KEY_FIELDS) + (write_id,)
+            )
+
+    def put(self, kind, payload):
+        """Append a write; returns its queue id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO pending_writes (kind, payload, queued_at, student_id, course_id, academic_year, semester) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), time.time()) + tuple(payload.get(name) for name in KEY_FIELDS)
+            )
+            return cursor.lastrowid
+
+    def take(self, limit=None):
+        """
+        Read queued writes without removing them, oldest first
+
+        Returns:
+            list: Dictionaries with id, kind, payload (a dict) and queued_at
+            (a Unix time)
+        """
+        return self._select("", (), limit)
+
+    def find(self, limit=None, **fields):
+        """
+        Read the queued writes whose payload matches every given field, oldest first
+
+        Args:
+            limit (int, optional): Read at most this many
+            **fields: Values for KEY_FIELDS; a field given as None matches anything
+
+        Returns:
+            list: As for take()
+        """
+        clauses = []
+        params = []
+        for name, value in fields.items():
+            if name not in KEY_FIELDS:
+                raise ValueError(f"Cannot filter queued writes by {name}")
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return self._select(where, tuple(params), limit)
+
+    def _select(self, where, params, limit=None):
+        query = "SELECT id, kind, payload, queued_at FROM pending_writes" + where + " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'id': row[0], 'kind': row[1], 'payload': json.loads(row[2]), 'queued_at': row[3]}
+            for row in rows
+        ]
+
+    def remove_through(self, write_id):
+        """Drop every queued write up to and including write_id"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pending_writes WHERE id <= ?", (write_id,))
+
+    def set_aside(self, entry, error):
+        """Move a write PostgreSQL rejected to failed_writes"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO failed_writes (id, kind, payload, queued_at, error, failed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry['id'], entry['kind'], json.dumps(entry['payload']), entry['queued_at'],
+                     error, time.time())
+                )
+                self._conn.execute("DELETE FROM pending_writes WHERE id = ?", (entry['id'],))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def depth(self):
+        """Number of writes waiting to be flushed"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone()[0]
+
+    def oldest_queued_at(self):
+        """Unix time the oldest waiting write was queued, or None if the queue is empty"""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(queued_at) FROM pending_writes").fetchone()[0]
+
+    def failed_count(self):
+        """Number of writes set aside as rejected"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM failed_writes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehind:
+    """
+    Queue score and enrollment writes locally and commit them in batches
+
+        write_behind = WriteBehind(WriteQueue(path)).start()
+        write_behind.submit('score', {...})
+
+    A flusher thread commits up to batch_size queued writes per PostgreSQL
+    transaction, oldest first. If a batch is rejected its writes are
+    retried one per transaction, so a single bad write is set aside without
+    holding up the rest. While PostgreSQL is unreachable writes stay queued
+    and are retried every retry_interval seconds.
+
+    StudentResultsDB overlays queued writes on enrollment lists, rosters
+    and academic records, so they show up before they are flushed; GPAs
+    and dashboard counts catch up once they are. Before a write that goes
+    straight to PostgreSQL (a bulk score save, a capacity-limited
+    enrollment, a transaction() block) it flushes any queued write it
+    could overtake, so an older queued write never lands on top of it.
+
+    Only one process drains a queue file at a time (a session advisory lock
+    on the flushing connection). A crash between a commit and removing the
+    batch from the queue replays the batch on the next start; every queued
+    write is safe to apply twice.
+    """
+
+    def __init__(self, queue, batch_size=500, flush_interval=0.2, retry_interval=5):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.pid = os.getpid()
+        self.lock_key = f"write_behind:{os.path.abspath(queue.path)}"
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        # Held while draining, so a flush() can't replay a batch the
+        # flusher thread is committing
+        self._drain_lock = threading.Lock()
+        self._thread = None
+
+        self._stats_lock = threading.Lock()
+        self.queued = 0
+        self.flushed = 0
+        self.batches = 0
+        self._flush_ms = deque(maxlen=FLUSH_SAMPLES)
+
+    def start(self):
+        """Start the flusher thread; anything left queued by an earlier run is flushed first"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stopping.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=30):
+        """Stop the flusher after it commits what is queued (or timeout seconds pass)"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, kind, payload):
+        """
+        Queue a write for the flusher
+
+        Args:
+            kind (str): One of QUEUED_RESULTS
+            payload (dict): The write's arguments (JSON-serializable)
+
+        Returns:
+            int: Queue id of the write, or None if it could not be queued
+        """
+        if kind not in QUEUED_RESULTS:
+            raise ValueError(f"Unknown write kind: {kind}")
+        try:
+            write_id = self.queue.put(kind, payload)
+        except sqlite3.Error as e:
+            print(f"✗ Error queueing write: {e}")
+            return None
+        with self._stats_lock:
+            self.queued += 1
+        self._wake.set()
+        return write_id
+
+    def pending(self, limit=None, **fields):
+        """Queued writes not yet committed, oldest first (see WriteQueue.find)"""
+        return self.queue.find(limit, **fields)
+
+    def flush(self, wait=False):
+        """
+        Commit everything queued so far, on the calling thread
+
+        Args:
+            wait (bool): If another process is draining the queue, wait for
+                it to finish instead of giving up
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        db = DatabaseConnection()
+        if not db.connect():
+            return False
+        try:
+            return self._drain(db, wait)
+        finally:
+            db.close()
+
+    def metrics(self):
+        """
+        Return the queue's counters
+
+        Returns:
+            dict: depth (writes waiting), oldest_age (seconds the oldest has
+            waited), queued, flushed and failed counts since start (failed
+            counts every write ever set aside), batches, and
+            last/avg/max_flush_ms over the latest FLUSH_SAMPLES batches
+        """
+        oldest = self.queue.oldest_queued_at()
+        with self._stats_lock:
+            samples = list(self._flush_ms)
+            return {
+                'depth': self.queue.depth(),
+                'oldest_age': round(time.time() - oldest, 3) if oldest is not None else 0.0,
+                'queued': self.queued,
+                'flushed': self.flushed,
+                'failed': self.queue.failed_count(),
+                'batches': self.batches,
+                'last_flush_ms': samples[-1] if samples else 0.0,
+                'avg_flush_ms': round(sum(samples) / len(samples), 1) if samples else 0.0,
+                'max_flush_ms': max(samples) if samples else 0.0,
+            }
+
+    def _run(self):
+        db = DatabaseConnection()
+        try:
+            while not self._stopping.is_set():
+                self._wake.wait()
+                self._wake.clear()
+                if not self._stopping.is_set() and self.queue.depth() < self.batch_size:
+                    # Let writes collect into a fuller batch
+                    self._stopping.wait(self.flush_interval)
+                if not self._drain(db):
+                    # PostgreSQL is unreachable or another process is
+                    # draining; the writes stay queued
+                    self._stopping.wait(self.retry_interval)
+                    self._wake.set()
+            # One last pass so a clean shutdown leaves nothing queued
+            self._drain(db)
+        finally:
+            if db.connection:
+                db.close()
+
+    def _drain(self, db, wait=False):
+        """Commit queued writes batch by batch; False if that had to stop early"""
+        with self._drain_lock:
+            if not db.ensure_connection():
+                return False
+            if wait:
+                locked = db.execute_query(
+                    "SELECT TRUE AS locked FROM pg_advisory_lock(hashtext(%s))", (self.lock_key,)
+                )
+            else:
+                locked = db.execute_query("SELECT pg_try_advisory_lock(hashtext(%s)) AS locked", (self.lock_key,))
+            if not locked or not locked[0]['locked']:
+                return False
+            try:
+                while True:
+                    entries = self.queue.take(self.batch_size)
+                    if not entries:
+                        return True
+                    if not self._flush_batch(db, entries):
+                        return False
+            finally:
+                db.execute_query("SELECT pg_advisory_unlock(hashtext(%s))", (self.lock_key,))
+
+    def _flush_batch(self, db, entries):
+        """Commit one batch; False if PostgreSQL could not be reached"""
+        started = time.monotonic()
+        with db.transaction() as tx:
+            for entry in entries:
+                apply_write(db, entry['kind'], entry['payload'])
+                if not tx.ok:
+                    break
+        if tx.ok:
+            self.queue.remove_through(entries[-1]['id'])
+            self._record_flush(len(entries), started)
+            return True
+        if not isinstance(tx.error, PERMANENT_ERRORS):
+            return False
+
+        # A write in the batch was rejected; commit them one at a time to
+        # set it aside
+        for entry in entries:
+            started = time.monotonic()
+            with db.transaction() as tx:
+                apply_write(db, entry['kind'], entry['payload'])
+            if tx.ok:
+                self.queue.remove_through(entry['id'])
+                self._record_flush(1, started)
+            elif isinstance(tx.error, PERMANENT_ERRORS):
+                error = str(tx.error).strip()
+                self.queue.set_aside(entry, error)
+                print(f"✗ Queued {entry['kind']} write {entry['id']} rejected: {error}")
+            else:
+                return False
+        return True
+
+    def _record_flush(self, count, started):
+        with self._stats_lock:
+            self.flushed += count
+            self.batches += 1
+            self._flush_ms.append(round((time.monotonic() - started) * 1000, 1))
+
+
+def pending_writes(write_behind, **fields):
+    """
+    Queued writes whose payload matches every given field, oldest first
+
+        pending_writes(write_behind, student_id=7, academic_year=None)
+
+    A field given as None matches anything; fields are KEY_FIELDS, matched
+    by an indexed query on the queue. Returns [] when write_behind is None.
+    """
+    if write_behind is None:
+        return []
+    return write_behind.pending(**fields)
+
+
+def _offering(payload):
+    return (payload['student_id'], payload['course_id'], payload['academic_year'], payload['semester'])
+
+
+def _queued_time(entry):
+    return datetime.fromtimestamp(entry['queued_at']).astimezone()
+
+
+def overlay_enrollments(rows, pending, courses):
+    """
+    Apply queued enrollment writes to get_student_enrollments rows
+
+    Queued enrollments are added with status 'pending' and a None id;
+    queued unenrollments are removed.
+
+    Args:
+        rows (list): Rows from the database
+        pending (list): pending_writes() for the same student and term
+        courses (dict): Course rows by id
+
+    Returns:
+        list: The merged rows, ordered by course code
+    """
+    merged = {_offering(row): row for row in rows}
+    for entry in pending:
+        payload = entry['payload']
+        key = _offering(payload)
+        if entry['kind'] == 'unenroll':
+            merged.pop(key, None)
+        elif entry['kind'] == 'enroll' and key not in merged and payload['course_id'] in courses:
+            course = courses[payload['course_id']]
+            merged[key] = {
+                'id': None,
+                'student_id': payload['student_id'],
+                'course_id': payload['course_id'],
+                'academic_year': payload['academic_year'],
+                'semester': payload['semester'],
+                'enrollment_date': _queued_time(entry),
+                'status': 'pending',
+                'course_code': course['course_code'],
+                'course_name': course['course_name'],
+                'credits': course['credits'],
+            }
+    return sorted(merged.values(), key=lambda row: row['course_code'])
+
+
+def overlay_roster(rows, pending, students):
+    """
+    Apply queued writes to get_course_roster rows
+
+    Queued scores replace the row's score, grade and gpa_points (updated_at
+    is when the score was queued); queued enrollments are added with status
+    'pending' and queued unenrollments removed.
+
+    Args:
+        rows (list): Rows from the database
+        pending (list): pending_writes() for the same course and term
+        students (dict): id -> {'student_id', 'full_name', 'email'} for
+            students with a queued enrollment
+
+    Returns:
+        list: The merged rows, ordered by name
+    """
+    merged = {row['student_db_id']: row for row in rows}
+    for entry in pending:
+        payload = entry['payload']
+        student_db_id = payload['student_id']
+        if entry['kind'] == 'unenroll':
+            merged.pop(student_db_id, None)
+        elif entry['kind'] == 'enroll':
+            if student_db_id not in merged and student_db_id in students:
+                merged[student_db_id] = dict(
+                    students[student_db_id], student_db_id=student_db_id, status='pending',
+                    score=None, grade=None, gpa_points=None, updated_at=None
+                )
+        elif student_db_id in merged:
+            score = payload['score']
+            merged[student_db_id] = dict(
+                merged[student_db_id], score=score, grade=calculate_grade(score),
+                gpa_points=calculate_gpa_points(score), updated_at=_queued_time(entry)
+            )
+    return sorted(merged.values(), key=lambda row: (row['full_name'], row['student_db_id']))
+
+
+def overlay_scores(rows, pending, courses, staff_names):
+    """
+    Apply queued scores to get_student_academic_record rows
+
+    Args:
+        rows (list): Rows from the database
+        pending (list): pending_writes() for the same student and term
+        courses (dict): Course rows by id
+        staff_names (dict): Staff full names by id
+
+    Returns:
+        list: The merged rows, ordered by course code
+    """
+    merged = {(row['course_id'], row['academic_year'], row['semester']): row for row in rows}
+    for entry in pending:
+        payload = entry['payload']
+        if entry['kind'] != 'score' or payload['course_id'] not in courses:
+            continue
+        key = (payload['course_id'], payload['academic_year'], payload['semester'])
+        score = payload['score']
+        course = courses[payload['course_id']]
+        merged[key] = dict(
+            merged.get(key, {'id': None, 'recorded_at': _queued_time(entry)}),
+            student_id=payload['student_id'], course_id=payload['course_id'],
+            staff_id=payload['staff_id'], academic_year=payload['academic_year'],
+            semester=payload['semester'], score=score, grade=calculate_grade(score),
+            gpa_points=calculate_gpa_points(score), updated_at=_queued_time(entry),
+            course_code=course['course_code'], course_name=course['course_name'],
+            credits=course['credits'], staff_name=staff_names.get(payload['staff_id'])
+        )
+    return sorted(merged.values(), key=lambda row: row['course_code'])
+
+
+_write_behind = None
+_write_behind_lock = threading.Lock()
+
+
+def get_write_behind():
+    """
+    Return the process-wide WriteBehind, starting it on first use
+
+    Returns:
+        WriteBehind: None when WRITE_BEHIND_CONFIG has it disabled
+    """
+    global _write_behind
+    if not WRITE_BEHIND_CONFIG['enabled']:
+        return None
+    with _write_behind_lock:
+        # A forked child must not share the parent's queue connection
+        if _write_behind is None or _write_behind.pid != os.getpid():
+            _write_behind = WriteBehind(
+                WriteQueue(WRITE_BEHIND_CONFIG['queue_path']),
+                batch_size=WRITE_BEHIND_CONFIG['batch_size'],
+                flush_interval=WRITE_BEHIND_CONFIG['flush_interval'],
+                retry_interval=WRITE_BEHIND_CONFIG['retry_interval']
+            ).start()
+            atexit.register(_write_behind.stop)
+        return _write_behind
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+API Launcher for Student Result Management System
+Run this script to serve the JSON API on localhost
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import API_CONFIG
+
+
+async def serve(host, port):
+    """Start the API and serve until interrupted"""
+    from api.server import ApiServer
+    server = ApiServer(host, port)
+    if not await server.start():
+        return 1
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+    return 0
+
+
+def main():
+    """Main launcher function"""
+    parser = argparse.ArgumentParser(description="Serve the student results JSON API")
+    parser.add_argument('--host', default=API_CONFIG['host'], help="Address to listen on")
+    parser.add_argument('--port', type=int, default=API_CONFIG['port'], help="Port to listen on")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(serve(args.host, args.port))
+    except ImportError as e:
+        print(f"Error importing API modules: {e}")
+        print("Please make sure all dependencies are installed:")
+        print("pip install asyncpg")
+        return 1
+    except KeyboardInterrupt:
+        print("\n✓ API stopped")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,8 @@
 from utils.auth_manager import AuthManager
+from utils.file_handler import ImportErrorCollector
+
+# Rows per page in the listing screens
+PAGE_SIZE = 20
 
 class AdminMenu:
     def __init__(self, db, auth_manager):
@@ -54,10 +58,11 @@ class AdminMenu:
             print("3. Search Student")
 
             print("4. View Student Credentials")
-            print("5. Back to Admin Menu")
+            print("5. Import Legacy Results File")
+            print("6. Back to Admin Menu")
             print("-"*40)
             
-            choice = input("Select option (1-5): ").strip()
+            choice = input("Select option (1-6): ").strip()
             
             if choice == '1':
                 self.add_student()
@@ -68,6 +73,8 @@ class AdminMenu:
             elif choice == '4':
                 self.view_student_credentials()
             elif choice == '5':
+                self.import_legacy_results()
+            elif choice == '6':
                 break
             else:
                 print("✗ Invalid choice. Please try again.")
@@ -101,28 +108,50 @@ class AdminMenu:
         else:
             print("✗ Failed to create student.")
     
+    def import_legacy_results(self):
+        """Import a CSV/TXT results file into the legacy student_results table"""
+        print("\n" + "="*40)
+        print("IMPORT LEGACY RESULTS")
+        print("="*40)
+        
+        file_path = input("File path (.csv or .txt): ").strip()
+        if not file_path:
+            print("✗ File path is required.")
+            return
+        update = input("Update existing records? (y/N): ").strip().lower() == 'y'
+        
+        errors = ImportErrorCollector()
+        result = self.db.import_students_file(file_path, 'update' if update else 'skip', errors)
+        if result['already_imported']:
+            print("✓ This file has already been imported; nothing was changed.")
+            return
+        if result['resumed_from']:
+            print(f"Resuming an earlier import at byte {result['resumed_from']:,}")
+        for detail in errors.details:
+            location = f"line {detail['line']}: " if detail['line'] else ""
+            print(f"✗ {location}{detail['message']}")
+        for detail in result['error_details']:
+            print(f"✗ {detail['message']}")
+        
+        print(f"✓ Inserted: {result['inserted']}")
+        print(f"✓ Updated: {result['updated']}")
+        print(f"Skipped (already present or unchanged): {result['skipped']}")
+        print(f"Duplicates within the file: {result['duplicates']}")
+        print(f"Errors: {result['errors'] + errors.count}")
+    
     def view_all_students(self):
-        """View all students"""
+        """View all students, one page at a time"""
         print("\n" + "="*80)
         print("ALL STUDENTS")
         print("="*80)
         
-        query = "SELECT * FROM students ORDER BY full_name"
-        students = self.db.db.execute_query(query)
-        
-        if not students:
-            print("No students found.")
-            return
-        
-        print(f"{'ID':<4} {'Student ID':<10} {'Name':<25} {'Email':<25} {'Phone':<15}")
-        print("-" * 80)
-        
-        for student in students:
+        def show_student(student):
             print(f"{student['id']:<4} {student['student_id']:<10} {student['full_name']:<25} "
                   f"{student['email'] or 'N/A':<25} {student['phone'] or 'N/A':<15}")
         
-        print(f"\nTotal students: {len(students)}")
-        print("\nNote: Use 'View Student Credentials' to see PINs")
+        header = f"{'ID':<4} {'Student ID':<10} {'Name':<25} {'Email':<25} {'Phone':<15}"
+        if self.page_through(self.db.get_students_page, header, show_student, "students"):
+            print("\nNote: Use 'View Student Credentials' to see PINs")
     
     def search_student(self):
         """Search for a student"""
@@ -263,27 +292,18 @@ class AdminMenu:
             print("✗ Failed to create staff member.")
     
     def view_all_staff(self):
-        """View all staff"""
+        """View all staff, one page at a time"""
         print("\n" + "="*80)
         print("ALL STAFF")
         print("="*80)
         
-        query = "SELECT * FROM staff ORDER BY full_name"
-        staff_list = self.db.db.execute_query(query)
-        
-        if not staff_list:
-            print("No staff found.")
-            return
-        
-        print(f"{'ID':<4} {'Staff ID':<10} {'Name':<25} {'Email':<25} {'Department':<20}")
-        print("-" * 80)
-        
-        for staff in staff_list:
+        def show_staff(staff):
             print(f"{staff['id']:<4} {staff['staff_id']:<10} {staff['full_name']:<25} "
                   f"{staff['email'] or 'N/A':<25} {staff['department'] or 'N/A':<20}")
         
-        print(f"\nTotal staff: {len(staff_list)}")
-        print("\nNote: Use 'View Staff Credentials' to see PINs")
+        header = f"{'ID':<4} {'Staff ID':<10} {'Name':<25} {'Email':<25} {'Department':<20}"
+        if self.page_through(self.db.get_staff_page, header, show_staff, "staff"):
+            print("\nNote: Use 'View Staff Credentials' to see PINs")
     
     def search_staff(self):
         """Search for a staff member"""
@@ -375,10 +395,11 @@ class AdminMenu:
             print("1. Add New Course")
             print("2. View All Courses")
             print("3. Search Course")
-            print("4. Back to Admin Menu")
+            print("4. Set Course Capacity")
+            print("5. Back to Admin Menu")
             print("-"*40)
             
-            choice = input("Select option (1-4): ").strip()
+            choice = input("Select option (1-5): ").strip()
             
             if choice == '1':
                 self.add_course()
@@ -387,6 +408,8 @@ class AdminMenu:
             elif choice == '3':
                 self.search_course()
             elif choice == '4':
+                self.set_course_capacity()
+            elif choice == '5':
                 break
             else:
                 print("✗ Invalid choice. Please try again.")
@@ -401,6 +424,7 @@ class AdminMenu:
         course_name = input("Course Name: ").strip()
         credits = input("Credits (1-3, default 3): ").strip()
         description = input("Description (optional): ").strip()
+        capacity = input("Capacity (optional, blank for unlimited): ").strip()
         
         if not course_code or not course_name:
             print("✗ Course code and name are required.")
@@ -414,34 +438,119 @@ class AdminMenu:
         except ValueError:
             credits = 3
         
-        if self.db.add_course(course_code, course_name, credits, description):
+        try:
+            capacity = int(capacity) if capacity else None
+            if capacity is not None and capacity < 0:
+                raise ValueError
+        except ValueError:
+            print("✗ Capacity must be a whole number of seats.")
+            return
+        
+        if self.db.add_course(course_code, course_name, credits, description, capacity):
             print("✓ Course created successfully!")
         else:
             print("✗ Failed to create course.")
     
-    def view_all_courses(self):
-        """View all courses"""
-        print("\n" + "="*80)
-        print("ALL COURSES")
-        print("="*80)
+    def set_course_capacity(self):
+        """Change a course's seat limit, promoting waitlisted students into new seats"""
+        print("\n" + "="*40)
+        print("SET COURSE CAPACITY")
+        print("="*40)
         
-        courses = self.db.get_all_courses()
+        course_code = input("Course Code: ").strip()
+        if not course_code:
+            print("✗ Course code is required.")
+            return
         
-        if not courses:
-            print("No courses found.")
+        course_id = self.db.get_course_id(course_code)
+        if course_id is None:
+            print("✗ Course not found.")
             return
         
-        print(f"{'ID':<4} {'Code':<10} {'Name':<30} {'Credits':<8} {'Description':<25}")
-        print("-" * 80)
+        capacity = input("Capacity (blank for unlimited): ").strip()
+        try:
+            capacity = int(capacity) if capacity else None
+            if capacity is not None and capacity < 0:
+                raise ValueError
+        except ValueError:
+            print("✗ Capacity must be a whole number of seats.")
+            return
         
-        for course in courses:
+        promoted = self.db.set_course_capacity(course_id, capacity)
+        if promoted is None:
+            print("✗ Failed to set course capacity.")
+            return
+        
+        limit = capacity if capacity is not None else "unlimited"
+        print(f"✓ Capacity of {course_code} set to {limit}.")
+        if promoted:
+            print(f"✓ {promoted} waitlisted student(s) enrolled.")
+    
+    def view_all_courses(self):
+        """View all courses, one page at a time"""
+        print("\n" + "="*80)
+        print("ALL COURSES")
+        print("="*80)
+        
+        def show_course(course):
             desc = course['description'] or 'N/A'
             if len(desc) > 22:
                 desc = desc[:19] + "..."
+            capacity = course['capacity'] if course['capacity'] is not None else '-'
             print(f"{course['id']:<4} {course['course_code']:<10} {course['course_name']:<30} "
-                  f"{course['credits']:<8} {desc:<25}")
+                  f"{course['credits']:<8} {capacity:<9} {desc:<25}")
         
-        print(f"\nTotal courses: {len(courses)}")
+        header = f"{'ID':<4} {'Code':<10} {'Name':<30} {'Credits':<8} {'Capacity':<9} {'Description':<25}"
+        self.page_through(self.db.get_courses_page, header, show_course, "courses")
+    
+    def page_through(self, fetch_page, header, show_row, label, page_size=PAGE_SIZE):
+        """
+        Print a listing one page at a time
+        
+        Args:
+            fetch_page (callable): Takes (page_size, token) and returns a Page
+            header (str): Column header line
+            show_row (callable): Prints one row
+            label (str): Plural name of the rows, e.g. "students"
+            page_size (int): Rows per page
+        
+        Returns:
+            bool: True if at least one row was shown
+        """
+        page = fetch_page(page_size, None)
+        if not page:
+            print(f"No {label} found.")
+            return False
+        
+        number = 1
+        while True:
+            print(header)
+            print("-" * 80)
+            for row in page:
+                show_row(row)
+            print(f"\nPage {number} ({len(page)} {label})")
+            
+            options = []
+            if page.has_prev:
+                options.append("[p]revious")
+            if page.has_next:
+                options.append("[n]ext")
+            if not options:
+                return True
+            choice = input(", ".join(options) + ", or Enter to finish: ").strip().lower()
+            
+            if choice == 'n' and page.has_next:
+                next_page = fetch_page(page_size, page.next_token)
+                number += 1
+            elif choice == 'p' and page.has_prev:
+                next_page = fetch_page(page_size, page.prev_token)
+                number -= 1
+            else:
+                return True
+            if next_page is None:
+                print(f"✗ Failed to load {label}.")
+                return True
+            page = next_page
     
     def search_course(self):
         """Search for a course"""
@@ -523,35 +632,31 @@ class AdminMenu:
         print("SYSTEM REPORTS")
         print("="*50)
         
-        # Get counts
-        students_query = "SELECT COUNT(*) as count FROM students"
-        staff_query = "SELECT COUNT(*) as count FROM staff"
-        courses_query = "SELECT COUNT(*) as count FROM courses"
-        enrollments_query = "SELECT COUNT(*) as count FROM enrollments"
-        
-        students_count = self.db.db.execute_query(students_query)[0]['count']
-        staff_count = self.db.db.execute_query(staff_query)[0]['count']
-        courses_count = self.db.db.execute_query(courses_query)[0]['count']
-        enrollments_count = self.db.db.execute_query(enrollments_query)[0]['count']
+        # All figures come from the counters table in one query
+        stats = self.db.get_dashboard_stats()
+        if stats is None:
+            print("✗ Failed to load system reports.")
+            return
         
-        print(f"Total Students: {students_count}")
-        print(f"Total Staff: {staff_count}")
-        print(f"Total Courses: {courses_count}")
-        print(f"Total Enrollments: {enrollments_count}")
+        print(f"Total Students: {stats['students']}")
+        print(f"Total Staff: {stats['staff']}")
+        print(f"Total Courses: {stats['courses']}")
+        print(f"Total Enrollments: {stats['enrollments']}")
+        print(f"Waitlisted: {stats['waitlisted']}")
         
         # Grade distribution
-        grade_query = """
-        SELECT grade, COUNT(*) as count 
-        FROM academic_records 
-        GROUP BY grade 
-        ORDER BY grade
-        """
-        grade_distribution = self.db.db.execute_query(grade_query)
-        
-        if grade_distribution:
+        if stats['grades']:
             print("\nGrade Distribution:")
-            for grade in grade_distribution:
+            for grade in stats['grades']:
                 print(f"{grade['grade']}: {grade['count']}")
+        
+        write_behind = self.db.write_behind_stats()
+        if write_behind is not None:
+            print("\nWrite-Behind Queue:")
+            print(f"Pending writes: {write_behind['depth']} (oldest {write_behind['oldest_age']:.1f}s)")
+            print(f"Flushed: {write_behind['flushed']} in {write_behind['batches']} batches, "
+                  f"{write_behind['failed']} rejected")
+            print(f"Flush time: avg {write_behind['avg_flush_ms']} ms, max {write_behind['max_flush_ms']} ms")
     
     def legacy_system(self):
         """Access legacy student results system"""
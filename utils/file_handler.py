@@ -1,58 +1,241 @@
 import csv
 import os
 from datetime import datetime
+from utils.grade_calculator import validate_score
 
-def read_student_data(file_path):
+# Column headers expected in CSV files, mapped to record keys
+CSV_COLUMNS = {
+    'IndexNumber': 'index_number',
+    'FullName': 'full_name',
+    'Course': 'course',
+    'Score': 'score'
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+class ImportErrorCollector:
     """
-    Read student data from CSV or TXT file
+    Collects problems found while reading a data file
+    
+    Every error is counted, but only the first ``max_details`` are kept so
+    a badly broken multi-gigabyte file cannot exhaust memory.
+    """
+    
+    def __init__(self, max_details=100):
+        self.max_details = max_details
+        self.count = 0
+        self.details = []
+    
+    def add(self, message, line_number=None, offset=None, text=None):
+        """
+        Record an error
+        
+        Args:
+            message (str): What was wrong
+            line_number (int, optional): Line number within the part of the file read
+            offset (int, optional): Byte offset of the line in the file
+            text (str, optional): The offending line
+        """
+        self.count += 1
+        if len(self.details) < self.max_details:
+            self.details.append({
+                'line': line_number,
+                'offset': offset,
+                'message': message,
+                'text': text
+            })
+    
+    def merge(self, other):
+        """Add the errors from another collector"""
+        self.count += other.count
+        room = self.max_details - len(self.details)
+        if room > 0:
+            self.details.extend(other.details[:room])
+    
+    def __len__(self):
+        return self.count
+    
+    def __bool__(self):
+        return self.count > 0
+
+def validate_student_record(record):
+    """
+    Check a student record against the student_results columns
     
     Args:
-        file_path (str): Path to the data file
+        record (dict): Record with index_number, full_name, course and score
     
     Returns:
-        list: List of student records as dictionaries
+        str: Error message, or None if the record is valid
+    """
+    try:
+        index_number = str(record['index_number']).strip()
+        full_name = str(record['full_name']).strip()
+        course = str(record['course']).strip()
+        score = record['score']
+    except (KeyError, TypeError):
+        return "missing field"
+    if not index_number or len(index_number) > 10:
+        return "index number must be 1-10 characters"
+    if not full_name or not course:
+        return "full name and course are required"
+    if not validate_score(score):
+        return "score must be between 0 and 100"
+    return None
+
+class StudentFileReader:
     """
-    students = []
+    Streams validated student records from a CSV or TXT file in batches
     
-    if not os.path.exists(file_path):
-        print(f"✗ File not found: {file_path}")
-        return students
+    The file is read line by line in binary mode, so memory stays flat no
+    matter how large the file is, and ``offset`` always holds the byte
+    position just after the last line handed out. Reading can start and
+    stop at byte offsets (which must fall on line boundaries) so a file can
+    be resumed or split into chunks. CSV files always take their column
+    order from the header on the first line.
+    """
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            # Try to detect if it's CSV or TXT
-            if file_path.endswith('.csv'):
-                csv_reader = csv.DictReader(file)
-                for row in csv_reader:
-                    students.append({
-                        'index_number': row['IndexNumber'].strip(),
-                        'full_name': row['FullName'].strip(),
-                        'course': row['Course'].strip(),
-                        'score': int(row['Score'].strip())
-                    })
-            else:
-                # Handle TXT file with comma-separated values
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            parts = [part.strip() for part in line.split(',')]
-                            if len(parts) == 4:
-                                students.append({
-                                    'index_number': parts[0],
-                                    'full_name': parts[1],
-                                    'course': parts[2],
-                                    'score': int(parts[3])
-                                })
-                            else:
-                                print(f"✗ Invalid format at line {line_num}: {line}")
-                        except ValueError as e:
-                            print(f"✗ Error parsing line {line_num}: {e}")
+    def __init__(self, file_path, batch_size=DEFAULT_BATCH_SIZE, errors=None,
+                 start_offset=0, end_offset=None):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.errors = errors if errors is not None else ImportErrorCollector()
+        self.start_offset = start_offset
+        self.end_offset = end_offset
+        self.is_csv = file_path.endswith('.csv')
+        self.offset = start_offset
+        self.line_number = 0
+        self.records_read = 0
+    
+    def __iter__(self):
+        """Yield lists of up to batch_size valid records"""
+        batch = []
+        for record in self.records():
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def records(self):
+        """Yield valid records one at a time"""
+        if not os.path.exists(self.file_path):
+            self.errors.add(f"File not found: {self.file_path}")
+            return
+        
+        with open(self.file_path, 'rb') as file:
+            columns = None
+            if self.is_csv:
+                columns = self._read_header(file)
+                if columns is None:
+                    return
+                if self.offset == 0:
+                    self.line_number = 1
+                self.offset = max(self.offset, file.tell())
+            file.seek(self.offset)
+            
+            while self.end_offset is None or self.offset < self.end_offset:
+                line_start = self.offset
+                raw = file.readline()
+                if not raw:
+                    break
+                self.offset += len(raw)
+                self.line_number += 1
+                
+                line = raw.decode('utf-8', errors='replace').strip()
+                if line_start == 0:
+                    line = line.lstrip('\ufeff')
+                if not line:
+                    continue
+                
+                record = self._parse_line(line, columns, line_start)
+                if record is not None:
+                    self.records_read += 1
+                    yield record
+    
+    def _read_header(self, file):
+        """Map CSV header columns to positions"""
+        header = file.readline().decode('utf-8', errors='replace').lstrip('\ufeff').strip()
+        names = [name.strip() for name in next(csv.reader([header]), [])]
+        missing = [name for name in CSV_COLUMNS if name not in names]
+        if missing:
+            self.errors.add(f"Missing CSV columns: {', '.join(missing)}", line_number=1, offset=0, text=header)
+            return None
+        return [(names.index(name), key) for name, key in CSV_COLUMNS.items()]
+    
+    def _parse_line(self, line, columns, line_start):
+        """Turn one line into a validated record, or record why it failed"""
+        if columns:
+            parts = [part.strip() for part in next(csv.reader([line]))]
+            if len(parts) < len(CSV_COLUMNS):
+                self.errors.add("Invalid format", self.line_number, line_start, line)
+                return None
+            values = {key: parts[position] for position, key in columns}
+        else:
+            # TXT files hold comma-separated values in a fixed order
+            parts = [part.strip() for part in line.split(',')]
+            if len(parts) != len(CSV_COLUMNS):
+                self.errors.add("Invalid format", self.line_number, line_start, line)
+                return None
+            values = dict(zip(CSV_COLUMNS.values(), parts))
         
-        print(f"✓ Successfully read {len(students)} student records from {file_path}")
+        try:
+            values['score'] = int(values['score'])
+        except ValueError:
+            self.errors.add(f"Invalid score: {values['score']}", self.line_number, line_start, line)
+            return None
         
-    except Exception as e:
-        print(f"✗ Error reading file {file_path}: {e}")
+        error = validate_student_record(values)
+        if error:
+            self.errors.add(error, self.line_number, line_start, line)
+            return None
+        return values
+
+def iter_student_batches(file_path, batch_size=DEFAULT_BATCH_SIZE, errors=None):
+    """
+    Yield validated student records from a CSV or TXT file in batches
+    
+    Args:
+        file_path (str): Path to the data file
+        batch_size (int): Maximum records per batch
+        errors (ImportErrorCollector, optional): Receives per-line errors
+    
+    Returns:
+        generator: Lists of student record dictionaries
+    """
+    return iter(StudentFileReader(file_path, batch_size, errors))
+
+def iter_student_records(file_path, errors=None):
+    """
+    Yield validated student records from a CSV or TXT file one at a time
+    
+    Args:
+        file_path (str): Path to the data file
+        errors (ImportErrorCollector, optional): Receives per-line errors
+    
+    Returns:
+        generator: Student record dictionaries
+    """
+    return StudentFileReader(file_path, errors=errors).records()
+
+def read_student_data(file_path, errors=None):
+    """
+    Read student data from CSV or TXT file
+    
+    Args:
+        file_path (str): Path to the data file
+        errors (ImportErrorCollector, optional): Receives per-line errors
+    
+    Returns:
+        list: List of student records as dictionaries
+    """
+    errors = errors if errors is not None else ImportErrorCollector()
+    students = list(iter_student_records(file_path, errors))
+    
+    if errors:
+        print(f"✗ Skipped {errors.count} invalid line(s) in {file_path}")
+    print(f"✓ Successfully read {len(students)} student records from {file_path}")
     
     return students
 
@@ -93,24 +93,24 @@ class StaffMenu:
         print(f"Academic Year: {course['academic_year']} | Semester: {course['semester']}")
         print("="*60)
         
-        enrollments = self.db.get_course_enrollments(
-            course['id'], 
-            course['academic_year'], 
-            course['semester']
-        )
+        roster = self.db.get_course_roster(course['id'], (course['academic_year'], course['semester']),
+                                           include_waitlist=True)
         
-        if not enrollments:
+        if not roster:
             print("No students enrolled in this course.")
             return
         
-        print(f"{'ID':<4} {'Student ID':<12} {'Name':<25} {'Email':<25} {'Status':<10}")
+        print(f"{'Student ID':<12} {'Name':<25} {'Email':<25} {'Grade':<6} {'Status':<10}")
         print("-" * 80)
         
-        for enrollment in enrollments:
-            print(f"{enrollment['id']:<4} {enrollment['student_id']:<12} {enrollment['full_name']:<25} "
-                  f"{enrollment['email'] or 'N/A':<25} {enrollment['status']:<10}")
+        for student in roster:
+            print(f"{student['student_id']:<12} {student['full_name']:<25} "
+                  f"{student['email'] or 'N/A':<25} {student['grade'] or '-':<6} {student['status']:<10}")
         
-        print(f"\nTotal enrollments: {len(enrollments)}")
+        waitlisted = sum(1 for student in roster if student['status'] == 'waitlisted')
+        print(f"\nTotal enrollments: {len(roster) - waitlisted}")
+        if waitlisted:
+            print(f"Waitlisted: {waitlisted}")
     
     def record_student_scores(self):
         """Record scores for students in a course"""
@@ -145,19 +145,28 @@ class StaffMenu:
         print(f"RECORD SCORES FOR {course['course_code']} - {course['course_name']}")
         print("="*60)
         
-        enrollments = self.db.get_course_enrollments(
-            course['id'], 
-            course['academic_year'], 
-            course['semester']
-        )
+        # The roster carries each student's current score, so no per-student lookups
+        enrollments = self.db.get_course_roster(course['id'], (course['academic_year'], course['semester']))
         
         if not enrollments:
             print("No students enrolled in this course.")
             return
         
+        print("1. Enter scores for the whole roster")
+        print("2. Record a score for one student")
+        mode = input("\nSelect option (1-2): ").strip()
+        
+        if mode == '1':
+            self.record_roster_scores(enrollments, course)
+            return
+        if mode != '2':
+            print("✗ Invalid choice.")
+            return
+        
         print("Students enrolled:")
         for i, enrollment in enumerate(enrollments, 1):
-            print(f"{i}. {enrollment['student_id']} - {enrollment['full_name']}")
+            current = f" (current: {enrollment['score']})" if enrollment['score'] is not None else ""
+            print(f"{i}. {enrollment['student_id']} - {enrollment['full_name']}{current}")
         
         try:
             choice = int(input("\nSelect student (number): ")) - 1
@@ -169,47 +178,56 @@ class StaffMenu:
         except ValueError:
             print("✗ Please enter a valid number.")
     
+    def record_roster_scores(self, enrollments, course):
+        """Enter scores for every enrolled student and save them together"""
+        print("\nEnter a score (0-100) for each student, or leave blank to keep [current].")
+        print("-"*60)
+        
+        names = {}
+        scores = []
+        for enrollment in enrollments:
+            names[enrollment['student_db_id']] = f"{enrollment['student_id']} - {enrollment['full_name']}"
+            current = enrollment['score'] if enrollment['score'] is not None else '-'
+            score = input(f"{enrollment['student_id']:<12} {enrollment['full_name']:<25} [{current:>3}] Score: ").strip()
+            if score:
+                scores.append((enrollment['student_db_id'], score))
+        
+        if not scores:
+            print("No scores entered.")
+            return
+        
+        self.save_scores(course, scores, names)
+    
     def record_score_for_student(self, student, course):
         """Record score for a specific student"""
         print(f"\n" + "-"*40)
         print(f"RECORD SCORE FOR {student['full_name']}")
         print(f"Course: {course['course_code']} - {course['course_name']}")
+        if student['score'] is not None:
+            print(f"Current score: {student['score']} (Grade: {student['grade']})")
         print("-"*40)
         
-        # Check if score already exists
-        existing_score_query = """
-        SELECT score, grade FROM academic_records 
-        WHERE student_id = %s AND course_id = %s AND academic_year = %s AND semester = %s
-        """
-        existing = self.db.db.execute_query(existing_score_query, (
-            student['student_id'], course['id'], course['academic_year'], course['semester']
-        ))
-        
-        if existing:
-            current_score = existing[0]['score']
-            current_grade = existing[0]['grade']
-            print(f"Current Score: {current_score} (Grade: {current_grade})")
+        score = input("Enter new score (0-100): ").strip()
+        names = {student['student_db_id']: f"{student['student_id']} - {student['full_name']}"}
+        self.save_scores(course, [(student['student_db_id'], score)], names)
+    
+    def save_scores(self, course, scores, names):
+        """Record (student_db_id, score) pairs and report the outcome"""
+        result = self.db.record_scores_bulk(
+            course['id'],
+            (course['academic_year'], course['semester']),
+            scores,
+            self.current_staff['id']
+        )
+        if result is None:
+            print("✗ Failed to record scores.")
+            return
         
-        try:
-            score = int(input("Enter new score (0-100): "))
-            if 0 <= score <= 100:
-                if self.db.record_student_score(
-                    student['student_id'], 
-                    course['id'], 
-                    self.current_staff['id'],
-                    course['academic_year'], 
-                    course['semester'], 
-                    score
-                ):
-                    grade = self.db.db.execute_query("SELECT grade FROM academic_records WHERE student_id = %s AND course_id = %s AND academic_year = %s AND semester = %s", 
-                                                   (student['student_id'], course['id'], course['academic_year'], course['semester']))[0]['grade']
-                    print(f"✓ Score recorded successfully! Grade: {grade}")
-                else:
-                    print("✗ Failed to record score.")
-            else:
-                print("✗ Score must be between 0 and 100.")
-        except ValueError:
-            print("✗ Please enter a valid score.")
+        for record in result['recorded']:
+            print(f"✓ {names.get(record['student_id'], record['student_id'])}: {record['score']} (Grade: {record['grade']})")
+        for entry in result['invalid']:
+            print(f"✗ {names.get(entry['student_id'], entry['student_id'])}: {entry['error']}")
+        print(f"\nRecorded {len(result['recorded'])} score(s), {len(result['invalid'])} rejected.")
     
     def view_student_grades(self):
         """View grades for students in a course"""
@@ -245,28 +263,21 @@ class StaffMenu:
         print(f"Academic Year: {course['academic_year']} | Semester: {course['semester']}")
         print("="*80)
         
-        # Get academic records for this course
-        grades_query = """
-        SELECT ar.*, s.student_id, s.full_name, s.email
-        FROM academic_records ar
-        JOIN students s ON ar.student_id = s.id
-        WHERE ar.course_id = %s AND ar.academic_year = %s AND ar.semester = %s
-        ORDER BY s.full_name
-        """
-        grades = self.db.db.execute_query(grades_query, (course['id'], course['academic_year'], course['semester']))
+        roster = self.db.get_course_roster(course['id'], (course['academic_year'], course['semester'])) or []
+        grades = [student for student in roster if student['score'] is not None]
         
         if not grades:
             print("No grades recorded for this course.")
             return
         
-        print(f"{'Student ID':<12} {'Name':<25} {'Score':<6} {'Grade':<6} {'GPA Points':<10}")
+        print(f"{'Student ID':<12} {'Name':<25} {'Score':<6} {'Grade':<6} {'GPA Points':<10} {'Last Modified':<16}")
         print("-" * 80)
         
         for grade in grades:
             print(f"{grade['student_id']:<12} {grade['full_name']:<25} {grade['score']:<6} "
-                  f"{grade['grade']:<6} {grade['gpa_points']:<10}")
+                  f"{grade['grade']:<6} {grade['gpa_points']:<10} {grade['updated_at']:%Y-%m-%d %H:%M}")
         
-        print(f"\nTotal students with grades: {len(grades)}")
+        print(f"\nTotal students with grades: {len(grades)} of {len(roster)} enrolled")
         
         # Calculate average score
         total_score = sum(grade['score'] for grade in grades)
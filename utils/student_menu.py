@@ -54,7 +54,7 @@ class StudentMenu:
         print("-" * 100)
         
         for enrollment in enrollments:
-            print(f"{enrollment['id']:<4} {enrollment['course_code']:<12} {enrollment['course_name']:<30} "
+            print(f"{enrollment['id'] or '-':<4} {enrollment['course_code']:<12} {enrollment['course_name']:<30} "
                   f"{enrollment['credits']:<8} {enrollment['academic_year']:<12} {enrollment['semester']:<10} {enrollment['status']:<10}")
         
         print(f"\nTotal enrollments: {len(enrollments)}")
@@ -77,7 +77,7 @@ class StudentMenu:
         
         for record in academic_records:
             print(f"{record['course_code']:<12} {record['course_name']:<30} {record['score']:<6} "
-                  f"{record['grade']:<6} {record['gpa_points']:<10} {record['credits']:<8} {record['staff_name']:<20}")
+                  f"{record['grade']:<6} {record['gpa_points']:<10} {record['credits']:<8} {record['staff_name'] or '-':<20}")
         
         print(f"\nTotal courses with grades: {len(academic_records)}")
         
@@ -103,7 +103,10 @@ class StudentMenu:
         if not semester:
             semester = None
         
+        # The GPA comes from the term summary, as in the GUI; the records
+        # are only for the breakdown
         gpa = self.db.calculate_student_gpa(student_id, current_year, semester)
+        academic_records = self.db.get_student_academic_record(student_id, current_year, semester)
         
         print(f"\nStudent: {self.current_student['full_name']}")
         print(f"Student ID: {self.current_student['student_id']}")
@@ -114,8 +117,6 @@ class StudentMenu:
         print(f"GPA: {gpa:.2f}")
         
         # Show grade breakdown
-        academic_records = self.db.get_student_academic_record(student_id, current_year, semester)
-        
         if academic_records:
             print(f"\nGrade Breakdown:")
             print(f"{'Course':<15} {'Score':<6} {'Grade':<6} {'GPA Points':<10} {'Credits':<8}")
@@ -166,21 +167,16 @@ class StudentMenu:
             return
         
         student_id = self.current_student['id']
+        status = self.db.enroll_student(student_id, course['id'], academic_year, semester)
         
-        # Check if already enrolled
-        existing_enrollment_query = """
-        SELECT * FROM enrollments 
-        WHERE student_id = %s AND course_id = %s AND academic_year = %s AND semester = %s
-        """
-        existing = self.db.db.execute_query(existing_enrollment_query, (
-            student_id, course['id'], academic_year, semester
-        ))
-        
-        if existing:
-            print("✗ You are already enrolled in this course for this academic year and semester.")
-            return
-        
-        if self.db.enroll_student(student_id, course['id'], academic_year, semester):
+        if status == 'enrolled':
             print("✓ Successfully enrolled in the course!")
+        elif status == 'waitlisted':
+            print("✓ The course is full. You have been added to the waitlist and will be")
+            print("  enrolled automatically when a seat becomes available.")
+        elif status == 'queued':
+            print("✓ Enrollment request received. It will appear under My Enrollments once confirmed.")
+        elif status == 'duplicate':
+            print("✗ You are already enrolled or waitlisted in this course for this academic year and semester.")
         else:
             print("✗ Failed to enroll in the course.") 
\ No newline at end of file